@@ -2,6 +2,18 @@ import tfsl
 import requests
 import urllib.parse
 import os
+import logging
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from igboApiClient import IgboApiClient
+from igboApiDump import iterDumpRecords
+from lexemeDuplicateIndex import LexemeDuplicateIndex
+from importJournal import ImportJournal, getWordId
+from tfsl.batch import BatchWriter, iter_batch, replay_batch
+from tfsl.textindex import TextIndex, normalize_text
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -13,6 +25,15 @@ PASSWORD = os.getenv("PASSWORD")
 headers = { 'X-API-Key' : API_KEY}
 headerSet = {'Accept': 'application/json'}
 
+DUPLICATES_URL = 'https://lexeme-forms.toolforge.org/api/v1/duplicates/www/ig/'
+DUPLICATE_CHECK_WORKERS = 8
+DUPLICATE_CHECK_CONNECTIONS_PER_HOST = 4
+# words are checked and built this many at a time, so output starts before the input is exhausted
+IMPORT_BATCH_SIZE = 50
+
+# outcome of checking one word: isDuplicate is None when the check itself failed
+DuplicateCheckResult = namedtuple('DuplicateCheckResult', ['word', 'isDuplicate', 'error'])
+
 lexemeWordClasses = {
     "ADJ": "Q34698",
     "ADV": "Q380057",
@@ -31,53 +52,227 @@ lexemeWordClasses = {
     "QTF": "Q1909485",
 }
 
-def handleLexemesSubmitToWikidata(newlexeme, push=False):
-    current_session = tfsl.WikibaseSession(MY_USERNAME, PASSWORD)
-    #submitting lexeme
+LEXEME_EDIT_SUMMARY = "new lexeme"
+# usage example, reference URL, full work available at URL
+LEXEME_PROPERTIES = ["P5831", "P854", "P953"]
+
+def handleLexemesSubmitToWikidata(newlexeme, push=False, batchWriter=None, wordId=None):
+    #submitting lexeme; the session logs in on the first push and is reused afterwards
+    if batchWriter is not None:
+        # dry run: the payload is kept for replayLexemeBatch and nothing is sent
+        batchWriter.write(newlexeme, LEXEME_EDIT_SUMMARY, wordId=wordId)
+        return None
     if push:
-        current_session.push(newlexeme, "new lexeme")
+        current_session = tfsl.shared_session(MY_USERNAME, PASSWORD)
+        return current_session.push(newlexeme, LEXEME_EDIT_SUMMARY)
+    return None
 
 
-def differentiateDuplicateAndNonDuplicateLexemes(word, usageExampleIgbo, newsense_, parseWord, lexemeWordClasses, code):
-    response2 = requests.get('https://lexeme-forms.toolforge.org/api/v1/duplicates/www/ig/' + word, headers=headerSet)
+def replayLexemeBatch(batchPath, journal=None):
+    # pushes a batch file written with --export, skipping words the journal shows as pushed
+    # and words appearing more than once in the file
+    current_session = tfsl.shared_session(MY_USERNAME, PASSWORD)
+    def unfinishedRecords():
+        replayedWords = set()
+        for record in iter_batch(batchPath):
+            wordId = record.get('wordId')
+            if wordId is not None:
+                if wordId in replayedWords or (journal is not None and journal.hasReached(wordId, 'pushed')):
+                    continue
+                replayedWords.add(wordId)
+            yield record
+    for record, result in replay_batch(current_session, unfinishedRecords()):
+        if isinstance(result, Exception):
+            logging.warning("Pushing %s failed: %s", record.get('wordId'), result)
+        elif journal is not None and record.get('wordId') is not None:
+            journal.record(record['wordId'], 'pushed', lid=result.get('entity', {}).get('id'))
+
+
+def makePooledSession(maxConnectionsPerHost=DUPLICATE_CHECK_CONNECTIONS_PER_HOST):
+    # one keep-alive pool per host, never holding more than maxConnectionsPerHost connections
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=maxConnectionsPerHost, pool_block=True)
+    session.mount('https://', adapter)
+    session.headers.update(headerSet)
+    return session
+
+
+def isDuplicateLexeme(word, session=requests):
+    response2 = session.get(DUPLICATES_URL + urllib.parse.quote(word), headers=headerSet)
     if response2.status_code == 200:
         # Duplicate Lexemes
-        return None
+        return True
     elif response2.status_code == 204:
         # Non Duplicate Lexemes
-        fullWorkAvailable = 'https://nkowaokwu.com/word?word={}'
-        referenceForReferenceURL = "https://nkowaokwu.com/lacuna"
-        referenceforFullWorkAvailableAt = fullWorkAvailable.format(parseWord)
-        newsense_gloss = newsense_ @ tfsl.langs.en_
-        newsense = tfsl.LexemeSense([newsense_gloss])
-        senselist = [newsense]
-        newstatement = tfsl.Statement("P5831", usageExampleIgbo @ tfsl.langs.ig_, references=[tfsl.Reference(tfsl.Claim("P854", referenceForReferenceURL)), tfsl.Reference(tfsl.Claim("P953", referenceforFullWorkAvailableAt))])
-        statementlist = [newstatement]
-        newlexeme = tfsl.Lexeme(word @ tfsl.langs.ig_, tfsl.langs.ig_, lexemeWordClasses[code], statements = statementlist, senses = senselist)
-        return newlexeme
-
-    
-
-def createIgboApiLexemes(ApiResponse):
-    for item in ApiResponse:
-        if item['wordClass'] in lexemeWordClasses.keys():
-            usageExample = item['examples'][0]
-            usageExampleIgbo = usageExample['igbo']
-            parseWord = urllib.parse.quote_plus(item['word'])
-
-            newlexeme = differentiateDuplicateAndNonDuplicateLexemes(item['word'], usageExampleIgbo, item['definitions'][0], parseWord, lexemeWordClasses, item['wordClass'])
-            if newlexeme is not None:
-                handleLexemesSubmitToWikidata(newlexeme) # if you want to push it, then run handleLexemesSubmitToWikidata(newlexeme,push=True)
+        return False
+    raise ValueError(f"Duplicate check for {word} returned {response2.status_code}: {response2.text}")
+
+
+def checkDuplicatesConcurrently(words, session, executor):
+    # results come back in the order of words; a failed check is recorded rather than raised.
+    # session (from makePooledSession) and executor are kept for the whole run, not made per batch
+    results = []
+    futures = [executor.submit(isDuplicateLexeme, word, session) for word in words]
+    for word, future in zip(words, futures):
+        try:
+            results.append(DuplicateCheckResult(word, future.result(), None))
+        except Exception as error:
+            results.append(DuplicateCheckResult(word, None, error))
+    return results
+
+
+def checkDuplicatesLocally(words, duplicateIndex, toneInsensitive=False):
+    # same results as checkDuplicatesConcurrently, answered from a LexemeDuplicateIndex
+    return [DuplicateCheckResult(word, duplicateIndex.isDuplicate(word, toneInsensitive=toneInsensitive), None) for word in words]
+
+
+def isSeenWord(word, seenWords, toneInsensitive=False):
+    match = seenWords.lookup_text(tfsl.langs.ig_.code, word)
+    return bool(match.tone_insensitive if toneInsensitive else match.normalized)
+
+
+def buildNewLexeme(word, usageExampleIgbo, newsense_, parseWord, lexemeWordClasses, code):
+    fullWorkAvailable = 'https://nkowaokwu.com/word?word={}'
+    referenceForReferenceURL = "https://nkowaokwu.com/lacuna"
+    referenceforFullWorkAvailableAt = fullWorkAvailable.format(parseWord)
+    newsense_gloss = newsense_ @ tfsl.langs.en_
+    newsense = tfsl.LexemeSense([newsense_gloss])
+    senselist = [newsense]
+    newstatement = tfsl.Statement("P5831", usageExampleIgbo @ tfsl.langs.ig_, references=[tfsl.Reference(tfsl.Claim("P854", referenceForReferenceURL)), tfsl.Reference(tfsl.Claim("P953", referenceforFullWorkAvailableAt))])
+    statementlist = [newstatement]
+    newlexeme = tfsl.Lexeme(word @ tfsl.langs.ig_, tfsl.langs.ig_, lexemeWordClasses[code], statements = statementlist, senses = senselist)
+    return newlexeme
+
+
+def differentiateDuplicateAndNonDuplicateLexemes(word, usageExampleIgbo, newsense_, parseWord, lexemeWordClasses, code):
+    try:
+        if isDuplicateLexeme(word):
+            return None
+    except ValueError:
+        return None
+    return buildNewLexeme(word, usageExampleIgbo, newsense_, parseWord, lexemeWordClasses, code)
+
+
+def createIgboApiLexemes(ApiResponse, workers=DUPLICATE_CHECK_WORKERS, maxConnectionsPerHost=DUPLICATE_CHECK_CONNECTIONS_PER_HOST, push=False, batchSize=IMPORT_BATCH_SIZE, duplicateIndex=None, toneInsensitive=False, journal=None, batchWriter=None):
+    # ApiResponse may be any iterable of words, including a generator over many pages;
+    # with a duplicateIndex no duplicate check goes over the network,
+    # and with a journal words finished by an earlier run are skipped
+    words = iter(ApiResponse)
+    seenWords = TextIndex()
+    session = executor = None
+    if duplicateIndex is None:
+        # one connection pool and one set of worker threads serve every batch of the run
+        session = makePooledSession(maxConnectionsPerHost)
+        executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while batch := list(islice(words, batchSize)):
+            createIgboApiLexemesBatch(batch, workers, maxConnectionsPerHost, push, duplicateIndex, seenWords, toneInsensitive, journal, batchWriter, session, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if session is not None:
+            session.close()
+
+
+def createIgboApiLexemesBatch(batch, workers=DUPLICATE_CHECK_WORKERS, maxConnectionsPerHost=DUPLICATE_CHECK_CONNECTIONS_PER_HOST, push=False, duplicateIndex=None, seenWords=None, toneInsensitive=False, journal=None, batchWriter=None, session=None, executor=None):
+    # spellings differing only in Unicode normalization (or, if toneInsensitive, in tone marks)
+    # are one word: only its first occurrence in the run is checked and built
+    if seenWords is None:
+        seenWords = TextIndex()
+    items = []
+    for item in batch:
+        if item['wordClass'] not in lexemeWordClasses.keys():
+            continue
+        wordId = getWordId(item)
+        if journal is not None:
+            if journal.isFinished(wordId):
+                continue
+            if journal.stage(wordId) is None:
+                journal.record(wordId, 'fetched', word=item['word'])
+        item['word'] = normalize_text(item['word'])
+        if isSeenWord(item['word'], seenWords, toneInsensitive):
+            continue
+        seenWords.add_text(tfsl.langs.ig_.code, item['word'], item['word'])
+        items.append(item)
+
+    # words already found not to be duplicates by an earlier run are not checked again
+    uncheckedItems = [item for item in items if journal is None or not journal.hasReached(getWordId(item), 'checked')]
+    batchWords = [item['word'] for item in uncheckedItems]
+    if duplicateIndex is not None:
+        checks = checkDuplicatesLocally(batchWords, duplicateIndex, toneInsensitive)
+    elif session is not None and executor is not None:
+        checks = checkDuplicatesConcurrently(batchWords, session, executor)
+    else:
+        # a batch imported on its own gets a pool of its own
+        with makePooledSession(maxConnectionsPerHost) as batchSession, ThreadPoolExecutor(max_workers=workers) as batchExecutor:
+            checks = checkDuplicatesConcurrently(batchWords, batchSession, batchExecutor)
+    newItems = [item for item in items if journal is not None and journal.hasReached(getWordId(item), 'checked')]
+    for item, check in zip(uncheckedItems, checks):
+        if check.error is not None:
+            logging.warning("Skipping %s, duplicate check failed: %s", check.word, check.error)
+            continue
+        if journal is not None:
+            journal.record(getWordId(item), 'checked', duplicate=check.isDuplicate)
+        if not check.isDuplicate:
+            newItems.append(item)
+
+    for item in newItems:
+        usageExample = item['examples'][0]
+        usageExampleIgbo = usageExample['igbo']
+        parseWord = urllib.parse.quote_plus(item['word'])
+
+        newlexeme = buildNewLexeme(item['word'], usageExampleIgbo, item['definitions'][0], parseWord, lexemeWordClasses, item['wordClass'])
+        if journal is not None:
+            journal.record(getWordId(item), 'built')
+        pushResponse = handleLexemesSubmitToWikidata(newlexeme, push, batchWriter, getWordId(item))
+        if journal is not None and batchWriter is not None:
+            journal.record(getWordId(item), 'exported')
+        elif journal is not None and pushResponse is not None:
+            journal.record(getWordId(item), 'pushed', lid=pushResponse.get('entity', {}).get('id'))
 
 
 if __name__=='__main__':
-    keywordQueryParam = input("Enter keyword:")
-    pageNumberParam = input("Enter page number between 1 and 25:")
-    base_url = "https://igboapi.com/api/v1/"
-    urlEndPoint = f"/words?keyword={keywordQueryParam}&range=%5B1%2C%20{pageNumberParam}%5D&examples=true"
-    request_url = base_url + urlEndPoint
-    response = requests.get(request_url, headers=headers)
-    my_response = response.json()
-    createIgboApiLexemes(my_response)
+    parser = argparse.ArgumentParser(description="Import Igbo API words as Wikidata lexemes.")
+    parser.add_argument("--dump", help="import from a JSON/CSV Igbo API snapshot instead of the live API")
+    parser.add_argument("--keyword", help="only import words matching this keyword (default: all words)")
+    parser.add_argument("--start-page", type=int, default=0, help="first page of results to import")
+    parser.add_argument("--end-page", type=int, help="stop before this page (default: the last page)")
+    parser.add_argument("--workers", type=int, default=DUPLICATE_CHECK_WORKERS, help="concurrent duplicate checks")
+    parser.add_argument("--connections", type=int, default=DUPLICATE_CHECK_CONNECTIONS_PER_HOST, help="connections per host for duplicate checks")
+    parser.add_argument("--duplicate-index", help="check duplicates against an index built by lexemeDuplicateIndex.py")
+    parser.add_argument("--tone-insensitive", action="store_true", help="treat words differing only in tone marks as duplicates")
+    parser.add_argument("--journal", help="record progress in this file, and skip words it shows as finished")
+    parser.add_argument("--export", help="dry run: write the wbeditentity payloads to this batch file instead of pushing")
+    parser.add_argument("--replay", help="push the payloads in a batch file written by --export, then stop")
+    parser.add_argument("--push", action="store_true", help="submit the new lexemes to Wikidata")
+    args = parser.parse_args()
+
+    # one request for the datatypes of every property the lexemes use, if they are not already cached
+    tfsl.utils.prefetch_datatypes(LEXEME_PROPERTIES)
+
+    duplicateIndex = None
+    if args.duplicate_index is not None:
+        duplicateIndex = LexemeDuplicateIndex.load(args.duplicate_index)
+
+    journal = None
+    if args.journal is not None:
+        journal = ImportJournal(args.journal)
 
+    batchWriter = None
+    if args.export is not None:
+        batchWriter = BatchWriter(args.export)
 
+    try:
+        if args.replay is not None:
+            replayLexemeBatch(args.replay, journal)
+        elif args.dump is not None:
+            createIgboApiLexemes(iterDumpRecords(args.dump), args.workers, args.connections, push=args.push, duplicateIndex=duplicateIndex, toneInsensitive=args.tone_insensitive, journal=journal, batchWriter=batchWriter)
+        else:
+            with IgboApiClient(API_KEY) as client:
+                words = client.iterWords(args.keyword, args.start_page, args.end_page)
+                createIgboApiLexemes(words, args.workers, args.connections, push=args.push, duplicateIndex=duplicateIndex, toneInsensitive=args.tone_insensitive, journal=journal, batchWriter=batchWriter)
+    finally:
+        if journal is not None:
+            journal.close()
+        if batchWriter is not None:
+            batchWriter.close()
@@ -0,0 +1,67 @@
+""" Paginated, streaming client for the Igbo API /words endpoint. """
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+IGBO_API_BASE_URL = "https://igboapi.com/api/v1/"
+IGBO_API_MAX_CONNECTIONS = 4
+
+
+class IgboApiClient:
+    """ Walks the pages of /words over a pool of keep-alive connections. """
+    def __init__(self, apiKey, baseUrl=IGBO_API_BASE_URL, maxConnections=IGBO_API_MAX_CONNECTIONS):
+        self.baseUrl = baseUrl
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=maxConnections, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'X-API-Key': apiKey, 'Accept': 'application/json'})
+
+    def getPage(self, page, keyword=None, examples=True):
+        """ Returns the words on one page of results; leaving out keyword lists all words. """
+        params = {'page': page, 'examples': 'true' if examples else 'false'}
+        if keyword is not None:
+            params['keyword'] = keyword
+        response = self.session.get(self.baseUrl + "words", params=params)
+        if response.status_code != 200:
+            raise Exception(f"GET unsuccessful ({response.status_code}): {response.text}")
+        words = response.json()
+        if not isinstance(words, list):
+            raise ValueError(f"Page {page} of /words was not a list of words")
+        return words
+
+    def iterWords(self, keyword=None, startPage=0, endPage=None, examples=True):
+        """ Yields every word from startPage up to (not including) endPage, or until an empty page.
+            The next page is requested in the background while the current one is consumed,
+            so at most two pages are held in memory at any time.
+        """
+        def fetch(page):
+            if endPage is not None and page >= endPage:
+                return None
+            return prefetcher.submit(self.getPage, page, keyword, examples)
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = startPage
+            nextPage = fetch(page)
+            try:
+                while nextPage is not None:
+                    words = nextPage.result()
+                    if not words:
+                        break
+                    page += 1
+                    nextPage = fetch(page)
+                    yield from words
+                    del words
+            finally:
+                # a page requested ahead of a consumer that stopped early is dropped if not yet started
+                if nextPage is not None:
+                    nextPage.cancel()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,96 @@
+""" Streaming readers for the JSON and CSV snapshots of the Igbo API dataset. """
+
+import csv
+import json
+import os
+
+DUMP_CHUNK_SIZE = 1 << 16
+
+# CSV cells holding these fields are JSON-encoded lists in the snapshots
+CSV_LIST_FIELDS = ['definitions', 'examples']
+
+
+def iterJsonRecords(fileptr, chunkSize=DUMP_CHUNK_SIZE):
+    """ Yields the objects of a JSON array (or of a file of concatenated/newline-delimited objects)
+        one at a time, holding no more than about one chunk plus one record in memory.
+        A truncated record or anything but whitespace after the last one raises a ValueError.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    atEnd = False
+    inArray = None
+    closed = False
+    recordCount = 0
+
+    def fill():
+        nonlocal buffer, pos, atEnd
+        chunk = fileptr.read(chunkSize)
+        if not chunk:
+            atEnd = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or (inArray and not closed and buffer[pos] == ',')):
+            pos += 1
+        if pos == len(buffer):
+            if atEnd:
+                if inArray and not closed:
+                    raise ValueError("JSON dump ended before its closing bracket")
+                return
+            fill()
+            continue
+        if inArray is None:
+            inArray = buffer[pos] == '['
+            if inArray:
+                pos += 1
+            continue
+        if inArray and buffer[pos] == ']' and not closed:
+            closed = True
+            pos += 1
+            continue
+        if closed or buffer[pos] != '{':
+            raise ValueError(f"JSON dump has unexpected content after record {recordCount}: {buffer[pos:pos + 20]!r}")
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            if atEnd:
+                raise ValueError(f"JSON dump has a truncated or malformed record after record {recordCount}") from error
+            fill()
+            continue
+        pos = end
+        recordCount += 1
+        yield record
+
+
+def csvRowToRecord(row):
+    """ Turns one CSV row into the same shape of record that /words returns. """
+    record = dict(row)
+    for field in CSV_LIST_FIELDS:
+        value = record.get(field) or ''
+        if value.startswith('['):
+            record[field] = json.loads(value)
+        elif field == 'examples':
+            record[field] = [{'igbo': value}] if value else []
+        else:
+            record[field] = [value] if value else []
+    return record
+
+
+def iterCsvRecords(fileptr):
+    for row in csv.DictReader(fileptr):
+        yield csvRowToRecord(row)
+
+
+def iterDumpRecords(path):
+    """ Yields every word record in a .json or .csv Igbo API snapshot without loading the whole file. """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, encoding="utf-8", newline='') as fileptr:
+            yield from iterCsvRecords(fileptr)
+    elif extension in ('.json', '.jsonl'):
+        with open(path, encoding="utf-8") as fileptr:
+            yield from iterJsonRecords(fileptr)
+    else:
+        raise ValueError(f"Don't know how to read an Igbo API dump from {path}")
@@ -0,0 +1,66 @@
+""" Append-only journal of how far each word of an import run has got, so a restarted run can resume. """
+
+import json
+import os
+
+# the stages a word passes through, in order; a word is exported instead of pushed on a dry run,
+# and pushed later when the batch file it was exported to is replayed
+STAGES = ['fetched', 'checked', 'built', 'exported', 'pushed']
+
+
+def getWordId(item):
+    # Igbo API words carry an id; fall back to the word itself for records without one
+    return str(item.get('id') or item.get('_id') or item['word'])
+
+
+class ImportJournal:
+    """ One JSON line per stage reached by a word, replayed into a dictionary on startup. """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        endsWithNewline = True
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fileptr:
+                for line in fileptr:
+                    endsWithNewline = line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # a run killed mid-write leaves at most one partial line at the end
+                        continue
+                    self.entries.setdefault(record['id'], {}).update(record)
+        self.fileptr = open(path, "a", encoding="utf-8")
+        if not endsWithNewline:
+            self.fileptr.write("\n")
+
+    def record(self, wordId, stage, **details):
+        if stage not in STAGES:
+            raise ValueError(f"{stage} is not an import stage")
+        record = {'id': wordId, 'stage': stage, **details}
+        self.entries.setdefault(wordId, {}).update(record)
+        self.fileptr.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.fileptr.flush()
+
+    def get(self, wordId):
+        return self.entries.get(wordId, {})
+
+    def stage(self, wordId):
+        return self.get(wordId).get('stage')
+
+    def hasReached(self, wordId, stage):
+        current = self.stage(wordId)
+        return current is not None and STAGES.index(current) >= STAGES.index(stage)
+
+    def isFinished(self, wordId):
+        """ A word is finished once it has been exported, pushed or found to be a duplicate. """
+        entry = self.get(wordId)
+        return entry.get('stage') in ('exported', 'pushed') or entry.get('duplicate') is True
+
+    def close(self):
+        self.fileptr.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,97 @@
+""" Local index of existing Wikidata lexemes, answering duplicate checks without a network call. """
+
+import argparse
+import gzip
+import json
+
+import tfsl.dumps
+from tfsl.textindex import TextIndex
+
+IGBO_LANGUAGE_QID = "Q33578"
+INDEX_FORMAT_VERSION = 1
+
+
+class LexemeDuplicateIndex:
+    """ Maps the lemmas and form representations of the lexemes in one language to their Lids.
+        Lookups match exactly, after NFC normalization, or optionally ignoring tone marks.
+    """
+    def __init__(self, language=IGBO_LANGUAGE_QID, lemmas=None, forms=None):
+        # texts are keyed under the lexeme language rather than per lemma language code
+        self.language = language
+        self.lemmas = TextIndex()
+        self.forms = TextIndex()
+        for text, lids in (lemmas or {}).items():
+            for lid in lids:
+                self.lemmas.add_text(language, text, lid)
+        for text, lids in (forms or {}).items():
+            for lid in lids:
+                self.forms.add_text(language, text, lid)
+
+    def addLexeme(self, lexemeJson):
+        lid = lexemeJson["id"]
+        for lemma in lexemeJson.get("lemmas", {}).values():
+            self.lemmas.add_text(self.language, lemma["value"], lid)
+        for form in lexemeJson.get("forms", []):
+            for representation in form.get("representations", {}).values():
+                self.forms.add_text(self.language, representation["value"], lid)
+
+    def lexemesWithLemma(self, word):
+        return self.lemmas.lookup_text(self.language, word)
+
+    def lexemesWithForm(self, word):
+        return self.forms.lookup_text(self.language, word)
+
+    def matchingLexemes(self, word, includeForms=True, toneInsensitive=False):
+        match = self.lexemesWithLemma(word)
+        lids = match.tone_insensitive if toneInsensitive else match.normalized
+        if includeForms:
+            formMatch = self.lexemesWithForm(word)
+            lids = lids | (formMatch.tone_insensitive if toneInsensitive else formMatch.normalized)
+        return lids
+
+    def isDuplicate(self, word, includeForms=True, toneInsensitive=False):
+        """ Same question as the lexeme-forms duplicates endpoint: is word already a lexeme? """
+        return bool(self.matchingLexemes(word, includeForms, toneInsensitive))
+
+    def __len__(self):
+        return len(self.lemmas)
+
+    @classmethod
+    def fromDump(cls, dumpPath, language=IGBO_LANGUAGE_QID):
+        """ Builds the index from a Wikidata lexemes dump (plain, .gz or .bz2), one lexeme at a time. """
+        index = cls(language)
+        lineFilter = tfsl.dumps.language_line_filter(language)
+        for entity in tfsl.dumps.iter_dump_entities(dumpPath, lineFilter):
+            if entity.get("type") == "lexeme" and entity.get("language") == language:
+                index.addLexeme(entity)
+        return index
+
+    def save(self, path):
+        contents = {
+            "version": INDEX_FORMAT_VERSION,
+            "language": self.language,
+            "lemmas": {text: sorted(lids) for (_, text), lids in self.lemmas.exact.items()},
+            "forms": {text: sorted(lids) for (_, text), lids in self.forms.exact.items()},
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as fileptr:
+            json.dump(contents, fileptr, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as fileptr:
+            contents = json.load(fileptr)
+        if contents.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {INDEX_FORMAT_VERSION} duplicate index")
+        return cls(contents["language"], contents["lemmas"], contents["forms"])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build a local duplicate index from a Wikidata lexemes dump.")
+    parser.add_argument("dump", help="path to latest-lexemes.json(.gz|.bz2)")
+    parser.add_argument("output", help="where to write the index (gzip-compressed JSON)")
+    parser.add_argument("--language", default=IGBO_LANGUAGE_QID, help="Qid of the lexeme language to index")
+    args = parser.parse_args()
+
+    duplicateIndex = LexemeDuplicateIndex.fromDump(args.dump, args.language)
+    duplicateIndex.save(args.output)
+    print(f"Indexed {len(duplicateIndex)} lemmas and {len(duplicateIndex.forms)} form representations")
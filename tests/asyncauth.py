@@ -0,0 +1,97 @@
+import json
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import tfsl.scheduler
+from tfsl.asyncauth import AsyncWikibaseSession
+
+class FakeWikibase:
+    """ Answers the few API requests a session makes, rejecting the first CSRF token and lagging once.
+        A successful login sets a session cookie, without which asserting a user fails as it does on a real wiki.
+    """
+    def __init__(self):
+        self.requests = []
+        self.csrf_tokens = 0
+        self.lagged = False
+
+    async def handle(self, request):
+        params = dict(request.query)
+        params.update(await request.post())
+        self.requests.append(params)
+        if "assertuser" in params and request.cookies.get("wikisession") != "Username":
+            return web.json_response({"error": {"code": "assertnameduserfailed"}})
+        action = params.get("action")
+        if action == "query" and params.get("type") == "login":
+            return web.json_response({"query": {"tokens": {"logintoken": "login+\\"}}})
+        if action == "query":
+            self.csrf_tokens += 1
+            return web.json_response({"query": {"tokens": {"csrftoken": f"csrf{self.csrf_tokens}+\\"}}})
+        if action == "login":
+            result = "Success" if params["lgtoken"] == "login+\\" and params["lgpassword"] == "secret" else "Failed"
+            response = web.json_response({"login": {"result": result, "reason": "bad password"}})
+            if result == "Success":
+                response.set_cookie("wikisession", "Username")
+            return response
+        if action == "wbgetentities":
+            return web.json_response({"entities": {lid: {"id": lid, "props": params.get("props")} for lid in params["ids"].split("|")}})
+        if action == "wbeditentity":
+            if params["token"] == "csrf1+\\":
+                return web.json_response({"error": {"code": "badtoken"}})
+            if not self.lagged:
+                self.lagged = True
+                return web.json_response({"error": {"code": "maxlag"}}, headers={"Retry-After": "0"})
+            return web.json_response({"entity": dict(json.loads(params["data"]), id="L1"), "success": 1})
+        return web.json_response({"error": {"code": "badvalue"}})
+
+class TestAsyncWikibaseSessionMethods(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.wikibase = FakeWikibase()
+        app = web.Application()
+        app.router.add_route("*", "/w/api.php", self.wikibase.handle)
+        # cookies are only kept for host names, not IP addresses
+        self.server = TestServer(app, host="localhost")
+        await self.server.start_server()
+        self.url = str(self.server.make_url("/w/api.php"))
+        self.scheduler = tfsl.scheduler.WriteScheduler(edits_per_minute=6000, base_delay=0.0)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_get_entities(self):
+        async with AsyncWikibaseSession(URL=self.url, scheduler=self.scheduler, concurrency=4) as session:
+            entities = await session.get_entities([f"L{number}" for number in range(1, 121)])
+        self.assertEqual(len(entities), 120)
+        self.assertEqual(len(self.wikibase.requests), 3)
+
+    async def test_push_json(self):
+        async with AsyncWikibaseSession("Username@bot", "secret", URL=self.url, scheduler=self.scheduler) as session:
+            self.assertTrue(session.logged_in)
+            response = await session.push_json({"lemmas": {}, "lexicalCategory": "Q1084"}, "test")
+        self.assertEqual(response["entity"]["id"], "L1")
+        edits = [request for request in self.wikibase.requests if request.get("action") == "wbeditentity"]
+        self.assertEqual([edit["token"] for edit in edits], ["csrf1+\\", "csrf2+\\", "csrf2+\\"])
+        self.assertEqual(edits[-1]["new"], "lexeme")
+        self.assertEqual(edits[-1]["assertuser"], "Username")
+        self.assertEqual(edits[-1]["maxlag"], "5")
+
+    async def test_reuse_after_close(self):
+        session = AsyncWikibaseSession("Username@bot", "secret", URL=self.url, scheduler=self.scheduler)
+        for _ in range(2):
+            async with session:
+                self.assertTrue(session.logged_in)
+                await session.post({"action": "wbeditentity", "token": "__AUTO__", "data": "{}", "new": "lexeme"})
+            self.assertFalse(session.logged_in)
+        logins = [request for request in self.wikibase.requests if request.get("action") == "login"]
+        self.assertEqual(len(logins), 2)
+        self.assertTrue(all("assertuser" not in login for login in logins))
+
+    async def test_failed_login(self):
+        async with AsyncWikibaseSession("Username", "wrong", URL=self.url, scheduler=self.scheduler, lazy=True) as session:
+            self.assertFalse(session.logged_in)
+            with self.assertRaises(PermissionError):
+                await session.login()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import unittest
+
+import tfsl.scheduler
+from tfsl.auth import WikibaseSession
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = json.dumps(data)
+
+    def json(self):
+        return json.loads(self.text)
+
+class FakeWikibase:
+    """ Stands in for the requests.Session of a WikibaseSession, answering the few API requests it makes.
+        The first CSRF token is rejected, and asserting a user before logging in fails as it does on a real wiki.
+    """
+    def __init__(self):
+        self.requests = []
+        self.csrf_tokens = 0
+        self.logged_in = False
+
+    def get(self, url, params, headers):
+        return self.handle(dict(params))
+
+    def post(self, url, data, headers, auth):
+        return self.handle(dict(data))
+
+    def handle(self, params):
+        self.requests.append(params)
+        if "assertuser" in params and not self.logged_in:
+            return FakeResponse({"error": {"code": "assertnameduserfailed"}})
+        action = params.get("action")
+        if action == "query" and params.get("type") == "login":
+            return FakeResponse({"query": {"tokens": {"logintoken": "login+\\"}}})
+        if action == "query":
+            self.csrf_tokens += 1
+            return FakeResponse({"query": {"tokens": {"csrftoken": f"csrf{self.csrf_tokens}+\\"}}})
+        if action == "login":
+            self.logged_in = params["lgtoken"] == "login+\\" and params["lgpassword"] == "secret"
+            return FakeResponse({"login": {"result": "Success" if self.logged_in else "Failed", "reason": "bad password"}})
+        if action == "wbeditentity":
+            if params["token"] == "csrf1+\\":
+                return FakeResponse({"error": {"code": "badtoken"}})
+            return FakeResponse({"entity": dict(json.loads(params["data"]), id="L1"), "success": 1})
+        return FakeResponse({"error": {"code": "badvalue"}})
+
+class TestWikibaseSessionMethods(unittest.TestCase):
+    def setUp(self):
+        self.wikibase = FakeWikibase()
+        self.scheduler = tfsl.scheduler.WriteScheduler(edits_per_minute=6000, base_delay=0.0)
+
+    def make_session(self, password, lazy):
+        session = WikibaseSession("Username@bot", password, URL="https://wikibase.invalid/w/api.php", lazy=True, scheduler=self.scheduler)
+        session.session = self.wikibase
+        if not lazy:
+            session.login()
+        return session
+
+    def test_lazy_login_and_token_renewal(self):
+        session = self.make_session("secret", lazy=True)
+        self.assertEqual(self.wikibase.requests, [])
+        response = session.push_json({"lemmas": {}, "lexicalCategory": "Q1084"}, "test")
+        self.assertEqual(response["entity"]["id"], "L1")
+        self.assertTrue(session.logged_in)
+
+        login = [request for request in self.wikibase.requests if request.get("action") == "login"]
+        self.assertEqual(len(login), 1)
+        self.assertEqual(login[0]["lgname"], "Username@bot")
+        self.assertNotIn("assertuser", login[0])
+        self.assertNotIn("token", login[0])
+
+        edits = [request for request in self.wikibase.requests if request.get("action") == "wbeditentity"]
+        self.assertEqual([edit["token"] for edit in edits], ["csrf1+\\", "csrf2+\\"])
+        self.assertEqual(edits[-1]["assertuser"], "Username")
+        self.assertEqual(edits[-1]["new"], "lexeme")
+
+    def test_failed_login(self):
+        with self.assertRaises(PermissionError):
+            self.make_session("wrong", lazy=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from tfsl.batch import BatchWriter, iter_batch, replay_batch
+from tfsl.languages import langs
+from tfsl.lexeme import Lexeme
+
+class RecordingSession:
+    def __init__(self):
+        self.pushed = []
+
+    def push_json(self, data, summary=None, new=None):
+        if data["lemmas"]["ig"]["value"] == "fail":
+            raise PermissionError("API returned error")
+        self.pushed.append((data, summary, new))
+        return {"entity": {"id": f"L{len(self.pushed)}"}, "success": 1}
+
+class TestBatchMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "batch.jsonl")
+        self.lexeme1 = Lexeme("ọkụ" @ langs.ig_, langs.ig_, "Q1084")
+        self.lexeme2 = Lexeme("fail" @ langs.ig_, langs.ig_, "Q1084")
+        self.lexeme3 = Lexeme("mmiri" @ langs.ig_, langs.ig_, "Q1084")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_batch(self):
+        with BatchWriter(self.path) as writer:
+            writer.write(self.lexeme1, "new lexeme", wordId="1")
+        records = list(iter_batch(self.path))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["data"], self.lexeme1.__jsonout__())
+        self.assertEqual(records[0]["summary"], "new lexeme")
+        self.assertEqual(records[0]["new"], "lexeme")
+        self.assertEqual(records[0]["wordId"], "1")
+
+    def test_write_flushed(self):
+        with BatchWriter(self.path) as writer:
+            writer.write(self.lexeme1, "new lexeme", wordId="1")
+            self.assertEqual([record["wordId"] for record in iter_batch(self.path)], ["1"])
+
+    def test_replay_batch(self):
+        with BatchWriter(self.path) as writer:
+            for lexeme in [self.lexeme1, self.lexeme2, self.lexeme3]:
+                writer.write(lexeme, "new lexeme")
+        session = RecordingSession()
+        results = [result for _, result in replay_batch(session, iter_batch(self.path))]
+        self.assertEqual(results[0]["entity"]["id"], "L1")
+        self.assertIsInstance(results[1], PermissionError)
+        self.assertEqual(results[2]["entity"]["id"], "L2")
+        self.assertEqual([new for _, _, new in session.pushed], ["lexeme", "lexeme"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from tfsl.cache import DirectoryCache, KeyLocks, LRUCache, MemoryCache, SQLiteCache, open_cache
+from tfsl.projection import projection
+
+def put_entities(path, start):
+    cache = SQLiteCache(path)
+    for number in range(start, start + 50):
+        cache.put(f"L{number}", {"id": f"L{number}", "lastrevid": number})
+    cache.close()
+
+def claim_keys(directory, keys):
+    with KeyLocks(directory, stripes=4).claim(keys) as claimed:
+        return claimed
+
+class TestEntityCacheMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.entities = {f"L{number}": {"id": f"L{number}", "lastrevid": number, "lemmas": {}} for number in range(1, 4)}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check_backend(self, cache):
+        self.assertIsNone(cache.get("L1"))
+        cache.put_many(self.entities, fetched_at=1000.0)
+        entries = cache.get_many(["L1", "L3", "L4"])
+        self.assertEqual(sorted(entries), ["L1", "L3"])
+        self.assertEqual(entries["L3"].data, self.entities["L3"])
+        self.assertEqual(entries["L3"].lastrevid, 3)
+        self.assertEqual(entries["L3"].fetched_at, 1000.0)
+        cache.put("L1", {"id": "L1", "lastrevid": 10})
+        self.assertEqual(cache.get("L1").lastrevid, 10)
+        self.assertGreater(cache.get("L1").fetched_at, 1000.0)
+        cache.delete_many(["L1", "L4"])
+        self.assertEqual(sorted(cache.get_many(self.entities)), ["L2", "L3"])
+        self.assertIsNone(cache.get("L2").projection)
+        cache.put_many({"L2": {"id": "L2", "lastrevid": 2, "claims": {}}}, projection=projection(["claims"]))
+        self.assertEqual(cache.get("L2").projection, projection(["claims"]))
+        self.assertEqual(cache.get("L2").data, {"id": "L2", "lastrevid": 2, "claims": {}})
+        # the projection is kept apart from the entity JSON, whatever keys that has
+        entity_json = {"id": "L3", "lastrevid": 3, "tfsl-projection": {"props": ["info"], "languages": []}}
+        cache.put("L3", entity_json)
+        self.assertEqual(cache.get("L3").data, entity_json)
+        self.assertIsNone(cache.get("L3").projection)
+        cache.close()
+
+    def test_directory_cache(self):
+        self.check_backend(DirectoryCache(os.path.join(self.directory.name, "entities")))
+
+    def test_sqlite_cache(self):
+        self.check_backend(open_cache("sqlite", self.directory.name))
+        with self.assertRaises(ValueError):
+            open_cache("memcached", self.directory.name)
+
+    def test_directory_cache_migration(self):
+        with open(os.path.join(self.directory.name, "L1.json"), "w", encoding="utf-8") as fileptr:
+            json.dump(self.entities["L1"], fileptr)
+        cache = DirectoryCache(self.directory.name)
+        self.assertEqual(cache.get("L1").data, self.entities["L1"])
+        cache.put("L1", self.entities["L1"])
+        self.assertEqual([entry.name for entry in os.scandir(self.directory.name) if entry.is_file()], ["L1.json.gz"])
+        with open(os.path.join(self.directory.name, "L1.json.gz"), "rb") as fileptr:
+            self.assertEqual(fileptr.read(2), b"\x1f\x8b")
+        self.assertEqual(DirectoryCache(self.directory.name, "none").get("L1").data, self.entities["L1"])
+
+    def test_corrupt_entries(self):
+        cache = DirectoryCache(self.directory.name)
+        cache.put_many(self.entities)
+        with open(cache.filename("L1"), "r+b") as fileptr:
+            fileptr.truncate(10)
+        with open(cache.filename("L2"), "wb") as fileptr:
+            fileptr.write(b'{"id": "L2", "lastr')
+        self.assertEqual(sorted(cache.get_many(self.entities)), ["L3"])
+        self.assertEqual([name for name in os.listdir(self.directory.name) if name.endswith(".tmp")], [])
+
+    def test_sqlite_cache_compressions(self):
+        path = os.path.join(self.directory.name, "entities.sqlite3")
+        SQLiteCache(path, "none").put("L1", self.entities["L1"])
+        cache = SQLiteCache(path, "zstd")
+        cache.put("L2", self.entities["L2"])
+        self.assertEqual(sorted(cache.get_many(["L1", "L2"])), ["L1", "L2"])
+
+    def test_sqlite_cache_processes(self):
+        path = os.path.join(self.directory.name, "entities.sqlite3")
+        SQLiteCache(path).close()
+        processes = [multiprocessing.Process(target=put_entities, args=(path, start)) for start in (0, 50, 100)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(len(SQLiteCache(path).get_many(f"L{number}" for number in range(150))), 150)
+
+    def test_sqlite_cache_upgrade(self):
+        path = os.path.join(self.directory.name, "entities.sqlite3")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE entities (id TEXT PRIMARY KEY, lastrevid INTEGER, fetched_at REAL NOT NULL, data BLOB NOT NULL)")
+        connection.execute("INSERT INTO entities VALUES (?, ?, ?, ?)", ("L1", 1, 1000.0, json.dumps(self.entities["L1"]).encode("utf-8")))
+        connection.commit()
+        connection.close()
+        cache = SQLiteCache(path)
+        self.assertEqual(cache.get("L1").data, self.entities["L1"])
+        self.assertIsNone(cache.get("L1").projection)
+        cache.put_many({"L2": self.entities["L2"]}, projection=projection(["claims"]))
+        self.assertEqual(cache.get("L2").projection, projection(["claims"]))
+        cache.close()
+
+    def test_sqlite_cache_close(self):
+        cache = SQLiteCache(os.path.join(self.directory.name, "entities.sqlite3"))
+        cache.put_many(self.entities)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(cache.get, self.entities))
+        connections = list(cache.connections)
+        self.assertGreater(len(connections), 1)
+        cache.close()
+        for connection in connections:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                connection.execute("SELECT 1")
+        self.assertEqual(cache.get("L1").data, self.entities["L1"])
+        cache.close()
+
+class TestKeyLocksMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.locks = KeyLocks(self.directory.name, stripes=4)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lock_files_bounded(self):
+        for number in range(100):
+            with self.locks.claim([f"L{number}", f"L{number + 1}"]) as claimed:
+                self.assertEqual(claimed, [f"L{number}", f"L{number + 1}"])
+        self.assertLessEqual(len(os.listdir(self.directory.name)), 4)
+
+    def test_claims_skip_held_keys(self):
+        first, second = [key for key in (f"L{number}" for number in range(100)) if self.locks.stripe(key) == 0][:2]
+        with self.locks.claim([first]) as claimed:
+            self.assertEqual(claimed, [first])
+            # other threads skip the same key, but not others with the same lock file
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(executor.submit(lambda: self.locks.try_acquire(first)).result(), False)
+            with self.locks.claim([first, second]) as also_claimed:
+                self.assertEqual(also_claimed, [second])
+            # other processes skip every key with the same lock file
+            with multiprocessing.Pool(1) as pool:
+                self.assertEqual(pool.apply(claim_keys, (self.directory.name, [second, "L1"])), ["L1"] if self.locks.stripe("L1") else [])
+        self.assertEqual(self.locks.held, set())
+        with multiprocessing.Pool(1) as pool:
+            self.assertEqual(pool.apply(claim_keys, (self.directory.name, [first, second])), [first, second])
+
+class TestGarbageCollectionMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.now = time.time()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fill(self, cache, set_access):
+        """ Caches L1 to L4, retrieved an hour apart from L1 onwards, then last used in the order L2, L1, L4, L3. """
+        for number, hours_unused in zip(range(1, 5), [3, 4, 1, 2]):
+            fetched_at = self.now - 3600 * (9 - number)
+            cache.put(f"L{number}", {"id": f"L{number}", "lastrevid": number}, fetched_at=fetched_at)
+            set_access(cache, f"L{number}", fetched_at, self.now - 3600 * hours_unused)
+
+    def check_collection(self, make_cache, set_access):
+        cache = make_cache("by_age")
+        self.fill(cache, set_access)
+        report = cache.collect_garbage(max_age=6.5 * 3600)
+        self.assertEqual((report.scanned, report.removed, report.remaining_entries), (4, 2, 2))
+        self.assertEqual(sorted(cache.get_many(["L1", "L2", "L3", "L4"])), ["L3", "L4"])
+
+        cache = make_cache("by_entries")
+        self.fill(cache, set_access)
+        report = cache.collect_garbage(max_entries=2)
+        self.assertEqual((report.removed, report.remaining_entries), (2, 2))
+        self.assertEqual(sorted(cache.get_many(["L1", "L2", "L3", "L4"])), ["L3", "L4"])
+
+        cache = make_cache("by_bytes")
+        self.fill(cache, set_access)
+        size = cache.collect_garbage().remaining_bytes
+        report = cache.collect_garbage(max_bytes=size * 3 // 4)
+        self.assertLessEqual(report.remaining_bytes, size * 3 // 4)
+        self.assertEqual(report.reclaimed_bytes, size - report.remaining_bytes)
+        self.assertEqual(sorted(cache.get_many(["L1", "L2", "L3", "L4"])), ["L1", "L3", "L4"])
+
+    def test_directory_collection(self):
+        def set_access(cache, entity_id, fetched_at, accessed_at):
+            os.utime(cache.filename(entity_id), (accessed_at, fetched_at))
+        self.check_collection(lambda name: DirectoryCache(os.path.join(self.directory.name, name)), set_access)
+
+        cache = DirectoryCache(os.path.join(self.directory.name, "by_entries"))
+        leftover = os.path.join(cache.path, ".L5.abc.tmp")
+        with open(leftover, "wb"):
+            pass
+        os.utime(leftover, (self.now - 7200, self.now - 7200))
+        self.assertEqual(cache.collect_garbage().scanned, 2)
+        self.assertFalse(os.path.exists(leftover))
+
+    def test_sqlite_collection(self):
+        def set_access(cache, entity_id, fetched_at, accessed_at):
+            with cache.connection() as connection:
+                connection.execute("UPDATE entities SET accessed_at = ? WHERE id = ?", (accessed_at, entity_id))
+        self.check_collection(lambda name: SQLiteCache(os.path.join(self.directory.name, name + ".sqlite3")), set_access)
+
+class TestMemoryCacheMethods(unittest.TestCase):
+    def test_lru_cache_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("L1", 1)
+        cache.put("L2", 2)
+        self.assertEqual(cache.get("L1"), 1)
+        cache.put("L3", 3)
+        self.assertIsNone(cache.get("L2"))
+        self.assertEqual(cache.get("L3"), 3)
+        self.assertEqual(tuple(cache.stats()), (2, 1, 1, 2, 0))
+
+    def test_lru_cache_size(self):
+        cache = LRUCache(max_size=10, sizeof=len)
+        cache.put("L1", "abcd")
+        cache.put("L2", "efgh")
+        cache.put("L3", "ijkl")
+        self.assertEqual(list(cache.entries), ["L2", "L3"])
+        self.assertEqual(cache.stats().size, 8)
+        cache.put("L4", "a" * 20)
+        self.assertEqual(len(cache), 0)
+
+    def test_memory_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backing = DirectoryCache(directory)
+            backing.put("L1", {"id": "L1", "lastrevid": 1})
+            cache = MemoryCache(backing, max_entries=10)
+            with mock.patch.object(backing, "get_many", wraps=backing.get_many) as backing_get:
+                first = cache.get("L1")
+                self.assertIs(cache.get("L1"), first)
+                self.assertIsNone(cache.get("L2"))
+                self.assertEqual(backing_get.call_count, 2)
+            cache.touch_many(["L1"], 5.0)
+            self.assertEqual(cache.get("L1").fetched_at, 5.0)
+            self.assertEqual(backing.get("L1").fetched_at, 5.0)
+            self.assertEqual(cache.stats().hits, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import createIgboApiLexemes
+from importJournal import ImportJournal
+from lexemeDuplicateIndex import LexemeDuplicateIndex
+from tfsl.batch import BatchWriter, iter_batch
+
+DATATYPES = {"P5831": "monolingualtext", "P854": "url", "P953": "url"}
+
+class RecordingSession:
+    def __init__(self):
+        self.pushed = []
+
+    def push_json(self, data, summary=None, new=None):
+        self.pushed.append(data["lemmas"]["ig"]["value"])
+        return {"entity": {"id": f"L{len(self.pushed)}"}, "success": 1}
+
+class TestCreateIgboApiLexemesMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.directory.name, "journal.jsonl")
+        self.batch_path = os.path.join(self.directory.name, "batch.jsonl")
+        self.words = [
+            {"id": "1", "word": "rie", "wordClass": "AV", "definitions": ["eat"], "examples": [{"igbo": "Rie nri."}]},
+            {"id": "2", "word": "ọkụ", "wordClass": "NNC", "definitions": ["fire"], "examples": [{"igbo": "Ọkụ na-enwu."}]},
+        ]
+        self.datatypes = mock.patch("tfsl.utils.values_datatype", side_effect=DATATYPES.__getitem__)
+        self.datatypes.start()
+
+    def tearDown(self):
+        self.datatypes.stop()
+        self.directory.cleanup()
+
+    def export(self):
+        with ImportJournal(self.journal_path) as journal, BatchWriter(self.batch_path) as writer:
+            words = [dict(word) for word in self.words]
+            createIgboApiLexemes.createIgboApiLexemesBatch(words, duplicateIndex=LexemeDuplicateIndex(), journal=journal, batchWriter=writer)
+
+    def replay(self, use_journal=True):
+        session = RecordingSession()
+        with ImportJournal(self.journal_path) as journal, mock.patch("tfsl.shared_session", return_value=session):
+            createIgboApiLexemes.replayLexemeBatch(self.batch_path, journal if use_journal else None)
+        return session.pushed
+
+    def test_export_rerun(self):
+        self.export()
+        with ImportJournal(self.journal_path) as journal:
+            self.assertEqual(journal.stage("1"), "exported")
+            self.assertTrue(journal.isFinished("2"))
+        self.export()
+        self.assertEqual([record["wordId"] for record in iter_batch(self.batch_path)], ["1", "2"])
+
+        self.assertEqual(self.replay(), ["rie", "ọkụ"])
+        with ImportJournal(self.journal_path) as journal:
+            self.assertEqual(journal.stage("1"), "pushed")
+            self.assertEqual(journal.get("2")["lid"], "L2")
+        self.assertEqual(self.replay(), [])
+
+    def test_replay_repeated_words(self):
+        self.export()
+        with open(self.batch_path, encoding="utf-8") as fileptr:
+            lines = fileptr.readlines()
+        with open(self.batch_path, "a", encoding="utf-8") as fileptr:
+            fileptr.writelines(lines)
+        self.assertEqual(self.replay(use_journal=False), ["rie", "ọkụ"])
+
+if __name__ == '__main__':
+    unittest.main()
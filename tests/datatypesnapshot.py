@@ -0,0 +1,39 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from tfsl.datatypesnapshot import iter_dump_datatypes, load_snapshot, write_snapshot
+from tfsl.utils import values_datatype, values_type
+
+class TestDatatypeSnapshotMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_snapshot_from_dump(self):
+        dump_path = os.path.join(self.directory.name, "dump.json.gz")
+        with gzip.open(dump_path, "wt", encoding="utf-8") as fileptr:
+            fileptr.writelines([
+                '[\n',
+                '{"type":"item","id":"Q1","labels":{}},\n',
+                '{"type":"property","datatype":"url","id":"P854","labels":{}},\n',
+                '{"type":"property","datatype":"monolingualtext","id":"P1476","labels":{}},\n',
+                '{"type":"property","datatype":"url","id":"P953","labels":{}}\n',
+                ']\n'
+            ])
+        snapshot_path = os.path.join(self.directory.name, "snapshot.json")
+        self.assertEqual(write_snapshot(iter_dump_datatypes(dump_path), snapshot_path, "dump.json.gz"), 3)
+        self.assertEqual(load_snapshot(snapshot_path), {"P854": "url", "P953": "url", "P1476": "monolingualtext"})
+
+    def test_missing_snapshot(self):
+        self.assertEqual(load_snapshot(os.path.join(self.directory.name, "missing.json")), {})
+
+    def test_bundled_snapshot(self):
+        self.assertEqual(values_datatype("P5831"), "monolingualtext")
+        self.assertEqual(values_type("P854"), "string")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import bz2
+import gzip
+import os
+import tempfile
+import unittest
+
+from tfsl.dumps import iter_dump_entities, iter_dump_entities_parallel, language_line_filter, parse_dump_line
+
+class TestDumpMethods(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            '[\n',
+            '{"type":"lexeme","id":"L1","language":"Q33578","lemmas":{}},\n',
+            '{"type":"lexeme","id":"L2","language":"Q1860","lemmas":{}}\n',
+            ']\n'
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_dump(self, name, opener):
+        path = os.path.join(self.directory.name, name)
+        with opener(path, "wt", encoding="utf-8") as fileptr:
+            fileptr.writelines(self.lines)
+        return path
+
+    def test_parse_dump_line(self):
+        self.assertIsNone(parse_dump_line('[\n'))
+        self.assertIsNone(parse_dump_line(']'))
+        self.assertEqual(parse_dump_line(self.lines[1])["id"], "L1")
+
+    def test_iter_compressed_dumps(self):
+        for name, opener in [("dump.json", open), ("dump.json.gz", gzip.open), ("dump.json.bz2", bz2.open)]:
+            path = self.write_dump(name, opener)
+            self.assertEqual([entity["id"] for entity in iter_dump_entities(path)], ["L1", "L2"])
+
+    def test_language_line_filter(self):
+        path = self.write_dump("dump.json.gz", gzip.open)
+        entities = list(iter_dump_entities(path, language_line_filter("Q33578")))
+        self.assertEqual([entity["id"] for entity in entities], ["L1"])
+
+    def test_iter_dump_entities_parallel(self):
+        self.lines[2:2] = [f'{{"type":"lexeme","id":"L{number}","language":"Q33578","lemmas":{{}}}},\n' for number in range(3, 30)]
+        path = self.write_dump("dump.json.bz2", bz2.open)
+        expected = [entity["id"] for entity in iter_dump_entities(path)]
+        for processes in (1, 2):
+            entities = iter_dump_entities_parallel(path, processes=processes, batch_size=4)
+            self.assertEqual([entity["id"] for entity in entities], expected)
+        entities = iter_dump_entities_parallel(path, language_line_filter("Q1860"), processes=2, batch_size=4)
+        self.assertEqual([entity["id"] for entity in entities], ["L2"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+import unicodedata
+
+from lexemeDuplicateIndex import IGBO_LANGUAGE_QID, LexemeDuplicateIndex
+
+class TestLexemeDuplicateIndexMethods(unittest.TestCase):
+    def setUp(self):
+        self.lexemes = [
+            {"type": "lexeme", "id": "L1", "language": IGBO_LANGUAGE_QID, "lexicalCategory": "Q1084",
+             "lemmas": {"ig": {"language": "ig", "value": "àkwụ́kwọ́"}},
+             "forms": [{"id": "L1-F1", "representations": {"ig": {"language": "ig", "value": "akwụkwọ ndị"}}}]},
+            {"type": "lexeme", "id": "L2", "language": IGBO_LANGUAGE_QID, "lexicalCategory": "Q24905",
+             "lemmas": {"ig": {"language": "ig", "value": "rie"}}, "forms": []},
+            {"type": "lexeme", "id": "L3", "language": "Q1860", "lexicalCategory": "Q1084",
+             "lemmas": {"en": {"language": "en", "value": "book"}}, "forms": []},
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "latest-lexemes.json.gz")
+        with gzip.open(self.dump_path, "wt", encoding="utf-8") as fileptr:
+            fileptr.write("[\n")
+            fileptr.write(",\n".join(json.dumps(lexeme, ensure_ascii=False, separators=(",", ":")) for lexeme in self.lexemes))
+            fileptr.write("\n]\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lookups(self):
+        index = LexemeDuplicateIndex.fromDump(self.dump_path)
+        self.assertEqual(len(index), 2)
+        self.assertTrue(index.isDuplicate("rie"))
+        self.assertTrue(index.isDuplicate(unicodedata.normalize("NFD", "àkwụ́kwọ́")))
+        self.assertEqual(index.matchingLexemes("akwụkwọ ndị"), {"L1"})
+        self.assertFalse(index.isDuplicate("akwụkwọ ndị", includeForms=False))
+        self.assertFalse(index.isDuplicate("book"))
+        self.assertFalse(index.isDuplicate("ji"))
+        self.assertFalse(index.isDuplicate("akwụkwọ"))
+        self.assertTrue(index.isDuplicate("akwụkwọ", toneInsensitive=True))
+
+    def test_save_and_load(self):
+        index = LexemeDuplicateIndex.fromDump(self.dump_path)
+        index_path = os.path.join(self.directory.name, "index.json.gz")
+        index.save(index_path)
+        loaded = LexemeDuplicateIndex.load(index_path)
+        self.assertEqual(loaded.language, IGBO_LANGUAGE_QID)
+        self.assertEqual(len(loaded), len(index))
+        for word in ["rie", "àkwụ́kwọ́", "akwụkwọ ndị", "book", "ji"]:
+            self.assertEqual(loaded.matchingLexemes(word), index.matchingLexemes(word))
+        self.assertEqual(loaded.matchingLexemes("akwụkwọ", toneInsensitive=True), {"L1"})
+
+    def test_load_other_version(self):
+        index_path = os.path.join(self.directory.name, "index.json.gz")
+        with gzip.open(index_path, "wt", encoding="utf-8") as fileptr:
+            json.dump({"version": 0, "language": IGBO_LANGUAGE_QID, "lemmas": {}, "forms": {}}, fileptr)
+        with self.assertRaises(ValueError):
+            LexemeDuplicateIndex.load(index_path)
+
+if __name__ == '__main__':
+    unittest.main()
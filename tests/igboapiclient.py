@@ -0,0 +1,49 @@
+import unittest
+
+from igboApiClient import IgboApiClient
+
+class StubClient(IgboApiClient):
+    """ Serves pages of two words each from memory, recording which pages were requested. """
+    def __init__(self, pageCount, failingPage=None):
+        super().__init__("key")
+        self.pageCount = pageCount
+        self.failingPage = failingPage
+        self.requested = []
+
+    def getPage(self, page, keyword=None, examples=True):
+        self.requested.append(page)
+        if page == self.failingPage:
+            raise Exception("GET unsuccessful (500): server error")
+        if page >= self.pageCount:
+            return []
+        return [{"id": f"{page}-{index}", "keyword": keyword} for index in range(2)]
+
+class TestIgboApiClientMethods(unittest.TestCase):
+    def test_empty_page_stops(self):
+        with StubClient(3) as client:
+            words = list(client.iterWords())
+        self.assertEqual([word["id"] for word in words], ["0-0", "0-1", "1-0", "1-1", "2-0", "2-1"])
+        self.assertEqual(client.requested, [0, 1, 2, 3])
+
+    def test_end_page(self):
+        with StubClient(10) as client:
+            words = list(client.iterWords(keyword="rie", startPage=2, endPage=4))
+            self.assertEqual([word["id"] for word in words], ["2-0", "2-1", "3-0", "3-1"])
+            self.assertEqual(words[0]["keyword"], "rie")
+            self.assertEqual(client.requested, [2, 3])
+
+            client.requested = []
+            self.assertEqual(list(client.iterWords(startPage=4, endPage=4)), [])
+            self.assertEqual(list(client.iterWords(startPage=5, endPage=4)), [])
+            self.assertEqual(client.requested, [])
+
+    def test_errors_propagate(self):
+        with StubClient(10, failingPage=1) as client:
+            words = client.iterWords()
+            self.assertEqual([next(words), next(words)], [{"id": "0-0", "keyword": None}, {"id": "0-1", "keyword": None}])
+            with self.assertRaisesRegex(Exception, "500"):
+                next(words)
+            self.assertEqual(client.requested, [0, 1])
+
+if __name__ == '__main__':
+    unittest.main()
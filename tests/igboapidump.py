@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from igboApiDump import iterCsvRecords, iterDumpRecords, iterJsonRecords
+
+class TestIgboApiDumpMethods(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"id": "1", "word": "àkwụ́kwọ́", "wordClass": "NNC", "definitions": ["book", "paper"]},
+            {"id": "2", "word": "rie", "wordClass": "AV", "definitions": ["eat"], "examples": [{"igbo": "Rie nri."}]},
+            {"id": "3", "word": "ọ́kụ̀", "wordClass": "NNC", "definitions": ["fire"]},
+        ]
+
+    def read_json(self, text, chunk_size=7):
+        return list(iterJsonRecords(io.StringIO(text), chunkSize=chunk_size))
+
+    def test_top_level_array(self):
+        text = json.dumps(self.records, ensure_ascii=False, indent=2)
+        self.assertEqual(self.read_json(text), self.records)
+        self.assertEqual(self.read_json(text, chunk_size=1 << 16), self.records)
+        self.assertEqual(self.read_json("[]"), [])
+        self.assertEqual(self.read_json(" [\n]\n"), [])
+
+    def test_records_split_across_chunks(self):
+        text = json.dumps(self.records, ensure_ascii=False)
+        for chunk_size in range(1, len(text) + 1, 5):
+            self.assertEqual(self.read_json(text, chunk_size=chunk_size), self.records)
+
+    def test_newline_delimited(self):
+        text = "\n".join(json.dumps(record, ensure_ascii=False) for record in self.records) + "\n"
+        self.assertEqual(self.read_json(text), self.records)
+        self.assertEqual(self.read_json(text.replace("\n", "")), self.records)
+        self.assertEqual(self.read_json(""), [])
+
+    def test_truncated_tail(self):
+        array_text = json.dumps(self.records, ensure_ascii=False)
+        lines_text = "\n".join(json.dumps(record, ensure_ascii=False) for record in self.records)
+        for text in [array_text[:-1], array_text[:-10], lines_text[:-10]]:
+            with self.assertRaises(ValueError):
+                self.read_json(text)
+        records = iterJsonRecords(io.StringIO(lines_text[:-10]), chunkSize=7)
+        self.assertEqual([next(records), next(records)], self.records[:2])
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            next(records)
+
+    def test_garbage_tail(self):
+        array_text = json.dumps(self.records, ensure_ascii=False)
+        lines_text = "\n".join(json.dumps(record, ensure_ascii=False) for record in self.records)
+        for text in [array_text + "garbage", array_text + "]", array_text + ",{}", lines_text + "\nnull\n", lines_text + "\n<html>"]:
+            with self.assertRaisesRegex(ValueError, "after record 3"):
+                self.read_json(text)
+
+    def test_csv_rows(self):
+        text = (
+            "id,word,wordClass,definitions,examples\r\n"
+            '1,àkwụ́kwọ́,NNC,"[""book"", ""paper""]","[{""igbo"": ""Gụọ akwụkwọ."", ""english"": ""Read a book.""}]"\r\n'
+            "2,rie,AV,eat,Rie nri.\r\n"
+            "3,ọ́kụ̀,NNC,,\r\n"
+        )
+        records = list(iterCsvRecords(io.StringIO(text, newline="")))
+        self.assertEqual(records[0]["definitions"], ["book", "paper"])
+        self.assertEqual(records[0]["examples"], [{"igbo": "Gụọ akwụkwọ.", "english": "Read a book."}])
+        self.assertEqual(records[1]["definitions"], ["eat"])
+        self.assertEqual(records[1]["examples"], [{"igbo": "Rie nri."}])
+        self.assertEqual(records[2]["definitions"], [])
+        self.assertEqual(records[2]["examples"], [])
+        self.assertEqual(records[2]["word"], "ọ́kụ̀")
+
+    def test_dump_paths(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "words.json")
+            with open(json_path, "w", encoding="utf-8") as fileptr:
+                json.dump(self.records, fileptr, ensure_ascii=False)
+            self.assertEqual(list(iterDumpRecords(json_path)), self.records)
+            with self.assertRaises(ValueError):
+                list(iterDumpRecords(os.path.join(directory, "words.xml")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+from importJournal import ImportJournal, getWordId
+
+class TestImportJournalMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.directory.name, "journal.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_lines(self):
+        with open(self.journal_path, encoding="utf-8") as fileptr:
+            return [json.loads(line) for line in fileptr]
+
+    def test_resume(self):
+        with ImportJournal(self.journal_path) as journal:
+            journal.record("1", "fetched", word="rie")
+            journal.record("1", "built", lexicalCategory="Q24905")
+            journal.record("2", "fetched", word="àkwụ́kwọ́")
+        with ImportJournal(self.journal_path) as journal:
+            self.assertEqual(journal.stage("1"), "built")
+            self.assertEqual(journal.get("1"), {"id": "1", "stage": "built", "word": "rie", "lexicalCategory": "Q24905"})
+            self.assertEqual(journal.get("2")["word"], "àkwụ́kwọ́")
+            self.assertEqual(journal.get("3"), {})
+            self.assertIsNone(journal.stage("3"))
+            journal.record("1", "pushed", lexeme="L1")
+        with ImportJournal(self.journal_path) as journal:
+            self.assertEqual(journal.get("1")["lexeme"], "L1")
+            self.assertTrue(journal.isFinished("1"))
+        self.assertEqual(len(self.read_lines()), 4)
+
+    def test_partial_last_line(self):
+        with ImportJournal(self.journal_path) as journal:
+            journal.record("1", "fetched", word="rie")
+            journal.record("1", "checked")
+        with open(self.journal_path, "a", encoding="utf-8") as fileptr:
+            fileptr.write('{"id": "1", "stage": "bui')
+        with ImportJournal(self.journal_path) as journal:
+            self.assertEqual(journal.stage("1"), "checked")
+            journal.record("1", "built")
+        with ImportJournal(self.journal_path) as journal:
+            self.assertEqual(journal.stage("1"), "built")
+        with open(self.journal_path, encoding="utf-8") as fileptr:
+            lines = fileptr.read().split("\n")
+        self.assertEqual(lines[2], '{"id": "1", "stage": "bui')
+        self.assertEqual(json.loads(lines[3]), {"id": "1", "stage": "built"})
+
+    def test_stage_order(self):
+        with ImportJournal(self.journal_path) as journal:
+            self.assertFalse(journal.hasReached("1", "fetched"))
+            journal.record("1", "checked")
+            self.assertTrue(journal.hasReached("1", "fetched"))
+            self.assertTrue(journal.hasReached("1", "checked"))
+            self.assertFalse(journal.hasReached("1", "built"))
+            self.assertFalse(journal.isFinished("1"))
+            journal.record("1", "exported")
+            self.assertTrue(journal.hasReached("1", "built"))
+            self.assertFalse(journal.hasReached("1", "pushed"))
+            self.assertTrue(journal.isFinished("1"))
+            journal.record("1", "pushed", lexeme="L1")
+            self.assertTrue(journal.hasReached("1", "exported"))
+            with self.assertRaises(ValueError):
+                journal.record("1", "published")
+        self.assertEqual(len(self.read_lines()), 3)
+
+    def test_duplicates_finished(self):
+        with ImportJournal(self.journal_path) as journal:
+            journal.record("1", "checked", duplicate=True, matches=["L2"])
+            journal.record("2", "checked", duplicate=False)
+            self.assertTrue(journal.isFinished("1"))
+            self.assertFalse(journal.isFinished("2"))
+            self.assertFalse(journal.isFinished("3"))
+        with ImportJournal(self.journal_path) as journal:
+            self.assertTrue(journal.isFinished("1"))
+            self.assertEqual(journal.get("1")["matches"], ["L2"])
+            self.assertFalse(journal.isFinished("2"))
+
+    def test_word_ids(self):
+        self.assertEqual(getWordId({"id": 5, "word": "rie"}), "5")
+        self.assertEqual(getWordId({"_id": "abc", "word": "rie"}), "abc")
+        self.assertEqual(getWordId({"word": "rie"}), "rie")
+
+if __name__ == '__main__':
+    unittest.main()
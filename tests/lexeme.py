@@ -1,8 +1,11 @@
+import tempfile
 import unittest
+from unittest import mock
 
+from tfsl.cache import DirectoryCache
 from tfsl.claim import Claim
 from tfsl.languages import langs
-from tfsl.lexeme import Lexeme
+from tfsl.lexeme import L_, Lexeme, L_many
 from tfsl.lexemeform import LexemeForm
 from tfsl.lexemesense import LexemeSense
 from tfsl.statement import Statement
@@ -87,5 +90,105 @@ class TestLexemeMethods(unittest.TestCase):
     # def test_lexeme_change_language(self):
     # def test_lexeme_change_category(self):
 
+    def test_lexeme_edit(self):
+        newstmt = Statement(self.property, self.value_mt2)
+        newsense = LexemeSense(self.glosslist2)
+        newform = LexemeForm(self.replist2)
+        chained = self.x + newstmt + newsense + newform + self.rep5 - self.formlist[0]
+        with self.x.edit() as editor:
+            editor.add(newstmt, newsense, newform)
+            editor.add_lemma(self.rep5).remove_form(self.formlist[0])
+        y = editor.result
+        self.assertIsInstance(y, Lexeme)
+        self.assertEqual(y.lemmata, chained.lemmata)
+        self.assertEqual(y.statements, chained.statements)
+        self.assertEqual(y.senses, chained.senses)
+        self.assertEqual(y.forms, chained.forms)
+        self.assertCountEqual(self.x.lemmata.texts, self.lemmalist)
+        self.assertCountEqual(self.x.statements.statements, {self.property: self.stmtlist})
+        self.assertEqual(self.x.senses, self.senselist)
+        self.assertEqual(self.x.forms, self.formlist)
+        with self.assertRaises(ValueError):
+            editor.add_statement(newstmt)
+
+    def test_lexeme_edit_checks(self):
+        editor = self.x.edit().remove_lemma(langs.hi_).remove_lemma(self.rep2)
+        with self.assertRaises(ValueError):
+            editor.commit()
+        with self.assertRaises(ValueError):
+            self.x.edit().set_category("P31").commit()
+        self.formlist[0].id = "L5-F1"
+        self.formlist[1].id = "L5-F1"
+        with self.assertRaises(ValueError):
+            self.x.edit().commit()
+        self.formlist[1].id = "L5-F2"
+        y = self.x.edit().remove_form("L5-F2").commit()
+        self.assertEqual(y.forms, [self.formlist[0]])
+        with self.assertRaises(ValueError):
+            self.x.edit().add_sense(LexemeSense([])).commit()
+
+    def test_lazy_lexeme(self):
+        lexeme_json = self.x.__jsonout__()
+        lexeme_json["id"] = "L5"
+        lexeme_json["claims"][self.property][0]["id"] = "L5$1"
+        for kind, prefix in [("forms", "F"), ("senses", "S")]:
+            for number, part in enumerate(lexeme_json[kind], start=1):
+                part["id"] = f"L5-{prefix}{number}"
+                part.setdefault("claims", {})
+        lazy = L_(lexeme_json)
+        self.assertEqual(lazy[langs.hi_], self.rep1)
+        self.assertEqual(lazy.language, langs.bn_)
+        self.assertEqual(lazy.form_ids(), ["L5-F1", "L5-F2"])
+        self.assertEqual(lazy["F2"].representations, self.formlist[1].representations)
+        self.assertIs(lazy["L5-F2"], lazy["F2"])
+        self.assertEqual(list(lazy._forms), ["L5-F2"])
+        self.assertEqual(lazy.get_sense("S1").glosses, self.senselist[0].glosses)
+        self.assertEqual(lazy[self.property], self.stmtlist)
+        self.assertIs(lazy[self.property], lazy.get_stmts(self.property))
+        self.assertEqual(lazy[self.property2], [])
+        self.assertTrue(lazy.haswbstatement(self.property))
+        self.assertTrue(lazy.haswbstatement(self.property, self.value_mt1))
+        self.assertFalse(lazy.haswbstatement(self.property2))
+        with self.assertRaises(KeyError):
+            lazy["F3"]
+        materialized = lazy.materialize()
+        self.assertIsInstance(materialized, Lexeme)
+        self.assertEqual(materialized.lexeme_id, None)
+        self.assertEqual(materialized["L5-S2"].glosses, self.senselist[1].glosses)
+        with self.assertRaises(ValueError):
+            L_({"id": "Q5", "labels": {}, "claims": {}})
+
+class TestLexemeRetrievalMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_patch = mock.patch("tfsl.utils.entity_cache", DirectoryCache(self.directory.name))
+        self.cache_patch.start()
+        self.requests = []
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.directory.cleanup()
+
+    def get_lexemes(self, lids):
+        self.requests.append(lids)
+        return {lid: {
+            "pageid": 1, "ns": 146, "title": "Lexeme:" + lid, "lastrevid": 1, "modified": "", "type": "lexeme", "id": lid,
+            "lemmas": {"ig": {"language": "ig", "value": lid}}, "lexicalCategory": "Q1084", "language": "Q33578",
+            "claims": {}, "forms": [], "senses": []
+        } for lid in lids}
+
+    def test_many_lexemes(self):
+        lids = [f"L{number}" for number in range(120, 0, -1)]
+        with mock.patch("tfsl.auth.get_lexemes", side_effect=self.get_lexemes):
+            lexemes = L_many(lids, max_workers=2)
+        self.assertEqual(list(lexemes), lids)
+        self.assertEqual(lexemes["L7"].lexeme_id, "L7")
+        self.assertEqual(sorted(len(request) for request in self.requests), [20, 50, 50])
+
+        with mock.patch("tfsl.auth.get_lexemes", side_effect=self.get_lexemes):
+            lexemes = L_many(["L5", 6, "L121"])
+        self.assertEqual(list(lexemes), ["L5", "L6", "L121"])
+        self.assertEqual(self.requests[-1], ["L121"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -140,6 +140,30 @@ class TestFormMethods(unittest.TestCase):
         self.assertCountEqual(y.features, featlist)
         self.assertEqual(y.statements, {self.property: [stmtlist[0]]})
 
+    def test_lexemeform_edit(self):
+        replist = [self.rep1, self.rep2]
+        featlist = [self.feature1, self.feature2]
+        stmtlist = [Statement(self.property, self.value_mt1)]
+        newstmt = Statement(self.property, self.value_mt2)
+
+        x = LexemeForm(replist, featlist, stmtlist)
+        x.id = "L5-F1"
+        y = x.edit().add(self.rep3, self.feature3, newstmt).remove_feature(self.feature1).commit()
+
+        self.assertCountEqual(x.representations.texts, replist)
+        self.assertCountEqual(x.features, featlist)
+        self.assertEqual(x.statements, {self.property: [stmtlist[0]]})
+        self.assertCountEqual(y.representations.texts, [replist[0], self.rep3])
+        self.assertCountEqual(y.features, [self.feature2, self.feature3])
+        self.assertEqual(y.statements, {self.property: [stmtlist[0], newstmt]})
+        self.assertEqual(y.id, "L5-F1")
+        with self.assertRaises(TypeError):
+            x.edit().add_feature(self.property)
+        with self.assertRaises(NotImplementedError):
+            x.edit().add(self.property)
+        with self.assertRaises(ValueError):
+            x.edit().remove_representation(langs.hi_).remove_representation(langs.ur_).commit()
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -100,5 +100,22 @@ class TestSenseMethods(unittest.TestCase):
         self.assertCountEqual(y.glosses.texts, [glosslist[0], self.rep3])
         self.assertEqual(y.statements, {self.property: [stmtlist[0]]})
 
+    def test_lexemesense_edit(self):
+        glosslist = [self.rep1, self.rep2]
+        stmtlist = [Statement(self.property, self.value_mt1)]
+
+        x = LexemeSense(glosslist, stmtlist)
+        with x.edit() as editor:
+            editor.add_gloss(self.rep3)
+            editor.remove_statement(self.property)
+        y = editor.result
+
+        self.assertCountEqual(x.glosses.texts, glosslist)
+        self.assertEqual(x.statements, {self.property: [stmtlist[0]]})
+        self.assertCountEqual(y.glosses.texts, [glosslist[0], self.rep3])
+        self.assertEqual(y.statements, {})
+        with self.assertRaises(ValueError):
+            editor.commit()
+
 if __name__ == '__main__':
     unittest.main()
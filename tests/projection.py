@@ -0,0 +1,36 @@
+import unittest
+
+from tfsl.projection import covers, from_json, projection, widen
+
+class TestProjectionMethods(unittest.TestCase):
+    def test_projection(self):
+        self.assertIsNone(projection())
+        self.assertIsNone(projection(["info", "sitelinks", "aliases", "labels", "descriptions", "claims", "datatype"]))
+        self.assertEqual(projection(["claims"]).props, {"info", "claims"})
+        self.assertEqual(projection(["claims"], ["ig"]).languages, frozenset())
+        self.assertEqual(projection(["labels"], ["ig", "en"]).parameters(), {"props": "info|labels", "languages": "en|ig"})
+        with self.assertRaises(ValueError):
+            projection(["lemmas"])
+        labels = projection(["labels"], ["ig"])
+        self.assertEqual(from_json(labels.to_json()), labels)
+        self.assertIsNone(from_json(None))
+
+    def test_covers(self):
+        labels = projection(["labels", "claims"], ["ig"])
+        self.assertTrue(covers(None, labels))
+        self.assertFalse(covers(labels, None))
+        self.assertTrue(covers(labels, projection(["claims"])))
+        self.assertTrue(covers(labels, projection(["labels"], ["ig"])))
+        self.assertFalse(covers(labels, projection(["labels"], ["en"])))
+        self.assertFalse(covers(labels, projection(["labels"])))
+        self.assertFalse(covers(labels, projection(["descriptions"], ["ig"])))
+        self.assertTrue(covers(projection(["labels"]), projection(["labels"], ["en"])))
+
+    def test_widen(self):
+        self.assertEqual(widen(projection(["labels"], ["ig"]), projection(["claims"])), projection(["labels", "claims"], ["ig"]))
+        self.assertEqual(widen(projection(["labels"], ["ig"]), projection(["labels"], ["en"])), projection(["labels"], ["ig", "en"]))
+        self.assertEqual(widen(projection(["labels"], ["ig"]), projection(["aliases"])), projection(["labels", "aliases"]))
+        self.assertIsNone(widen(projection(["labels"]), None))
+
+if __name__ == '__main__':
+    unittest.main()
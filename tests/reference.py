@@ -1,4 +1,5 @@
 import unittest
+from copy import copy
 
 from tfsl.claim import Claim
 from tfsl.languages import langs
@@ -29,6 +30,22 @@ class TestReferenceMethods(unittest.TestCase):
         self.assertCountEqual(x[self.prop2], [self.claim3])
         self.assertCountEqual(x[self.prop3], [self.claim4])
 
+    def test_ref_structural_sharing(self):
+        x = Reference(self.claim1, self.claim3)
+        y = x + self.claim2
+        self.assertIs(y[self.prop2][0], self.claim3)
+        self.assertEqual(x[self.prop1], [self.claim1])
+        self.assertEqual(y[self.prop1], [self.claim1, self.claim2])
+        z = y - self.claim1
+        self.assertEqual(z[self.prop1], [self.claim2])
+        self.assertEqual(y[self.prop1], [self.claim1, self.claim2])
+        del z[self.prop2]
+        self.assertEqual(y[self.prop2], [self.claim3])
+        w = copy(y)
+        del w[self.claim1]
+        self.assertEqual(w[self.prop1], [self.claim2])
+        self.assertEqual(y[self.prop1], [self.claim1, self.claim2])
+
     def test_ref_add_statement(self):
         newclaim = Claim(self.prop3, self._text3)
 
@@ -0,0 +1,44 @@
+import time
+import unittest
+
+from tfsl.scheduler import TokenBucket, WriteScheduler
+
+class TestSchedulerMethods(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = WriteScheduler(edits_per_minute=60000, burst=1, max_retries=3, base_delay=0.001, max_delay=0.004)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(10, 2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+    def test_backoff_delay(self):
+        for attempt in range(6):
+            delay = self.scheduler.backoff_delay(attempt)
+            self.assertLessEqual(delay, 0.004)
+            self.assertGreaterEqual(delay, min(0.004, 0.001 * 2 ** attempt) / 2)
+        self.assertEqual(self.scheduler.backoff_delay(0, 0.01), 0.01)
+
+    def test_run_retries_with_same_request(self):
+        sent = []
+        def send():
+            sent.append({"summary": "new lexeme"})
+            return len(sent)
+        result = self.scheduler.run(send, lambda attempt: 0.0 if attempt < 3 else None)
+        self.assertEqual(result, 3)
+        self.assertEqual(sent, [{"summary": "new lexeme"}] * 3)
+
+    def test_run_gives_up(self):
+        with self.assertRaises(TimeoutError):
+            self.scheduler.run(lambda: None, lambda result: 0.0)
+
+    def test_pause_is_shared(self):
+        self.scheduler.pause(0.05)
+        start = time.monotonic()
+        self.scheduler.run(lambda: None, lambda result: None, rate_limited=False)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+if __name__ == '__main__':
+    unittest.main()
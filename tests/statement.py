@@ -1,9 +1,10 @@
 import unittest
+from unittest import mock
 
 from tfsl.claim import Claim
 from tfsl.languages import langs
-from tfsl.reference import Reference
-from tfsl.statement import Statement, Rank
+from tfsl.reference import ClaimSet, Reference
+from tfsl.statement import Statement, Rank, build_statement
 
 class TestStatementMethods(unittest.TestCase):
     def setUp(self):
@@ -127,6 +128,35 @@ class TestStatementMethods(unittest.TestCase):
         self.assertEqual(y.qualifiers, {"P1448": [quallist[0]]})
         self.assertCountEqual(y.references, [reflist[0]])
     
+    def test_statement_structural_sharing(self):
+        x = Statement(self.property, self.value_mt, qualifiers=[Claim("P1448", self.value_q1)], datatype="monolingualtext")
+        reference = Reference(Claim("P1922", self.value_r1))
+        y = x + Claim("P1683", self.value_q2) + reference
+        self.assertIs(y.qualifiers["P1448"], x.qualifiers["P1448"])
+        self.assertIs(y.references[0]["P1922"], reference["P1922"])
+        self.assertEqual(list(x.qualifiers), ["P1448"])
+        self.assertEqual(x.references, [])
+        z = y - reference - Claim("P1448", self.value_q1)
+        self.assertEqual(list(z.qualifiers), ["P1683"])
+        self.assertEqual(y.references, [reference])
+        self.assertEqual(list(y.qualifiers), ["P1448", "P1683"])
+
+    def test_statement_input_changed_later(self):
+        qualifier = Claim("P1448", self.value_q1)
+        reference = Reference(Claim("P1922", self.value_r1), Claim("P1683", self.value_q2))
+        qualifiers = ClaimSet.from_claims([qualifier])
+        x = Statement(self.property, self.value_mt, qualifiers=qualifiers, references=[reference])
+
+        qualifiers["P1448"].append(Claim("P1448", self.value_q2))
+        qualifiers["P1683"].append(Claim("P1683", self.value_q2))
+        del reference["P1922"]
+        del reference[Claim("P1683", self.value_q2)]
+
+        self.assertEqual(x.qualifiers, {"P1448": [qualifier]})
+        self.assertIn(Claim("P1922", self.value_r1), x.references[0])
+        self.assertIn(Claim("P1683", self.value_q2), x.references[0])
+        self.assertNotIn("P1922", reference)
+
     def test_statement_change_rank(self):
         x = Statement(self.property, self.value_mt)
         x @= Rank.Preferred
@@ -146,5 +176,24 @@ class TestStatementMethods(unittest.TestCase):
     
     # TODO: once loading items from Wikidata, verify that setting value to different type disallowed
 
+    def test_build_statement_trusted(self):
+        stmt_in = {
+            "type": "statement", "id": "L1$1", "rank": "normal",
+            "mainsnak": {"snaktype": "value", "property": "P9999998", "hash": "a", "datatype": "external-id",
+                         "datavalue": {"value": "abc", "type": "string"}},
+            "qualifiers": {"P9999999": [{"snaktype": "value", "property": "P9999999", "hash": "b", "datatype": "url",
+                                         "datavalue": {"value": "https://example.org", "type": "string"}}]},
+            "qualifiers-order": ["P9999999"]
+        }
+        with mock.patch("tfsl.utils.values_datatype", side_effect=AssertionError("datatype looked up")):
+            x = build_statement(stmt_in)
+            stmt_out = x.__jsonout__()
+        self.assertEqual(x.datatype, "external-id")
+        self.assertEqual(stmt_out["mainsnak"]["datatype"], "external-id")
+        self.assertEqual(stmt_out["qualifiers"]["P9999999"][0]["datatype"], "url")
+        with mock.patch("tfsl.utils.values_datatype", return_value="external-id") as lookup:
+            build_statement(stmt_in, trusted=False)
+            self.assertTrue(lookup.called)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from tfsl.languages import langs
+from tfsl.textindex import TextIndex, normalize_text
+
+class TestTextIndexMethods(unittest.TestCase):
+    def setUp(self):
+        self.composed = "\u1ecd\u0300k\u1ee5\u0301"
+        self.decomposed = "o\u0323\u0300ku\u0323\u0301"
+        self.toneless = "\u1ecdk\u1ee5"
+        self.index = TextIndex()
+        self.index.add(self.composed @ langs.ig_, "L1")
+        self.index.add("akwa" @ langs.ig_, "L2")
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text(self.decomposed), normalize_text(self.composed))
+        self.assertEqual(normalize_text(self.composed, strip_tones=True), self.toneless)
+        self.assertEqual(normalize_text(" akwa "), "akwa")
+
+    def test_lookup_exact(self):
+        match = self.index.lookup(self.composed @ langs.ig_)
+        self.assertEqual(match.exact, {"L1"})
+        self.assertEqual(match.normalized, {"L1"})
+        self.assertEqual(match.tone_insensitive, {"L1"})
+
+    def test_lookup_normalized(self):
+        match = self.index.lookup(self.decomposed @ langs.ig_)
+        self.assertEqual(match.exact, set())
+        self.assertEqual(match.normalized, {"L1"})
+        self.assertIn(self.decomposed @ langs.ig_, self.index)
+
+    def test_lookup_tone_insensitive(self):
+        matches = self.index.lookup_batch([self.toneless @ langs.ig_, "àkwà" @ langs.ig_, "akwa" @ langs.yo_])
+        self.assertEqual([match.normalized for match in matches], [set(), set(), set()])
+        self.assertEqual([match.tone_insensitive for match in matches], [{"L1"}, {"L2"}, set()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import tfsl.auth
+import tfsl.languages
+import tfsl.projection
+from tfsl.cache import DirectoryCache, LRUCache
+from tfsl.item import Q_
+from tfsl.utils import DatatypeStore, build_cached, iter_entity_jsons, retrieve_entities, retrieve_entity_json
+
+def retrieve_batch(path, log_path, start):
+    """ Retrieves 50 lexemes into a shared cache in a process of its own, with each request taking half a second. """
+    def get_lexemes(lids, **kwargs):
+        began = time.time()
+        time.sleep(0.5)
+        with open(log_path, "a", encoding="utf-8") as fileptr:
+            fileptr.write(json.dumps([start, began, time.time(), lids]) + "\n")
+        return {lid: {"id": lid, "lastrevid": 1} for lid in lids}
+    with mock.patch("tfsl.utils.entity_cache", DirectoryCache(path)), mock.patch("tfsl.auth.get_lexemes", get_lexemes):
+        return len(retrieve_entities([f"L{number}" for number in range(start, start + 50)]))
+
+class TestDatatypeStoreMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "datatypes.json")
+        with open(self.path, "w", encoding="utf-8") as fileptr:
+            json.dump({"P5831": ["monolingualtext", time.time()], "P854": ["url", 0.0]}, fileptr)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_store(self):
+        store = DatatypeStore(self.path, 3600)
+        self.assertEqual(store.get("P5831"), "monolingualtext")
+        self.assertTrue(store.is_fresh("P5831"))
+        self.assertFalse(store.is_fresh("P854"))
+        self.assertFalse(store.is_fresh("P953"))
+
+    def test_damaged_store(self):
+        with open(self.path, "w", encoding="utf-8") as fileptr:
+            fileptr.write('{"P5831": ["monolingual')
+        self.assertEqual(DatatypeStore(self.path, 3600).datatypes, {})
+
+    def test_write_merges_newer_entries(self):
+        first = DatatypeStore(self.path, 3600)
+        second = DatatypeStore(self.path, 3600)
+        second.datatypes["P953"] = ("url", time.time())
+        second.write()
+        first.datatypes["P1476"] = ("monolingualtext", time.time())
+        first.write()
+        merged = DatatypeStore(self.path, 3600)
+        self.assertEqual(merged.get("P953"), "url")
+        self.assertEqual(merged.get("P1476"), "monolingualtext")
+
+    def answer(self, datatypes):
+        response = mock.Mock()
+        response.json.return_value = {"entities": {prop: {"id": prop, "datatype": datatype} for prop, datatype in datatypes.items()}}
+        return mock.patch("tfsl.utils.requests.get", return_value=response)
+
+    def test_fetch_keeps_resolved(self):
+        store = DatatypeStore(self.path, 3600)
+        with self.answer({"P953": "url"}) as get:
+            self.assertEqual(store.get("P953"), "url")
+            self.assertEqual(get.call_args.kwargs["params"]["ids"], "P953|P854")
+            with self.assertRaisesRegex(ValueError, "P1476"):
+                store.get("P1476")
+        self.assertEqual(store.get("P854"), "url")
+        self.assertFalse(store.is_fresh("P854"))
+        self.assertEqual(DatatypeStore(self.path, 3600).get("P953"), "url")
+
+        with self.answer({"P407": "wikibase-item"}):
+            with self.assertRaisesRegex(ValueError, "P1476"):
+                store.prefetch(["P407", "P1476"])
+        self.assertEqual(store.get("P407"), "wikibase-item")
+
+    def test_fetch_unreachable(self):
+        store = DatatypeStore(self.path, 3600)
+        with mock.patch("tfsl.utils.requests.get", side_effect=requests.ConnectionError("offline")):
+            self.assertEqual(store.get("P854"), "url")
+            with self.assertRaises(requests.ConnectionError):
+                store.get("P953")
+
+class TestCacheValidationMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DirectoryCache(self.directory.name)
+        self.cache.put_many({f"L{number}": {"id": f"L{number}", "lastrevid": number} for number in range(1, 4)}, fetched_at=0.0)
+        self.patches = [
+            mock.patch("tfsl.utils.entity_cache", self.cache),
+            mock.patch("tfsl.utils.cache_validation", "lastrevid"),
+            mock.patch("tfsl.auth.get_revision_ids", return_value={"L1": 1, "L2": 20}),
+            mock.patch("tfsl.auth.get_lexemes", side_effect=lambda lids: {lid: {"id": lid, "lastrevid": 20} for lid in lids})
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.directory.cleanup()
+
+    def test_refetch_changed_only(self):
+        entities = dict(iter_entity_jsons(["L1", "L2", "L3"]))
+        self.assertEqual(entities["L1"], {"id": "L1", "lastrevid": 1})
+        self.assertEqual(entities["L2"], {"id": "L2", "lastrevid": 20})
+        tfsl.auth.get_revision_ids.assert_called_once_with(["L1", "L2", "L3"])
+        tfsl.auth.get_lexemes.assert_called_once_with(["L2", "L3"])
+        self.assertGreater(self.cache.get("L1").fetched_at, 0.0)
+
+    def test_processes_retrieve_at_once(self):
+        path = os.path.join(self.directory.name, "shared")
+        log_path = os.path.join(self.directory.name, "requests.log")
+        with multiprocessing.Pool(2) as pool:
+            self.assertEqual(pool.starmap(retrieve_batch, [(path, log_path, 0), (path, log_path, 1000)]), [50, 50])
+        with open(log_path, encoding="utf-8") as fileptr:
+            requests = [json.loads(line) for line in fileptr]
+        first_requests = {start: (began, ended) for start, began, ended, _ in reversed(requests)}
+        # neither process waited for the other's first request to finish before making its own
+        self.assertLess(first_requests[0][0], first_requests[1000][1])
+        self.assertLess(first_requests[1000][0], first_requests[0][1])
+        retrieved = [lid for _, _, _, lids in requests for lid in lids]
+        self.assertEqual(len(retrieved), 100)
+        self.assertEqual(len(DirectoryCache(path).get_many(retrieved)), 100)
+
+    def test_build_cached_objects(self):
+        entity_json = {"id": "L1", "lastrevid": 1, "forms": []}
+        with mock.patch("tfsl.utils.memory_cache_objects", True), mock.patch("tfsl.utils.object_cache", LRUCache(10)):
+            build = mock.Mock(side_effect=lambda data: {"built": list(data["forms"])})
+            first = build_cached("L1", entity_json, build)
+            first["built"].append("changed")
+            second = build_cached("L1", entity_json, build)
+            build_cached("L1", dict(entity_json), build)
+        self.assertEqual(second, {"built": []})
+        self.assertEqual(build.call_count, 2)
+
+class TestEntityLockingMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_patch = mock.patch("tfsl.utils.entity_cache", DirectoryCache(self.directory.name))
+        self.cache_patch.start()
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.directory.cleanup()
+
+    def test_single_fetch(self):
+        def get_lexemes(lids):
+            time.sleep(0.1)
+            return {lid: {"id": lid, "lastrevid": 1} for lid in lids}
+        results = []
+        with mock.patch("tfsl.auth.get_lexemes", side_effect=get_lexemes) as fetch:
+            threads = [threading.Thread(target=lambda: results.append(retrieve_entity_json("L1"))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(results, [{"id": "L1", "lastrevid": 1}] * 4)
+
+ITEM_JSON = {
+    "type": "item", "id": "Q33578", "lastrevid": 7,
+    "labels": {"ig": {"language": "ig", "value": "Igbo"}, "en": {"language": "en", "value": "Igbo"}},
+    "descriptions": {"en": {"language": "en", "value": "language of Nigeria"}},
+    "aliases": {}, "claims": {"P31": []}, "sitelinks": {}
+}
+
+def get_projected_items(lids, projection=None):
+    """ Imitates wbgetentities, which leaves out whatever the props and languages parameters leave out. """
+    parameters = projection.parameters() if projection is not None else {}
+    props = parameters.get("props", "info|labels|descriptions|aliases|claims|sitelinks").split("|")
+    languages = parameters["languages"].split("|") if "languages" in parameters else None
+    item = {key: value for key, value in ITEM_JSON.items() if key in ("type", "id", "lastrevid") or key in props}
+    for key in ["labels", "descriptions", "aliases"]:
+        if key in item and languages is not None:
+            item[key] = {code: value for code, value in item[key].items() if code in languages}
+    return {lid: item for lid in lids}
+
+class TestProjectionMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DirectoryCache(self.directory.name)
+        self.cache_patch = mock.patch("tfsl.utils.entity_cache", self.cache)
+        self.cache_patch.start()
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.directory.cleanup()
+
+    def test_widen_on_access(self):
+        igbo = tfsl.languages.Language("ig", "Q33578")
+        with mock.patch("tfsl.auth.get_lexemes", side_effect=get_projected_items) as fetch:
+            item = Q_("Q33578")
+            self.assertNotIn("labels", item.item_json)
+            self.assertEqual(item.get_label(igbo).text, "Igbo")
+            self.assertEqual(item.get_label(igbo).text, "Igbo")
+            self.assertEqual(fetch.call_count, 2)
+            self.assertEqual(fetch.call_args.kwargs["projection"].parameters(), {"props": "info|labels", "languages": "ig"})
+            self.assertEqual(item["P31"], [])
+            self.assertEqual(fetch.call_args.kwargs["projection"].parameters(), {"props": "claims|info|labels", "languages": "ig"})
+            entry = self.cache.get("Q33578")
+            self.assertEqual(entry.projection, tfsl.projection.projection(["claims", "labels"], ["ig"]))
+            self.assertEqual(set(entry.data["labels"]), {"ig"})
+
+            self.assertEqual(Q_("Q33578", ["labels"], ["ig"]).get_label(igbo).text, "Igbo")
+            self.assertEqual(fetch.call_count, 3)
+            retrieve_entity_json("Q33578")
+            self.assertNotIn("projection", fetch.call_args.kwargs)
+            self.assertIsNone(self.cache.get("Q33578").projection)
+            Q_("Q33578", ["descriptions"], ["en"])
+            self.assertEqual(fetch.call_count, 4)
+
+if __name__ == '__main__':
+    unittest.main()
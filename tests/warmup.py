@@ -0,0 +1,46 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from tfsl.cache import DirectoryCache
+from tfsl.warmup import EntityCriteria, warm_cache
+
+class TestWarmupMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump = os.path.join(self.directory.name, "latest-all.json.gz")
+        with gzip.open(self.dump, "wt", encoding="utf-8") as fileptr:
+            fileptr.write('[\n')
+            fileptr.write('{"type":"item","id":"Q33578","lastrevid":5,"labels":{}},\n')
+            for number in range(1, 8):
+                language = "Q33578" if number % 2 else "Q1860"
+                fileptr.write(f'{{"type":"lexeme","id":"L{number}","lastrevid":{number},"language":"{language}","lemmas":{{}}}},\n')
+            fileptr.write('{"type":"property","id":"P5137","datatype":"wikibase-item","labels":{}}\n')
+            fileptr.write(']\n')
+        self.cache = DirectoryCache(os.path.join(self.directory.name, "entities"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_language_criteria(self):
+        count = warm_cache(self.cache, self.dump, EntityCriteria(languages=["Q33578"]), processes=2, batch_size=2)
+        self.assertEqual(count, 4)
+        self.assertEqual(sorted(self.cache.get_many(f"L{number}" for number in range(1, 8))), ["L1", "L3", "L5", "L7"])
+        self.assertEqual(self.cache.get("L3").lastrevid, 3)
+
+    def test_ids_and_predicate(self):
+        criteria = EntityCriteria(ids=["Q33578", "L2", "L3", "P5137"])
+        count = warm_cache(self.cache, self.dump, criteria, lambda entity: entity["type"] != "property", processes=1, fetched_at=100.0)
+        self.assertEqual(count, 3)
+        self.assertEqual(sorted(self.cache.get_many(["Q33578", "L2", "L3", "L4", "P5137"])), ["L2", "L3", "Q33578"])
+        self.assertEqual(self.cache.get("Q33578").fetched_at, 100.0)
+
+    def test_type_line_filter(self):
+        line_filter = EntityCriteria(types=["item"]).line_filter()
+        self.assertTrue(line_filter('{"type":"item","id":"Q1"}'))
+        self.assertFalse(line_filter('{"type":"lexeme","id":"L1"}'))
+        self.assertIsNone(EntityCriteria(ids=["L1"]).line_filter())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,14 @@
 
 # pylint: disable=useless-import-alias
 
-from tfsl.auth import WikibaseSession as WikibaseSession
+from tfsl.asyncauth import AsyncWikibaseSession as AsyncWikibaseSession
+from tfsl.auth import WikibaseSession as WikibaseSession, shared_session as shared_session
 from tfsl.claim import Claim as Claim
 from tfsl.coordinatevalue import CoordinateValue as CoordinateValue
-from tfsl.item import Item as Item, Q as Q, Q_ as Q_
+from tfsl.item import Item as Item, Q as Q, Q_ as Q_, Q_many as Q_many
 from tfsl.itemvalue import ItemValue as ItemValue
 from tfsl.languages import Language as Language, langs as langs
-from tfsl.lexeme import Lexeme as Lexeme, L as L
+from tfsl.lexeme import Lexeme as Lexeme, L as L, L_ as L_, L_many as L_many
 from tfsl.lexemeform import LexemeForm as LexemeForm
 from tfsl.lexemesense import LexemeSense as LexemeSense
 from tfsl.monolingualtext import MonolingualText as MonolingualText
@@ -17,6 +18,8 @@ from tfsl.quantityvalue import QuantityValue as QuantityValue
 from tfsl.reference import Reference as Reference
 from tfsl.statement import Statement as Statement
 from tfsl.statementholder import StatementHolder as StatementHolder
+from tfsl.textindex import TextIndex as TextIndex, normalize_text as normalize_text
 from tfsl.timevalue import TimeValue as TimeValue
+import tfsl.batch as batch
 import tfsl.interfaces as interfaces
 import tfsl.utils as utils
@@ -0,0 +1,93 @@
+""" Maintenance commands for tfsl, run as python -m tfsl <command>. """
+
+import argparse
+import os
+import re
+from typing import List, Optional
+
+import tfsl.cache
+import tfsl.datatypesnapshot
+import tfsl.interfaces as I
+import tfsl.utils
+import tfsl.warmup
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+def parse_size(size: str) -> int:
+    """ Parses a number of bytes, optionally followed by K, M, G or T. """
+    if (match := re.fullmatch(r"(\d+)\s*([KMGT]?)i?B?", size.strip(), re.IGNORECASE)) is None:
+        raise argparse.ArgumentTypeError(f"{size} is not a size such as 500M or 10G")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+def format_size(size: int) -> str:
+    """ Formats a number of bytes with the largest unit keeping it at least 1. """
+    for unit in ["T", "G", "M", "K"]:
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:.1f}{unit}"
+    return f"{size}B"
+
+def collect_garbage(max_age: Optional[float], max_entries: Optional[int], max_bytes: Optional[int]) -> None:
+    """ Collects garbage in the configured entity cache and reports what was reclaimed. """
+    report = tfsl.utils.entity_cache.collect_garbage(max_age, max_entries, max_bytes)
+    print(f"Scanned {report.scanned} entities and removed {report.removed}, reclaiming {format_size(report.reclaimed_bytes)}; "
+          f"{report.remaining_entries} entities taking {format_size(report.remaining_bytes)} remain")
+
+def regenerate_datatypes(dump: str, output: str) -> None:
+    """ Regenerates the property datatype snapshot from a dump. """
+    count = tfsl.datatypesnapshot.write_snapshot(tfsl.datatypesnapshot.iter_dump_datatypes(dump), output, os.path.basename(dump))
+    print(f"Wrote the datatypes of {count} properties to {output}")
+
+def read_ids(path: str) -> List[I.EntityId]:
+    """ Reads entity ids from a file, one to a line, skipping blank lines. """
+    entity_ids: List[I.EntityId] = []
+    with open(path, encoding="utf-8") as fileptr:
+        for line in fileptr:
+            if not (entity_id := line.strip()):
+                continue
+            if not I.is_EntityId(entity_id):
+                raise ValueError(f"{entity_id} in {path} is not an entity id")
+            entity_ids.append(entity_id)
+    return entity_ids
+
+def warm_cache(dump: str, criteria: tfsl.warmup.EntityCriteria, processes: Optional[int]) -> None:
+    """ Fills the configured entity cache from a dump. """
+    cache = tfsl.utils.entity_cache
+    if isinstance(cache, tfsl.cache.MemoryCache):
+        # the entities written are not about to be used by this process
+        cache = cache.backing
+    count = tfsl.warmup.warm_cache(cache, dump, criteria, processes=processes)
+    print(f"Cached {count} entities from {dump}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m tfsl", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gc_parser = subparsers.add_parser("gc", help="remove expired and least recently used entities from the entity cache")
+    gc_parser.add_argument("--max-age", type=float, help="remove entities retrieved more than this many seconds ago")
+    gc_parser.add_argument("--expired", action="store_true", help="remove entities past the configured TimeToLive")
+    gc_parser.add_argument("--max-entries", type=int, help="then keep at most this many entities")
+    gc_parser.add_argument("--max-bytes", type=parse_size, help="then keep at most this much data, such as 500M or 10G")
+
+    datatypes_parser = subparsers.add_parser("datatypes", help="regenerate the property datatype snapshot from a Wikidata JSON dump")
+    datatypes_parser.add_argument("dump", help="path to a dump containing properties, such as latest-all.json(.gz|.bz2)")
+    datatypes_parser.add_argument("--output", default=tfsl.datatypesnapshot.SNAPSHOT_PATH, help="where to write the snapshot")
+
+    warm_parser = subparsers.add_parser("warm", help="fill the entity cache from a Wikidata JSON dump")
+    warm_parser.add_argument("dump", help="path to latest-lexemes.json or latest-all.json(.gz|.bz2)")
+    warm_parser.add_argument("--type", action="append", dest="types", help="keep only entities of this type, such as lexeme (repeatable)")
+    warm_parser.add_argument("--language", action="append", dest="languages", help="keep only lexemes in the language with this Qid (repeatable)")
+    warm_parser.add_argument("--ids", help="keep only the entities whose ids are listed, one to a line, in this file")
+    warm_parser.add_argument("--processes", type=int, help="how many processes parse the dump (by default one per core)")
+
+    args = parser.parse_args()
+    if args.command == "gc":
+        max_age = tfsl.utils.time_to_live if args.expired and args.max_age is None else args.max_age
+        collect_garbage(max_age, args.max_entries, args.max_bytes)
+    elif args.command == "datatypes":
+        regenerate_datatypes(args.dump, args.output)
+    elif args.command == "warm":
+        criteria = tfsl.warmup.EntityCriteria(args.types, args.languages, read_ids(args.ids) if args.ids else None)
+        warm_cache(args.dump, criteria, args.processes)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+""" Holds the AsyncWikibaseSession class, an asyncio counterpart of tfsl.auth.WikibaseSession built on aiohttp. """
+
+import asyncio
+import json
+import logging
+from getpass import getpass
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import aiohttp
+
+import tfsl.auth
+import tfsl.interfaces as I
+import tfsl.projection
+import tfsl.scheduler
+import tfsl.utils
+
+DEFAULT_CONCURRENCY = 100
+
+class AsyncResponse(NamedTuple):
+    """ A response read in full, so that its connection goes back to the pool before the response is looked at. """
+    status_code: int
+    headers: Mapping[str, str]
+    text: str
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+class AsyncWikibaseSession:
+    """ Auth library for Wikibases, for use from a single asyncio event loop.
+        Login, CSRF tokens, maxlag and pacing work as in WikibaseSession, and sessions for one account
+        share a WriteScheduler with each other and with WikibaseSessions for that account.
+        Requests go through one connection pool, with at most `concurrency` of them in flight at once.
+        Without a username, the session can only read.
+        Use it as an async context manager, which logs in on entry unless lazy is set and closes the pool on exit:
+
+            async with AsyncWikibaseSession("Username", password) as session:
+                entities = await session.get_entities(["L1", "L2"])
+    """
+    def __init__(self,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None,
+                 token: Optional[str] = None,
+                 user_agent: str = tfsl.auth.DEFAULT_USER_AGENT,
+                 URL: str = tfsl.auth.WIKIDATA_API_URL,
+                 lazy: bool = False,
+                 scheduler: Optional[tfsl.scheduler.WriteScheduler] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY
+                 ):
+        self.url = URL
+        self.user_agent = user_agent
+        self.headers = {"User-Agent": user_agent}
+        self.concurrency = concurrency
+        self.lazy = lazy
+        # created on first use, since they belong to the event loop running at the time
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self._login_lock: Optional[asyncio.Lock] = None
+
+        self.username = username
+        self.assert_user = None
+        self._password = password
+        self._given_token = token
+        self.csrf_token: Optional[str] = token
+        self.logged_in = False
+        self.scheduler = scheduler if scheduler is not None else tfsl.scheduler.shared_write_scheduler(URL, username or "")
+
+        if username is not None:
+            # truncate bot name if a "bot password" is used
+            self.assert_user = username.split("@")[0]
+
+    async def __aenter__(self) -> 'AsyncWikibaseSession':
+        self.open()
+        if not self.lazy and self.username is not None:
+            await self.login()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def open(self) -> aiohttp.ClientSession:
+        """ Returns the session's connection pool, creating it if needed. """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            self._login_lock = asyncio.Lock()
+        return self.session
+
+    async def close(self) -> None:
+        """ Closes the connection pool. The session may be used again afterwards, with a new one,
+            but must log in again, since the login cookies go with the old one.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.logged_in = False
+        self.csrf_token = self._given_token
+
+    async def login(self) -> None:
+        """ Logs in and obtains a CSRF token, unless this has already been done. """
+        self.open()
+        assert self._login_lock is not None
+        async with self._login_lock:
+            if self.logged_in:
+                return
+            if self.username is None:
+                raise PermissionError("Cannot log in without a username")
+            if self._password is None:
+                self._password = getpass(f"Enter password for {self.username}: ")
+
+            token_response = await self.get(tfsl.auth.token_request_params)
+            login_token = token_response["query"]["tokens"]["logintoken"]
+
+            connection_request_params = {
+                "action": "login",
+                "format": "json",
+                "lgname": self.username,
+                "lgpassword": self._password,
+                "lgtoken": login_token,
+            }
+            connection_response = await self.post(connection_request_params, 30)
+            if connection_response.get("login", {}).get("result") != "Success":
+                raise PermissionError("Login failed", connection_response["login"]["reason"])
+            logging.info("Log in succeeded")
+            self.logged_in = True
+
+            if self.csrf_token is not None:
+                logging.info("Using CSRF token: %s", self.csrf_token)
+            else:
+                await self.fetch_csrf_token()
+
+    async def fetch_csrf_token(self) -> str:
+        """ Requests a CSRF token, which the caller must hold the login lock to do. """
+        csrf_response = await self.get(tfsl.auth.csrf_token_params)
+        csrf_token: str = csrf_response["query"]["tokens"]["csrftoken"]
+        self.csrf_token = csrf_token
+        logging.info("Got CSRF token: %s", csrf_token)
+        return csrf_token
+
+    async def refresh_csrf_token(self, stale_token: Optional[str] = None) -> str:
+        """ Obtains a new CSRF token. If the token known to be stale has already
+            been replaced (by another task, for example), no request is made.
+        """
+        self.open()
+        assert self._login_lock is not None
+        async with self._login_lock:
+            if stale_token is None or self.csrf_token == stale_token:
+                return await self.fetch_csrf_token()
+            assert self.csrf_token is not None
+            return self.csrf_token
+
+    async def request(self, method: str, data: Dict[str, str], rate_limited: bool) -> AsyncResponse:
+        """ Sends a request through the scheduler, which retries it for as long as the server asks it to. """
+        session = self.open()
+        assert self.semaphore is not None
+        semaphore = self.semaphore
+        async def send() -> AsyncResponse:
+            async with semaphore:
+                if method == "GET":
+                    pending = session.get(self.url, params=data)
+                else:
+                    pending = session.post(self.url, data=data)
+                async with pending as response:
+                    return AsyncResponse(response.status, response.headers, await response.text())
+        return await self.scheduler.run_async(send, tfsl.auth.retry_after, rate_limited)
+
+    async def push(self, obj_in: I.Entity, summary: Optional[str]=None, maxlag_in: int=tfsl.auth.maxlag) -> Any:
+        """ Post data to Wikibase. """
+        return await self.push_json(obj_in.__jsonout__(), summary, maxlag_in)
+
+    async def push_json(self, data: I.EntityDict, summary: Optional[str]=None, maxlag_in: int=tfsl.auth.maxlag, new: Optional[str]=None) -> Any:
+        """ Post the JSON of an entity to Wikibase, as WikibaseSession.push_json does. """
+        requestjson = {"action": "wbeditentity", "format": "json"}
+
+        if not data.get("id", False):
+            requestjson["new"] = new if new is not None else tfsl.auth.new_entity_type(data)
+        else:
+            requestjson["id"] = data["id"]
+
+        if summary is not None:
+            requestjson["summary"] = summary
+        if self.assert_user is not None:
+            requestjson["assertuser"] = self.assert_user
+
+        requestjson["token"] = "__AUTO__"
+        requestjson["data"] = json.dumps(data)
+
+        return await self.post(requestjson, maxlag_in)
+
+    async def post(self, data: Dict[str, str], maxlag_in: int=tfsl.auth.maxlag, renew_token: bool=True) -> Any:
+        """ Post data to Wikibase, as WikibaseSession.post does: an __AUTO__ token is filled in with the CSRF token,
+            logging in first if needed, and renewed once if the API reports it as bad.
+        """
+        auto_token = data.get("token") == "__AUTO__"
+        if auto_token:
+            await self.login()
+            assert self.csrf_token is not None
+            data["token"] = self.csrf_token
+        # the login request itself is made before there is a user to assert
+        if "assertuser" not in data and self.assert_user is not None and self.logged_in:
+            data["assertuser"] = self.assert_user
+        data["maxlag"] = str(maxlag_in)
+
+        post_response = await self.request("POST", data, rate_limited=True)
+        if post_response.status_code != 200:
+            error_msg = f"POST unsuccessful ({post_response.status_code}): {post_response.text}"
+            raise Exception(error_msg)
+
+        post_response_data = post_response.json()
+        if "error" in post_response_data:
+            if post_response_data["error"]["code"] == "badtoken" and auto_token and renew_token:
+                logging.info("CSRF token rejected, renewing it")
+                await self.refresh_csrf_token(data["token"])
+                data["token"] = "__AUTO__"
+                return await self.post(data, maxlag_in, renew_token=False)
+            else:
+                raise PermissionError("API returned error: " + str(post_response_data["error"]))
+
+        logging.debug("Post request succeed")
+        return post_response_data
+
+    async def get(self, data: Dict[str, str]) -> Any:
+        """ Send a GET request to the Wikibase, waiting out any pause in effect for the session's WriteScheduler
+            but not otherwise rate limited.
+        """
+        get_response = await self.request("GET", data, rate_limited=False)
+        get_response_data = get_response.json()
+        if get_response.status_code != 200 or "error" in get_response_data:
+            raise Exception(f"GET unsuccessful ({get_response.status_code}): {get_response.text}")
+        logging.debug("Get request succeed")
+        return get_response_data
+
+    async def get_entities(self,
+                           entity_ids: Iterable[I.EntityId],
+                           projection: Optional[tfsl.projection.Projection]=None) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+        """ Retrieves the given entities, or only the given projection of them, 50 to a request with every request
+            sent at once (subject to the session's concurrency). Nothing is read from or written to the entity cache.
+        """
+        ids = list(dict.fromkeys(entity_ids))
+        chunks = [ids[start:start+tfsl.utils.MAX_IDS_PER_REQUEST] for start in range(0, len(ids), tfsl.utils.MAX_IDS_PER_REQUEST)]
+        responses = await asyncio.gather(*[self.get(entities_request(chunk, projection)) for chunk in chunks])
+        entities: Dict[I.EntityId, I.EntityPublishedSettings] = {}
+        for response in responses:
+            entities.update(response["entities"])
+        return entities
+
+def entities_request(entity_ids: List[I.EntityId], projection: Optional[tfsl.projection.Projection]=None) -> Dict[str, str]:
+    """ Returns the parameters of a wbgetentities request for the given entities. """
+    query_parameters = {
+        "action": "wbgetentities",
+        "format": "json",
+        "ids": "|".join(entity_ids)
+    }
+    if projection is not None:
+        query_parameters.update(projection.parameters())
+    return query_parameters
+
+async def get_lexemes(lids: List[I.EntityId],
+                      user_agent: str=tfsl.auth.DEFAULT_USER_AGENT,
+                      projection: Optional[tfsl.projection.Projection]=None) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+    """ Retrieves a list of lexemes (or any other entities) using the Wikidata API without logging in,
+        as tfsl.auth.get_lexemes does. To make many such calls, share one AsyncWikibaseSession instead.
+    """
+    async with AsyncWikibaseSession(user_agent=user_agent, lazy=True) as session:
+        return await session.get_entities(lids, projection)
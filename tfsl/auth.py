@@ -1,14 +1,16 @@
 """ Holds the WikibaseSession class and other functionality related to network accesses. """
 
 from getpass import getpass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Protocol, Tuple
 
 import json
 import logging
-import time
+import threading
 import requests
 
 import tfsl.interfaces as I
+import tfsl.projection
+import tfsl.scheduler
 
 maxlag: int = 5
 
@@ -27,6 +29,42 @@ csrf_token_params = {
 
 WIKIDATA_API_URL = "https://www.wikidata.org/w/api.php"
 DEFAULT_USER_AGENT = 'tfsl 0.0.1'
+DEFAULT_RETRY_AFTER = 5.0
+
+# API error codes after which the same request should be sent again later
+retryable_error_codes = {"maxlag", "ratelimited"}
+
+class HTTPResponse(Protocol):
+    """ What retry_after needs of a response, whether from requests or from an asynchronous client. """
+    @property
+    def status_code(self) -> int: ...
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+    @property
+    def text(self) -> str: ...
+    def json(self) -> Any: ...
+
+def retry_after(response: HTTPResponse) -> Optional[float]:
+    """ Returns how many seconds the server asked to wait before the request yielding the given response
+        is sent again, or None if the response is not one that should be retried.
+    """
+    if response.status_code in (429, 503):
+        return parse_retry_after(response)
+    if response.status_code == 200 and "error" in response.text[:200]:
+        try:
+            response_data = response.json()
+        except ValueError:
+            return None
+        if isinstance(response_data, dict) and response_data.get("error", {}).get("code") in retryable_error_codes:
+            return parse_retry_after(response)
+    return None
+
+def parse_retry_after(response: HTTPResponse) -> float:
+    """ Reads the Retry-After header of a response, which may be missing or an HTTP date. """
+    try:
+        return float(response.headers.get("retry-after", DEFAULT_RETRY_AFTER))
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
 
 class WikibaseSession:
     """ Auth library for Wikibases. """
@@ -35,7 +73,9 @@ class WikibaseSession:
                  password: Optional[str] = None,
                  token: Optional[str] = None,
                  user_agent: str = DEFAULT_USER_AGENT,
-                 URL: str = WIKIDATA_API_URL
+                 URL: str = WIKIDATA_API_URL,
+                 lazy: bool = False,
+                 scheduler: Optional[tfsl.scheduler.WriteScheduler] = None
                  ):
         self.url = URL
         self.user_agent = user_agent
@@ -44,54 +84,73 @@ class WikibaseSession:
 
         self.username = username
         self.assert_user = None
-        if password is not None:
-            self._password = password
-        else:
-            self._password = getpass(f"Enter password for {self.username}: ")
-
-        token_response = self.get(token_request_params)
-        login_token = token_response["query"]["tokens"]["logintoken"]
-
-        connection_request_params = {
-            "action": "login",
-            "format": "json",
-            "lgname": self.username,
-            "lgpassword": self._password,
-            "lgtoken": login_token,
-        }
-        connection_response = self.post(connection_request_params, 30)
-        if connection_response.get("login", []).get("result") != "Success":
-            raise PermissionError("Login failed", connection_response["login"]["reason"])
-        logging.info("Log in succeeded")
-
-        if token is not None:
-            self.csrf_token = token
-            logging.info("Using CSRF token: %s", self.csrf_token)
-        else:
-            csrf_response = self.get(csrf_token_params)
-            self.csrf_token = csrf_response["query"]["tokens"]["csrftoken"]
-            logging.info("Got CSRF token: %s", self.csrf_token)
+        self._password = password
+        self.csrf_token: Optional[str] = token
+        self.logged_in = False
+        self._login_lock = threading.RLock()
+        # sessions for one account share a scheduler unless given their own
+        self.scheduler = scheduler if scheduler is not None else tfsl.scheduler.shared_write_scheduler(URL, username)
 
         if username is not None:
             # truncate bot name if a "bot password" is used
             self.assert_user = username.split("@")[0]
 
+        if not lazy:
+            self.login()
+
+    def login(self) -> None:
+        """ Logs in and obtains a CSRF token, unless this has already been done. """
+        with self._login_lock:
+            if self.logged_in:
+                return
+            if self._password is None:
+                self._password = getpass(f"Enter password for {self.username}: ")
+
+            token_response = self.get(token_request_params)
+            login_token = token_response["query"]["tokens"]["logintoken"]
+
+            connection_request_params = {
+                "action": "login",
+                "format": "json",
+                "lgname": self.username,
+                "lgpassword": self._password,
+                "lgtoken": login_token,
+            }
+            connection_response = self.post(connection_request_params, 30)
+            if connection_response.get("login", []).get("result") != "Success":
+                raise PermissionError("Login failed", connection_response["login"]["reason"])
+            logging.info("Log in succeeded")
+            self.logged_in = True
+
+            if self.csrf_token is not None:
+                logging.info("Using CSRF token: %s", self.csrf_token)
+            else:
+                self.refresh_csrf_token()
+
+    def refresh_csrf_token(self, stale_token: Optional[str] = None) -> str:
+        """ Obtains a new CSRF token. If the token known to be stale has already
+            been replaced (by another thread, for example), no request is made.
+        """
+        with self._login_lock:
+            if stale_token is None or self.csrf_token == stale_token:
+                csrf_response = self.get(csrf_token_params)
+                self.csrf_token = csrf_response["query"]["tokens"]["csrftoken"]
+                logging.info("Got CSRF token: %s", self.csrf_token)
+            assert self.csrf_token is not None
+            return self.csrf_token
+
     def push(self, obj_in: I.Entity, summary: Optional[str]=None, maxlag_in: int=maxlag) -> Any:
         """ Post data to Wikibase. """
-        data = obj_in.__jsonout__()
+        return self.push_json(obj_in.__jsonout__(), summary, maxlag_in)
+
+    def push_json(self, data: I.EntityDict, summary: Optional[str]=None, maxlag_in: int=maxlag, new: Optional[str]=None) -> Any:
+        """ Post the JSON of an entity to Wikibase, as produced by its __jsonout__.
+            The kind of entity to create, if any, is worked out from the JSON unless provided.
+        """
         requestjson = {"action": "wbeditentity", "format": "json"}
 
         if not data.get("id", False):
-            if data.get("lexicalCategory", False):
-                requestjson["new"] = "lexeme"
-            elif data.get("glosses", False):
-                requestjson["new"] = "sense"
-            elif data.get("representations", False):
-                requestjson["new"] = "form"
-            elif data.get("labels", False) and data.get("sitelinks", False):
-                requestjson["new"] = "item"
-            else:
-                requestjson["new"] = "property"
+            requestjson["new"] = new if new is not None else new_entity_type(data)
         else:
             requestjson["id"] = data["id"]
 
@@ -100,57 +159,50 @@ class WikibaseSession:
         if self.assert_user is not None:
             requestjson["assertuser"] = self.assert_user
 
-        requestjson["token"] = self.csrf_token
+        requestjson["token"] = "__AUTO__"
         requestjson["data"] = json.dumps(data)
-        requestjson["maxlag"] = str(maxlag_in)
-
-        push_response = self.session.post(self.url,
-            data=requestjson, headers=self.headers, auth=None)
-        if push_response.status_code != 200:
-            error_msg = f"POST unsuccessful ({push_response.status_code}): {push_response.text}"
-            raise Exception(error_msg)
 
-        push_response_data = push_response.json()
-        if "error" in push_response_data:
-            if push_response_data["error"]["code"] == "maxlag":
-                sleepfor = float(push_response.headers.get("retry-after", 5))
-                logging.info("Maxlag hit, waiting for %.1f seconds", sleepfor)
-                time.sleep(sleepfor)
-                return self.push(obj_in)
-            else:
-                raise PermissionError("API returned error: " + str(push_response_data["error"]))
-
-        logging.debug("Post request succeed")
-        return push_response_data
+        return self.post(requestjson, maxlag_in)
 
-    def post(self, data: Dict[str, str], maxlag_in: int=maxlag) -> Any:
+    def post(self, data: Dict[str, str], maxlag_in: int=maxlag, renew_token: bool=True) -> Any:
         """ Post data to Wikibase. The CSRF token is automatically
-        filled in if __AUTO__ is given instead.
+        filled in if __AUTO__ is given instead, logging in first if needed,
+        and is renewed once if the API reports it as bad.
+        Requests are paced by the session's WriteScheduler, which also retries them
+        (with the same parameters) when the server reports maxlag or asks to retry later.
 
         :param data: Parameters to send via POST
         :type  data: Dict[str, str])
+        :param renew_token: Whether to renew an automatic token rejected as bad
+        :type  renew_token: bool
         :returns: Answer form the server as Objekt
         :rtype: Any
 
         """
-        if data.get("token") == "__AUTO__":
+        auto_token = data.get("token") == "__AUTO__"
+        if auto_token:
+            self.login()
+            assert self.csrf_token is not None
             data["token"] = self.csrf_token
-        if "assertuser" not in data and self.assert_user is not None:
+        # the login request itself is made before there is a user to assert
+        if "assertuser" not in data and self.assert_user is not None and self.logged_in:
             data["assertuser"] = self.assert_user
         data["maxlag"] = str(maxlag_in)
 
-        post_response = self.session.post(self.url, data=data, headers=self.headers, auth=None)
+        def send() -> requests.Response:
+            return self.session.post(self.url, data=data, headers=self.headers, auth=None)
+        post_response = self.scheduler.run(send, retry_after)
         if post_response.status_code != 200:
             error_msg = f"POST unsuccessful ({post_response.status_code}): {post_response.text}"
             raise Exception(error_msg)
 
         post_response_data = post_response.json()
         if "error" in post_response_data:
-            if post_response_data["error"]["code"] == "maxlag":
-                sleepfor = float(post_response.headers.get("retry-after", 5))
-                logging.info("Maxlag hit, waiting for %.1f seconds", sleepfor)
-                time.sleep(sleepfor)
-                return self.post(data)
+            if post_response_data["error"]["code"] == "badtoken" and auto_token and renew_token:
+                logging.info("CSRF token rejected, renewing it")
+                self.refresh_csrf_token(data["token"])
+                data["token"] = "__AUTO__"
+                return self.post(data, maxlag_in, renew_token=False)
             else:
                 raise PermissionError("API returned error: " + str(post_response_data["error"]))
 
@@ -158,7 +210,8 @@ class WikibaseSession:
         return post_response_data
 
     def get(self, data: Dict[str, str]) -> Any:
-        """Send a GET request to wikidata
+        """Send a GET request to wikidata. This waits out any pause in effect
+        for the session's WriteScheduler, but is not otherwise rate limited.
 
         :param data: Parameters to send via GET
         :type  data: Dict[str, str]
@@ -166,28 +219,58 @@ class WikibaseSession:
         :rtype: Any
 
         """
-        get_response = self.session.get(self.url, params=data, headers=self.headers)
+        # We do not set maxlag for GET requests – so that error can only
+        # occur if the users sets maxlag in the request data object
+        def send() -> requests.Response:
+            return self.session.get(self.url, params=data, headers=self.headers)
+        get_response = self.scheduler.run(send, retry_after, rate_limited=False)
         get_response_data = get_response.json()
         if get_response.status_code != 200 or "error" in get_response_data:
-            # We do not set maxlag for GET requests – so this error can only
-            # occur if the users sets maxlag in the request data object
-            if get_response_data["error"]["code"] == "maxlag":
-                sleepfor = float(get_response.headers.get("retry-after", 5))
-                logging.info("Maxlag hit, waiting for %.1f seconds", sleepfor)
-                time.sleep(sleepfor)
-                return self.get(data)
-            else:
-                raise Exception(f"GET unsuccessful ({get_response.status_code}): {get_response.text}")
+            raise Exception(f"GET unsuccessful ({get_response.status_code}): {get_response.text}")
         logging.debug("Get request succeed")
         return get_response_data
 
-def get_lexemes(lids: List[I.EntityId], user_agent: str=DEFAULT_USER_AGENT) -> Dict[I.EntityId, I.EntityPublishedSettings]:
-    """ Retrieves a list of lexemes using the Wikidata API. """
+def new_entity_type(data: I.EntityDict) -> str:
+    """ Determines the value of wbeditentity's "new" parameter for the JSON of an entity without an id. """
+    if data.get("lexicalCategory", False):
+        return "lexeme"
+    elif data.get("glosses", False):
+        return "sense"
+    elif data.get("representations", False):
+        return "form"
+    elif data.get("labels", False) and data.get("sitelinks", False):
+        return "item"
+    return "property"
+
+_shared_sessions: Dict[Tuple[str, str], WikibaseSession] = {}
+_shared_sessions_lock = threading.Lock()
+
+def shared_session(username: str,
+                   password: Optional[str] = None,
+                   user_agent: str = DEFAULT_USER_AGENT,
+                   URL: str = WIKIDATA_API_URL) -> WikibaseSession:
+    """ Returns the process-wide WikibaseSession for the given user on the given Wikibase.
+        The session is created on first use but only logs in once it is first used to edit,
+        after which its connection pool and CSRF token are shared by every caller.
+    """
+    with _shared_sessions_lock:
+        key = (URL, username)
+        if key not in _shared_sessions:
+            _shared_sessions[key] = WikibaseSession(username, password,
+                user_agent=user_agent, URL=URL, lazy=True)
+        return _shared_sessions[key]
+
+def get_lexemes(lids: List[I.EntityId],
+                user_agent: str=DEFAULT_USER_AGENT,
+                projection: Optional[tfsl.projection.Projection]=None) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+    """ Retrieves a list of lexemes using the Wikidata API, or only the given projection of them. """
     query_parameters = {
         "action": "wbgetentities",
         "format": "json",
         "ids": "|".join(lids)
     }
+    if projection is not None:
+        query_parameters.update(projection.parameters())
     current_headers = {
         "User-Agent": user_agent
     }
@@ -199,3 +282,40 @@ def get_lexemes(lids: List[I.EntityId], user_agent: str=DEFAULT_USER_AGENT) -> D
         returned_entities: Dict[I.EntityId, I.EntityPublishedSettings] = data_output["entities"]
         return returned_entities
     raise ValueError(f"Response from retrieving {lids} not valid JSON")
+
+ENTITY_NAMESPACE_PREFIXES = {"L": "Lexeme:", "P": "Property:", "Q": ""}
+
+def entity_title(entity_id: I.EntityId) -> str:
+    """ Returns the title of the page holding the entity with the given id. """
+    return ENTITY_NAMESPACE_PREFIXES[entity_id[0]] + entity_id
+
+def get_revision_ids(entity_ids: List[I.EntityId], user_agent: str=DEFAULT_USER_AGENT) -> Dict[I.EntityId, int]:
+    """ Retrieves the current revision ids of the given entities using the Wikidata API,
+        without their contents. Entities which do not exist are left out.
+    """
+    titles = {entity_title(entity_id): entity_id for entity_id in entity_ids}
+    query_parameters = {
+        "action": "query",
+        "format": "json",
+        "prop": "info",
+        "titles": "|".join(titles)
+    }
+    current_headers = {
+        "User-Agent": user_agent
+    }
+    get_response = requests.get(WIKIDATA_API_URL, params=query_parameters, headers=current_headers)
+    if get_response.status_code != 200:
+        raise Exception(f"GET unsuccessful ({get_response.status_code}): {get_response.text}")
+    data_output = get_response.json()
+    if "error" in data_output:
+        raise PermissionError("API returned error: " + str(data_output["error"]))
+    if not isinstance(data_output, dict) or "query" not in data_output:
+        raise ValueError(f"Response from retrieving revisions of {entity_ids} not valid JSON")
+    for normalization in data_output["query"].get("normalized", []):
+        if normalization["from"] in titles:
+            titles[normalization["to"]] = titles[normalization["from"]]
+    revision_ids: Dict[I.EntityId, int] = {}
+    for page in data_output["query"].get("pages", {}).values():
+        if "missing" not in page and page.get("title") in titles:
+            revision_ids[titles[page["title"]]] = page["lastrevid"]
+    return revision_ids
@@ -0,0 +1,63 @@
+""" Writing entity edits to batch files instead of submitting them, and submitting them later. """
+
+import json
+from typing import Any, Dict, IO, Iterable, Iterator, Optional, Tuple
+
+import tfsl.interfaces as I
+import tfsl.auth
+
+BatchRecord = Dict[str, Any]
+
+class BatchWriter:
+    """ Appends one line of JSON per edit to a batch file: the entity JSON to submit as "data",
+        the edit summary, and for new entities the kind of entity to create as "new".
+        No login or network access of any kind takes place.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.fileptr: IO[str] = open(path, "a", encoding="utf-8")
+
+    def write(self, obj_in: I.Entity, summary: Optional[str]=None, **extra: Any) -> BatchRecord:
+        """ Writes the edit submitting the provided entity, along with any extra fields
+            (such as an identifier from the data source) which should accompany it.
+        """
+        data = obj_in.__jsonout__()
+        record: BatchRecord = dict(extra)
+        record["data"] = data
+        if summary is not None:
+            record["summary"] = summary
+        if not data.get("id", False):
+            record["new"] = tfsl.auth.new_entity_type(data)
+        self.fileptr.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # flushed so that an interrupted run loses no edit it went on to record as exported
+        self.fileptr.flush()
+        return record
+
+    def close(self) -> None:
+        self.fileptr.close()
+
+    def __enter__(self) -> 'BatchWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+def iter_batch(path: str) -> Iterator[BatchRecord]:
+    """ Yields the edits in a batch file in the order they were written. """
+    with open(path, encoding="utf-8") as fileptr:
+        for line in fileptr:
+            if line.strip():
+                record: BatchRecord = json.loads(line)
+                yield record
+
+def replay_batch(session: 'tfsl.auth.WikibaseSession', records: Iterable[BatchRecord]) -> Iterator[Tuple[BatchRecord, Any]]:
+    """ Submits edits (such as those from iter_batch) one after another, yielding each edit with the API response.
+        A failed edit yields the exception it raised instead, and the rest of the batch continues.
+    """
+    for record in records:
+        try:
+            response = session.push_json(record["data"], record.get("summary"), new=record.get("new"))
+        except Exception as exception: # pylint: disable=broad-except
+            yield record, exception
+            continue
+        yield record, response
@@ -0,0 +1,683 @@
+""" Backends keeping the JSON of retrieved entities between runs. """
+
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, DefaultDict, Dict, Generic, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Type, TypeVar
+
+import filelock
+
+import tfsl.interfaces as I
+import tfsl.projection
+
+try:
+    import zstandard # type: ignore[import]
+except ImportError:
+    zstandard = None # type: ignore
+
+# well below the oldest SQLite limit of 999 parameters in one statement
+MAX_IDS_PER_QUERY = 500
+
+COMPRESSION_SUFFIXES = {"gzip": ".json.gz", "zstd": ".json.zst", "none": ".json"}
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_LEVEL = 6
+
+# last access times are only recorded, and entries only ordered for eviction, to within this many seconds
+ACCESS_TIME_RESOLUTION = 3600.0
+# temporary files older than this were left behind by writers that were killed
+STALE_TEMPORARY_FILE_AGE = 3600.0
+
+# how many lock files the keys of a cache are spread over
+LOCK_STRIPES = 1024
+
+# what reading a truncated or otherwise damaged entry may raise
+CORRUPT_ENTRY_ERRORS: Tuple[Type[BaseException], ...] = (OSError, EOFError, ValueError, zlib.error)
+if zstandard is not None:
+    CORRUPT_ENTRY_ERRORS += (zstandard.ZstdError,)
+
+def available_compression(compression: str) -> str:
+    """ Returns the given compression if it can be used here, falling back from zstd to gzip
+        when the zstandard package is not installed.
+    """
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"{compression} is not one of the cache compressions {list(COMPRESSION_SUFFIXES)}")
+    if compression == "zstd" and zstandard is None:
+        logging.warning("zstandard is not installed, so the entity cache is compressed with gzip instead")
+        return "gzip"
+    return compression
+
+def encode_json(contents: Any, compression: str) -> bytes:
+    """ Serializes JSON, compressed as given. """
+    encoded = json.dumps(contents).encode("utf-8")
+    if compression == "gzip":
+        return gzip.compress(encoded, compresslevel=GZIP_LEVEL)
+    elif compression == "zstd":
+        return zstandard.ZstdCompressor().compress(encoded)
+    return encoded
+
+def decode_json(blob: bytes) -> Any:
+    """ Deserializes JSON, recognizing how (if at all) it was compressed by its first bytes. """
+    if blob.startswith(GZIP_MAGIC):
+        blob = gzip.decompress(blob)
+    elif blob.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("Cached entity is compressed with zstd, but zstandard is not installed")
+        blob = zstandard.ZstdDecompressor().decompress(blob)
+    return json.loads(blob)
+
+def encode_entity_file(data: I.EntityPublishedSettings, compression: str, projection: Optional[tfsl.projection.Projection]=None) -> bytes:
+    """ Serializes the contents of a file of a DirectoryCache: the JSON of an entity,
+        or if only part of it was retrieved, a JSON array of the projection it was retrieved with and its JSON.
+    """
+    contents: Any = data if projection is None else [projection.to_json(), data]
+    return encode_json(contents, compression)
+
+def decode_entity_file(blob: bytes) -> Tuple[I.EntityPublishedSettings, Optional[tfsl.projection.Projection]]:
+    """ Reverses encode_entity_file. Since entity JSON is always an object, the two kinds of file cannot be confused. """
+    contents = decode_json(blob)
+    if isinstance(contents, list):
+        projection_json, data = contents
+        return data, tfsl.projection.from_json(projection_json)
+    return contents, None
+
+class CollectionReport(NamedTuple):
+    """ What a garbage collection of an entity cache found and removed. """
+    scanned: int
+    removed: int
+    reclaimed_bytes: int
+    remaining_entries: int
+    remaining_bytes: int
+
+def within_bounds(entries: int, size: int, max_entries: Optional[int], max_bytes: Optional[int]) -> bool:
+    """ Checks that a number of entries and their total size are within the given maximums, if any. """
+    return (max_entries is None or entries <= max_entries) and (max_bytes is None or size <= max_bytes)
+
+class CachedEntity(NamedTuple):
+    """ The JSON of an entity, when it was retrieved, which revision of it that was,
+        and which part of it was retrieved (None meaning all of it).
+    """
+    data: I.EntityPublishedSettings
+    fetched_at: float
+    lastrevid: Optional[int]
+    projection: Optional[tfsl.projection.Projection] = None
+
+class KeyLocks:
+    """ Claims on individual keys, shared by the threads of a process and,
+        if a directory for lock files is provided, by the processes using that directory.
+        Claims never wait: a key held elsewhere is skipped, so that holding keys (across a retrieval, say)
+        holds up nobody wanting other keys, and those wanting the same keys can do something else meanwhile.
+        Keys share a fixed number of lock files, each key always taking the same one, so that the directory
+        does not grow with the number of keys. The threads of a process share their process's hold on a lock file,
+        since a FileLock counts its holders.
+    """
+    def __init__(self, directory: Optional[str]=None, stripes: int=LOCK_STRIPES):
+        self.directory = directory
+        self.stripes = stripes
+        self.file_locks: List[filelock.BaseFileLock] = []
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.file_locks = [filelock.FileLock(os.path.join(directory, f"{stripe:04d}.lock")) for stripe in range(stripes)]
+        self.held: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def stripe(self, key: str) -> int:
+        """ Returns which lock file a key takes, the same in every process. """
+        return zlib.crc32(key.encode("utf-8")) % self.stripes
+
+    def try_acquire(self, key: str) -> bool:
+        """ Claims a key unless another thread holds it, or another process holds a key with the same lock file. """
+        with self.lock:
+            if key in self.held:
+                return False
+            if self.directory is not None:
+                try:
+                    self.file_locks[self.stripe(key)].acquire(blocking=False)
+                except filelock.Timeout:
+                    return False
+            self.held.add(key)
+            return True
+
+    def release(self, key: str) -> None:
+        with self.lock:
+            self.held.remove(key)
+            if self.directory is not None:
+                self.file_locks[self.stripe(key)].release()
+
+    @contextmanager
+    def claim(self, keys: Iterable[str]) -> Iterator[List[str]]:
+        """ Claims those of the given keys which can be claimed at once, yielding them, and releases them afterwards. """
+        claimed: List[str] = []
+        try:
+            for key in dict.fromkeys(keys):
+                if self.try_acquire(key):
+                    claimed.append(key)
+            yield claimed
+        finally:
+            for key in claimed:
+                self.release(key)
+
+class EntityCache:
+    """ Storage of entity JSON keyed by entity id. Backends implement the bulk methods. """
+    def __init__(self, lock_directory: Optional[str]=None):
+        self.locks = KeyLocks(lock_directory)
+
+    def claimed(self, entity_ids: Iterable[I.EntityId]) -> ContextManager[List[str]]:
+        """ Claims those of the entities with the given ids which no other thread or process sharing the cache
+            has claimed, such as while retrieving them, yielding the ids claimed.
+        """
+        return self.locks.claim(entity_ids)
+
+    def get_many(self, entity_ids: Iterable[I.EntityId]) -> Dict[I.EntityId, CachedEntity]:
+        """ Returns those of the entities with the given ids which are stored, keyed by id. """
+        raise NotImplementedError
+
+    def put_many(self,
+                 entities: Dict[I.EntityId, I.EntityPublishedSettings],
+                 fetched_at: Optional[float]=None,
+                 projection: Optional[tfsl.projection.Projection]=None) -> None:
+        """ Stores the given entities, as retrieved at the given time (by default, now) with the given projection. """
+        raise NotImplementedError
+
+    def delete_many(self, entity_ids: Iterable[I.EntityId]) -> None:
+        """ Removes the entities with the given ids, if stored. """
+        raise NotImplementedError
+
+    def touch_many(self, entity_ids: Iterable[I.EntityId], fetched_at: Optional[float]=None) -> None:
+        """ Marks the stored entities with the given ids as current at the given time (by default, now)
+            without rewriting them.
+        """
+        raise NotImplementedError
+
+    def get(self, entity_id: I.EntityId) -> Optional[CachedEntity]:
+        """ Returns the entity with the given id if it is stored. """
+        return self.get_many([entity_id]).get(entity_id)
+
+    def put(self, entity_id: I.EntityId, data: I.EntityPublishedSettings, fetched_at: Optional[float]=None) -> None:
+        """ Stores one entity. """
+        self.put_many({entity_id: data}, fetched_at)
+
+    def delete(self, entity_id: I.EntityId) -> None:
+        """ Removes one entity, if stored. """
+        self.delete_many([entity_id])
+
+    def collect_garbage(self,
+                        max_age: Optional[float]=None,
+                        max_entries: Optional[int]=None,
+                        max_bytes: Optional[int]=None) -> CollectionReport:
+        """ Removes the entities retrieved more than max_age seconds ago, then the least recently used entities
+            until at most max_entries entities taking at most max_bytes bytes remain. Omitted limits are not enforced.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """ Releases anything the backend holds open. """
+
+class DirectoryCache(EntityCache):
+    """ One file per entity in a directory, with the time of retrieval as its modification time.
+        Files are written with the given compression, and their names end in .json.gz, .json.zst or .json to match;
+        files written with another compression are still read, and are replaced when their entity is next written.
+    """
+    def __init__(self, path: str, compression: str="gzip"):
+        super().__init__(os.path.join(path, "locks"))
+        self.path = path
+        self.compression = available_compression(compression)
+        self.suffixes = [COMPRESSION_SUFFIXES[self.compression]]
+        self.suffixes += [suffix for suffix in COMPRESSION_SUFFIXES.values() if suffix not in self.suffixes]
+        os.makedirs(path, exist_ok=True)
+
+    def filename(self, entity_id: I.EntityId, suffix: Optional[str]=None) -> str:
+        """ Returns the path of the file holding the entity with the given id, by default as written now. """
+        return os.path.join(self.path, entity_id + (suffix or self.suffixes[0]))
+
+    def get_many(self, entity_ids: Iterable[I.EntityId]) -> Dict[I.EntityId, CachedEntity]:
+        entities: Dict[I.EntityId, CachedEntity] = {}
+        for entity_id in entity_ids:
+            for suffix in self.suffixes:
+                filename = self.filename(entity_id, suffix)
+                try:
+                    stat = os.stat(filename)
+                    with open(filename, "rb") as fileptr:
+                        data, projection = decode_entity_file(fileptr.read())
+                    self.record_access(filename, stat)
+                except CORRUPT_ENTRY_ERRORS:
+                    continue
+                entities[entity_id] = CachedEntity(data, stat.st_mtime, data.get("lastrevid"), projection)
+                break
+        return entities
+
+    def put_many(self,
+                 entities: Dict[I.EntityId, I.EntityPublishedSettings],
+                 fetched_at: Optional[float]=None,
+                 projection: Optional[tfsl.projection.Projection]=None) -> None:
+        for entity_id, data in entities.items():
+            # written in full to a temporary file first, so that readers see either the old entry or the new one
+            fileno, temp_path = tempfile.mkstemp(dir=self.path, prefix=f".{entity_id}.", suffix=".tmp")
+            try:
+                with os.fdopen(fileno, "wb") as fileptr:
+                    fileptr.write(encode_entity_file(data, self.compression, projection))
+                if fetched_at is not None:
+                    os.utime(temp_path, (fetched_at, fetched_at))
+                os.replace(temp_path, self.filename(entity_id))
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            self.remove_files(entity_id, self.suffixes[1:])
+
+    @staticmethod
+    def record_access(filename: str, stat: os.stat_result) -> None:
+        """ Sets the access time of a file just read, since file systems mounted with noatime or relatime
+            may not; the modification time, which is when the entity was retrieved, is kept.
+        """
+        now = time.time()
+        if now - stat.st_atime > ACCESS_TIME_RESOLUTION:
+            os.utime(filename, (now, stat.st_mtime))
+
+    def remove_files(self, entity_id: I.EntityId, suffixes: Iterable[str]) -> None:
+        """ Removes the files for the entity with the given id ending in the given suffixes, if any. """
+        for suffix in suffixes:
+            try:
+                os.remove(self.filename(entity_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def delete_many(self, entity_ids: Iterable[I.EntityId]) -> None:
+        for entity_id in entity_ids:
+            self.remove_files(entity_id, self.suffixes)
+
+    def touch_many(self, entity_ids: Iterable[I.EntityId], fetched_at: Optional[float]=None) -> None:
+        if fetched_at is None:
+            fetched_at = time.time()
+        for entity_id in entity_ids:
+            for suffix in self.suffixes:
+                try:
+                    os.utime(self.filename(entity_id, suffix), (fetched_at, fetched_at))
+                    break
+                except FileNotFoundError:
+                    continue
+
+    def scan(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """ Yields the path and status of each entity file in the directory,
+            removing temporary files left behind by killed writers along the way.
+        """
+        now = time.time()
+        suffixes = tuple(COMPRESSION_SUFFIXES.values())
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.startswith("."):
+                        if entry.name.endswith(".tmp") and now - entry.stat().st_mtime > STALE_TEMPORARY_FILE_AGE:
+                            os.remove(entry.path)
+                    elif entry.name.endswith(suffixes) and I.is_EntityId(entry.name.split(".", 1)[0]) and entry.is_file():
+                        yield entry.path, entry.stat()
+                except FileNotFoundError:
+                    continue
+
+    @staticmethod
+    def remove_file(path: str) -> bool:
+        """ Removes a file, returning whether it still existed to be removed. """
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def collect_garbage(self,
+                        max_age: Optional[float]=None,
+                        max_entries: Optional[int]=None,
+                        max_bytes: Optional[int]=None) -> CollectionReport:
+        """ Removes entities as with EntityCache.collect_garbage, deleting files as it goes.
+            The first pass over the directory removes expired entities and counts the rest by hour of last access;
+            any second pass removes whole hours of least recently used entities, and within the last hour only
+            as many as needed. Only the entries of that one hour are ever held in memory.
+        """
+        now = time.time()
+        scanned = removed = reclaimed_bytes = 0
+        # hour of last access -> [entries, bytes]
+        histogram: DefaultDict[int, List[int]] = defaultdict(lambda: [0, 0])
+        for path, stat in self.scan():
+            scanned += 1
+            if max_age is not None and now - stat.st_mtime >= max_age:
+                if self.remove_file(path):
+                    removed += 1
+                    reclaimed_bytes += stat.st_size
+                continue
+            counts = histogram[int(max(stat.st_atime, stat.st_mtime) // ACCESS_TIME_RESOLUTION)]
+            counts[0] += 1
+            counts[1] += stat.st_size
+        remaining_entries = sum(counts[0] for counts in histogram.values())
+        remaining_bytes = sum(counts[1] for counts in histogram.values())
+        if within_bounds(remaining_entries, remaining_bytes, max_entries, max_bytes):
+            return CollectionReport(scanned, removed, reclaimed_bytes, remaining_entries, remaining_bytes)
+
+        kept_entries = kept_bytes = 0
+        cutoff = max(histogram)
+        for hour in sorted(histogram, reverse=True):
+            cutoff = hour
+            if not within_bounds(kept_entries + histogram[hour][0], kept_bytes + histogram[hour][1], max_entries, max_bytes):
+                break
+            kept_entries += histogram[hour][0]
+            kept_bytes += histogram[hour][1]
+
+        boundary: List[Tuple[float, int, str]] = []
+        for path, stat in self.scan():
+            last_access = max(stat.st_atime, stat.st_mtime)
+            hour = int(last_access // ACCESS_TIME_RESOLUTION)
+            if hour == cutoff:
+                boundary.append((last_access, stat.st_size, path))
+            elif hour < cutoff and self.remove_file(path):
+                removed += 1
+                reclaimed_bytes += stat.st_size
+        boundary.sort(reverse=True)
+        keeping = True
+        for _, size, path in boundary:
+            keeping = keeping and within_bounds(kept_entries + 1, kept_bytes + size, max_entries, max_bytes)
+            if keeping:
+                kept_entries += 1
+                kept_bytes += size
+            elif self.remove_file(path):
+                removed += 1
+                reclaimed_bytes += size
+        return CollectionReport(scanned, removed, reclaimed_bytes, kept_entries, kept_bytes)
+
+class SQLiteCache(EntityCache):
+    """ A single SQLite database in write-ahead logging mode, holding each entity as JSON compressed as given.
+        Several threads and processes may use the same database at once.
+    """
+    def __init__(self, path: str, compression: str="gzip", timeout: float=60.0):
+        super().__init__(path + ".locks")
+        self.path = path
+        self.compression = available_compression(compression)
+        self.timeout = timeout
+        self.local = threading.local()
+        # every connection opened by any thread, so that close() can close them all
+        self.connections: List[sqlite3.Connection] = []
+        self.connections_lock = threading.Lock()
+        with self.connection() as connection:
+            connection.execute("""CREATE TABLE IF NOT EXISTS entities (
+                id TEXT PRIMARY KEY,
+                lastrevid INTEGER,
+                fetched_at REAL NOT NULL,
+                data BLOB NOT NULL,
+                accessed_at REAL,
+                projection TEXT
+            )""")
+            columns = [column[1] for column in connection.execute("PRAGMA table_info(entities)")]
+            if "accessed_at" not in columns:
+                connection.execute("ALTER TABLE entities ADD COLUMN accessed_at REAL")
+            if "projection" not in columns:
+                connection.execute("ALTER TABLE entities ADD COLUMN projection TEXT")
+            connection.execute("CREATE INDEX IF NOT EXISTS entities_accessed_at ON entities (accessed_at)")
+
+    def connection(self) -> sqlite3.Connection:
+        """ Returns the connection to the database for the current thread, opening it if needed. """
+        connection: Optional[sqlite3.Connection] = getattr(self.local, "connection", None)
+        if connection is None:
+            # each connection is still used by one thread only, but close() may close it from another
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return connection
+
+    def get_many(self, entity_ids: Iterable[I.EntityId]) -> Dict[I.EntityId, CachedEntity]:
+        ids = list(dict.fromkeys(entity_ids))
+        entities: Dict[I.EntityId, CachedEntity] = {}
+        now = time.time()
+        accessed: List[I.EntityId] = []
+        connection = self.connection()
+        for start in range(0, len(ids), MAX_IDS_PER_QUERY):
+            chunk = ids[start:start+MAX_IDS_PER_QUERY]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(f"SELECT id, lastrevid, fetched_at, data, accessed_at, projection FROM entities WHERE id IN ({placeholders})", chunk)
+            for entity_id, lastrevid, fetched_at, blob, accessed_at, projection_text in rows:
+                try:
+                    data: I.EntityPublishedSettings = decode_json(blob)
+                except CORRUPT_ENTRY_ERRORS:
+                    continue
+                projection = None if projection_text is None else tfsl.projection.from_json(json.loads(projection_text))
+                entities[entity_id] = CachedEntity(data, fetched_at, lastrevid, projection)
+                if accessed_at is None or now - accessed_at > ACCESS_TIME_RESOLUTION:
+                    accessed.append(entity_id)
+        if accessed:
+            with connection:
+                connection.executemany("UPDATE entities SET accessed_at = ? WHERE id = ?", [(now, entity_id) for entity_id in accessed])
+        return entities
+
+    def put_many(self,
+                 entities: Dict[I.EntityId, I.EntityPublishedSettings],
+                 fetched_at: Optional[float]=None,
+                 projection: Optional[tfsl.projection.Projection]=None) -> None:
+        if fetched_at is None:
+            fetched_at = time.time()
+        projection_text = None if projection is None else json.dumps(projection.to_json())
+        rows = [
+            (entity_id, data.get("lastrevid"), fetched_at, encode_json(data, self.compression), time.time(), projection_text)
+            for entity_id, data in entities.items()
+        ]
+        with self.connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO entities (id, lastrevid, fetched_at, data, accessed_at, projection) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_many(self, entity_ids: Iterable[I.EntityId]) -> None:
+        ids: List[I.EntityId] = list(entity_ids)
+        with self.connection() as connection:
+            connection.executemany("DELETE FROM entities WHERE id = ?", [(entity_id,) for entity_id in ids])
+
+    def touch_many(self, entity_ids: Iterable[I.EntityId], fetched_at: Optional[float]=None) -> None:
+        if fetched_at is None:
+            fetched_at = time.time()
+        with self.connection() as connection:
+            connection.executemany("UPDATE entities SET fetched_at = ? WHERE id = ?", [(fetched_at, entity_id) for entity_id in entity_ids])
+
+    def collect_garbage(self,
+                        max_age: Optional[float]=None,
+                        max_entries: Optional[int]=None,
+                        max_bytes: Optional[int]=None) -> CollectionReport:
+        """ Removes entities as with EntityCache.collect_garbage, counting their compressed JSON as their size.
+            The database file itself only shrinks once VACUUM is run on it; until then, new entries reuse the space.
+        """
+        connection = self.connection()
+        scanned, total_bytes = connection.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM entities").fetchone()
+        removed = reclaimed_bytes = 0
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            with connection:
+                removed, reclaimed_bytes = connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM entities WHERE fetched_at <= ?", (cutoff,)).fetchone()
+                connection.execute("DELETE FROM entities WHERE fetched_at <= ?", (cutoff,))
+        remaining_entries = scanned - removed
+        remaining_bytes = total_bytes - reclaimed_bytes
+        evicted: List[I.EntityId] = []
+        if not within_bounds(remaining_entries, remaining_bytes, max_entries, max_bytes):
+            rows = connection.execute("SELECT id, LENGTH(data) FROM entities ORDER BY accessed_at")
+            for entity_id, size in rows:
+                if within_bounds(remaining_entries, remaining_bytes, max_entries, max_bytes):
+                    break
+                evicted.append(entity_id)
+                remaining_entries -= 1
+                remaining_bytes -= size
+                reclaimed_bytes += size
+            for start in range(0, len(evicted), MAX_IDS_PER_QUERY):
+                self.delete_many(evicted[start:start+MAX_IDS_PER_QUERY])
+        return CollectionReport(scanned, removed + len(evicted), reclaimed_bytes, remaining_entries, remaining_bytes)
+
+    def close(self) -> None:
+        """ Closes the connections of every thread, which must no longer be using them.
+            Threads using the cache afterwards open new ones.
+        """
+        with self.connections_lock:
+            connections, self.connections = self.connections, []
+            self.local = threading.local()
+        for connection in connections:
+            connection.close()
+
+KeyT = TypeVar('KeyT', bound=Hashable)
+ValueT = TypeVar('ValueT')
+
+class CacheStats(NamedTuple):
+    """ Counts of lookups in an LRUCache and of what it holds. """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """ Mapping which discards its least recently used entries beyond a maximum number of entries
+        or a maximum total size, where the size of each value is given by the sizeof function.
+        A maximum of None leaves that quantity unbounded.
+    """
+    def __init__(self,
+                 max_entries: Optional[int]=None,
+                 max_size: Optional[int]=None,
+                 sizeof: Callable[[ValueT], int]=lambda value: 1):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.entries: 'OrderedDict[KeyT, Tuple[ValueT, int]]' = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: KeyT) -> Optional[ValueT]:
+        """ Returns the value for the key, if present, marking it as the most recently used. """
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def peek(self, key: KeyT) -> Optional[ValueT]:
+        """ Returns the value for the key, if present, without counting a lookup or marking it as used. """
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def put(self, key: KeyT, value: ValueT) -> None:
+        """ Stores a value for the key, then discards entries until the cache is within its bounds. """
+        value_size = self.sizeof(value) if self.max_size is not None else 0
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (value, value_size)
+            self.size += value_size
+            while self.entries and ((self.max_entries is not None and len(self.entries) > self.max_entries)
+                                    or (self.max_size is not None and self.size > self.max_size)):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key: KeyT) -> None:
+        """ Discards the value for the key, if present. """
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+
+    def clear(self) -> None:
+        """ Discards every entry, leaving the counters as they are. """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> CacheStats:
+        """ Returns the counters of the cache along with its current number of entries and size. """
+        with self.lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self.entries), self.size)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+def json_size(entry: CachedEntity) -> int:
+    """ Approximates the memory taken by a cached entity by the length of its JSON. """
+    return len(json.dumps(entry.data))
+
+class MemoryCache(EntityCache):
+    """ Keeps recently used entities in memory in front of another EntityCache, which every write goes through to.
+        The JSON it returns is shared between callers, so it must not be modified.
+    """
+    def __init__(self, backing: EntityCache, max_entries: Optional[int]=None, max_bytes: Optional[int]=None):
+        super().__init__()
+        self.backing = backing
+        self.memory: LRUCache[I.EntityId, CachedEntity] = LRUCache(max_entries, max_bytes, json_size)
+
+    def get_many(self, entity_ids: Iterable[I.EntityId]) -> Dict[I.EntityId, CachedEntity]:
+        entities: Dict[I.EntityId, CachedEntity] = {}
+        missed: List[I.EntityId] = []
+        for entity_id in dict.fromkeys(entity_ids):
+            if (entry := self.memory.get(entity_id)) is not None:
+                entities[entity_id] = entry
+            else:
+                missed.append(entity_id)
+        if missed:
+            for entity_id, entry in self.backing.get_many(missed).items():
+                self.memory.put(entity_id, entry)
+                entities[entity_id] = entry
+        return entities
+
+    def put_many(self,
+                 entities: Dict[I.EntityId, I.EntityPublishedSettings],
+                 fetched_at: Optional[float]=None,
+                 projection: Optional[tfsl.projection.Projection]=None) -> None:
+        if fetched_at is None:
+            fetched_at = time.time()
+        self.backing.put_many(entities, fetched_at, projection)
+        for entity_id, data in entities.items():
+            self.memory.put(entity_id, CachedEntity(data, fetched_at, data.get("lastrevid"), projection))
+
+    def delete_many(self, entity_ids: Iterable[I.EntityId]) -> None:
+        ids = list(entity_ids)
+        self.backing.delete_many(ids)
+        for entity_id in ids:
+            self.memory.pop(entity_id)
+
+    def touch_many(self, entity_ids: Iterable[I.EntityId], fetched_at: Optional[float]=None) -> None:
+        if fetched_at is None:
+            fetched_at = time.time()
+        ids = list(entity_ids)
+        self.backing.touch_many(ids, fetched_at)
+        for entity_id in ids:
+            if (entry := self.memory.peek(entity_id)) is not None:
+                self.memory.put(entity_id, entry._replace(fetched_at=fetched_at))
+
+    def claimed(self, entity_ids: Iterable[I.EntityId]) -> ContextManager[List[str]]:
+        return self.backing.claimed(entity_ids)
+
+    def collect_garbage(self,
+                        max_age: Optional[float]=None,
+                        max_entries: Optional[int]=None,
+                        max_bytes: Optional[int]=None) -> CollectionReport:
+        self.memory.clear()
+        return self.backing.collect_garbage(max_age, max_entries, max_bytes)
+
+    def stats(self) -> CacheStats:
+        """ Returns the counters of the in-memory layer. """
+        return self.memory.stats()
+
+    def close(self) -> None:
+        self.memory.clear()
+        self.backing.close()
+
+CACHE_BACKENDS = ["directory", "sqlite"]
+
+def open_cache(backend: str, path: str, compression: str="gzip") -> EntityCache:
+    """ Opens an entity cache of the given kind in the given directory. """
+    if backend == "directory":
+        return DirectoryCache(path, compression)
+    elif backend == "sqlite":
+        os.makedirs(path, exist_ok=True)
+        return SQLiteCache(os.path.join(path, "entities.sqlite3"), compression)
+    raise ValueError(f"{backend} is not one of the entity cache backends {CACHE_BACKENDS}")
@@ -22,14 +22,21 @@ type_string_to_type: Dict[str, type] = {
 class Claim:
     """ Representation of a claim, or a property-predicate pair.
         These may be added to statements directly, as qualifiers, or as parts of references.
+        A datatype provided when constructing one (such as from Wikibase JSON) is trusted:
+        the property's datatype is not looked up and the value is not checked against it.
     """
-    def __init__(self, property_in: I.Pid, value: I.ClaimValue):
+    def __init__(self, property_in: I.Pid, value: I.ClaimValue, datatype: Optional[str]=None):
         self.property: I.Pid = property_in
         self.value: I.ClaimValue
-        self.datatype: str = tfsl.utils.values_datatype(self.property)
-        if tfsl.utils.is_novalue(value) or tfsl.utils.is_somevalue(value):
+        self.datatype: str
+        if datatype is not None:
+            self.datatype = datatype
+            self.value = value
+        elif tfsl.utils.is_novalue(value) or tfsl.utils.is_somevalue(value):
+            self.datatype = tfsl.utils.values_datatype(self.property)
             self.value = value
         else:
+            self.datatype = tfsl.utils.values_datatype(self.property)
             value_type = type(value)
             property_type = type_string_to_type[tfsl.utils.external_to_internal_type_mapping[self.datatype]]
             if property_type == value_type:
@@ -68,13 +75,13 @@ class Claim:
         if value_out is not None:
             datavalue_out = {
                 "value": value_out,
-                "type": tfsl.utils.values_type(self.property)
+                "type": tfsl.utils.external_to_internal_type_mapping[self.datatype]
             }
 
         claimdict_out: I.ClaimDict = {
             "snaktype": snaktype,
             "property": self.property,
-            "datatype": tfsl.utils.values_datatype(self.property),
+            "datatype": self.datatype,
         }
         if datavalue_out is not None:
             claimdict_out["datavalue"] = datavalue_out
@@ -142,8 +149,10 @@ def build_value(actual_value: Union[str, I.ClaimDictValueDictionary]) -> I.Claim
         return tfsl.timevalue.build_timevalue(actual_value)
     raise ValueError(f"Attempting to build value of unsupported type")
 
-def build_claim(claim_in: I.ClaimDict) -> Claim:
-    """ Builds a Claim given the Wikibase JSON for one. """
+def build_claim(claim_in: I.ClaimDict, trusted: bool=True) -> Claim:
+    """ Builds a Claim given the Wikibase JSON for one.
+        If trusted, the datatype in the JSON is used as is, so no datatype is looked up.
+    """
     claim_prop: I.Pid
     claim_value: I.ClaimValue
 
@@ -156,7 +165,7 @@ def build_claim(claim_in: I.ClaimDict) -> Claim:
         claim_datavalue = claim_in["datavalue"]
         claim_value = build_value(claim_datavalue["value"])
 
-    claim_out = Claim(claim_prop, claim_value)
+    claim_out = Claim(claim_prop, claim_value, claim_in.get("datatype") if trusted else None)
     claim_out.snaktype = claim_in["snaktype"]
     claim_out.hash = claim_in["hash"]
     claim_out.datatype = claim_in["datatype"]
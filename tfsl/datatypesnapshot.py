@@ -0,0 +1,50 @@
+""" A snapshot of property datatypes shipped with tfsl, so that claims can be built without network access. """
+
+import json
+import os
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Tuple
+
+import tfsl.dumps
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "property_datatypes.json")
+
+def load_snapshot(path: str=SNAPSHOT_PATH) -> Dict[str, str]:
+    """ Reads a snapshot into a dictionary from property ids to datatypes.
+        A missing snapshot is treated as empty, and one in an unknown format is refused.
+    """
+    try:
+        with open(path, encoding="utf-8") as fileptr:
+            contents = json.load(fileptr)
+    except FileNotFoundError:
+        return {}
+    if contents.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {SNAPSHOT_FORMAT_VERSION} datatype snapshot")
+    return {prop: datatype for datatype, props in contents["datatypes"].items() for prop in props}
+
+def write_snapshot(datatypes: Iterable[Tuple[str, str]], path: str, source: str) -> int:
+    """ Writes pairs of property ids and datatypes to a snapshot, grouping the properties by datatype.
+        Returns the number of properties written.
+    """
+    grouped: DefaultDict[str, List[str]] = defaultdict(list)
+    for prop, datatype in datatypes:
+        grouped[datatype].append(prop)
+    sorted_groups = {datatype: sorted(set(props), key=lambda prop: int(prop[1:])) for datatype, props in sorted(grouped.items())}
+    # one line per datatype keeps the file small while leaving regenerations easy to diff
+    group_lines = [f"{json.dumps(datatype)}:{json.dumps(props, separators=(',', ':'))}" for datatype, props in sorted_groups.items()]
+    with open(path, "w", encoding="utf-8") as fileptr:
+        fileptr.write(f'{{"version":{SNAPSHOT_FORMAT_VERSION},"source":{json.dumps(source)},"datatypes":{{\n')
+        fileptr.write(",\n".join(group_lines))
+        fileptr.write("\n}}\n")
+    return sum(len(props) for props in sorted_groups.values())
+
+def property_line_filter(line: str) -> bool:
+    """ Passes those lines of a dump which might hold a property. """
+    return '"type":"property"' in line
+
+def iter_dump_datatypes(path: str) -> Iterable[Tuple[str, str]]:
+    """ Yields the id and datatype of each property in a Wikidata JSON dump. """
+    for entity in tfsl.dumps.iter_dump_entities(path, property_line_filter):
+        if entity.get("type") == "property" and "datatype" in entity:
+            yield entity["id"], entity["datatype"]
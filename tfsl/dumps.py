@@ -0,0 +1,97 @@
+""" Functions to stream entities out of the JSON dumps of a Wikibase. """
+
+import bz2
+import collections
+import concurrent.futures
+import gzip
+import json
+import os
+from typing import Any, Callable, Deque, Dict, IO, Iterator, List, Optional
+
+DEFAULT_BATCH_SIZE = 1000
+
+def open_dump(path: str) -> IO[str]:
+    """ Opens a dump file for reading as text, decompressing it if it ends in .gz or .bz2. """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    elif path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+def parse_dump_line(line: str) -> Optional[Dict[str, Any]]:
+    """ Parses one line of a dump, which holds one entity followed by a comma.
+        Returns None for the lines holding only the brackets around the entities.
+    """
+    line = line.strip()
+    if line.endswith(","):
+        line = line[:-1]
+    if line in ("", "[", "]"):
+        return None
+    entity: Dict[str, Any] = json.loads(line)
+    return entity
+
+def iter_dump_entities(path: str, line_filter: Optional[Callable[[str], bool]]=None) -> Iterator[Dict[str, Any]]:
+    """ Yields the entities in a dump one at a time.
+        If a line filter is provided, only lines for which it is true are parsed at all;
+        this is a cheap way to skip most of a dump with a substring test.
+    """
+    with open_dump(path) as fileptr:
+        for line in fileptr:
+            if line_filter is not None and not line_filter(line):
+                continue
+            if (entity := parse_dump_line(line)) is not None:
+                yield entity
+
+def language_line_filter(language_qid: str) -> Callable[[str], bool]:
+    """ Returns a line filter passing those lexemes which might be in the language with the given Qid. """
+    needle = f'"language":"{language_qid}"'
+    def might_be_in_language(line: str) -> bool:
+        return needle in line
+    return might_be_in_language
+
+def iter_dump_batches(path: str, line_filter: Optional[Callable[[str], bool]]=None, batch_size: int=DEFAULT_BATCH_SIZE) -> Iterator[List[str]]:
+    """ Yields the lines of a dump passing the line filter, if any, in lists of up to batch_size lines. """
+    batch: List[str] = []
+    with open_dump(path) as fileptr:
+        for line in fileptr:
+            if line_filter is not None and not line_filter(line):
+                continue
+            batch.append(line)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def parse_dump_lines(lines: List[str], entity_filter: Optional[Callable[[Dict[str, Any]], bool]]=None) -> List[Dict[str, Any]]:
+    """ Parses lines of a dump, keeping those entities for which the entity filter, if any, is true. """
+    entities = []
+    for line in lines:
+        if (entity := parse_dump_line(line)) is not None and (entity_filter is None or entity_filter(entity)):
+            entities.append(entity)
+    return entities
+
+def iter_dump_entities_parallel(path: str,
+                                line_filter: Optional[Callable[[str], bool]]=None,
+                                entity_filter: Optional[Callable[[Dict[str, Any]], bool]]=None,
+                                processes: Optional[int]=None,
+                                batch_size: int=DEFAULT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """ Yields the entities in a dump, in order, as with iter_dump_entities, but parsed by a pool of processes
+        (by default one per core) and kept only if the entity filter is true. The entity filter runs in those
+        processes, so it must be picklable, such as a function or an instance of a class defined in a module.
+        Only a couple of batches per process are in flight at once, so memory use does not grow with the dump.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1:
+        for batch in iter_dump_batches(path, line_filter, batch_size):
+            yield from parse_dump_lines(batch, entity_filter)
+        return
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        pending: Deque['concurrent.futures.Future[List[Dict[str, Any]]]'] = collections.deque()
+        for batch in iter_dump_batches(path, line_filter, batch_size):
+            pending.append(executor.submit(parse_dump_lines, batch, entity_filter))
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
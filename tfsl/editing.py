@@ -0,0 +1,101 @@
+""" Editing lexemes, forms and senses in place through the builders returned by their edit() methods. """
+
+from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
+
+import tfsl.interfaces as I
+import tfsl.languages
+import tfsl.monolingualtext
+import tfsl.monolingualtextholder
+import tfsl.statement
+import tfsl.statementholder
+
+BuiltT = TypeVar('BuiltT')
+
+class Editor(Generic[BuiltT]):
+    """ Collects changes to an entity, changing its own copies of the entity's parts in place,
+        and builds the changed entity once on commit, checking it then. The entity edited is left as it was.
+        Used as a context manager, the editor commits when the block ends without an exception,
+        and the changed entity is then its result:
+
+            with lexeme.edit() as editor:
+                editor.add_statement(statement)
+                editor.add_sense(sense)
+            lexeme = editor.result
+    """
+    def __init__(self) -> None:
+        self.result: Optional[BuiltT] = None
+
+    def check_open(self) -> None:
+        """ Makes sure the editor has not been committed, since its parts now belong to the built entity. """
+        if self.result is not None:
+            raise ValueError("This editor has already been committed; call edit() again for further changes")
+
+    def build(self) -> BuiltT:
+        """ Checks the edited parts and builds the entity from them. """
+        raise NotImplementedError
+
+    def commit(self) -> BuiltT:
+        """ Builds and returns the changed entity, after which the editor may not be used again. """
+        self.check_open()
+        self.result = self.build()
+        return self.result
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None:
+            self.commit()
+
+class TextEdits:
+    """ The monolingual texts of an entity being edited, at most one per language, and those removed from it. """
+    def __init__(self, holder: tfsl.monolingualtextholder.MonolingualTextHolder):
+        self.texts: Dict[tfsl.languages.Language, tfsl.monolingualtext.MonolingualText] = {text.language: text for text in holder.texts}
+        self.removed_texts: I.MonolingualTextList = list(holder.removed_texts)
+
+    def add(self, text: tfsl.monolingualtext.MonolingualText) -> None:
+        """ Adds a text, replacing any in the same language as MonolingualTextHolder's + does. """
+        self.texts.pop(text.language, None)
+        self.texts[text.language] = text
+
+    def remove(self, arg: Union[tfsl.languages.Language, tfsl.monolingualtext.MonolingualText]) -> None:
+        """ Removes the text in the given language, or the given text, recording it as removed. """
+        if isinstance(arg, tfsl.monolingualtext.MonolingualText):
+            if self.texts.get(arg.language) == arg:
+                self.removed_texts.append(self.texts.pop(arg.language))
+        elif arg in self.texts:
+            self.removed_texts.append(self.texts.pop(arg))
+
+    def holder(self) -> tfsl.monolingualtextholder.MonolingualTextHolder:
+        return tfsl.monolingualtextholder.MonolingualTextHolder(list(self.texts.values()), self.removed_texts)
+
+class StatementEdits:
+    """ The statements of an entity being edited, grouped by property. """
+    def __init__(self, holder: tfsl.statementholder.StatementHolder):
+        self.statements: Dict[I.Pid, I.StatementList] = {prop: list(stmts) for prop, stmts in holder.statements.items()}
+
+    def add(self, statement: tfsl.statement.Statement) -> None:
+        self.statements.setdefault(statement.property, []).append(statement)
+
+    def remove(self, arg: Union[I.Pid, tfsl.statement.Statement]) -> None:
+        """ Removes every statement with the given property, or those equal to the given statement. """
+        if isinstance(arg, tfsl.statement.Statement):
+            remaining = [stmt for stmt in self.statements.get(arg.property, []) if stmt != arg]
+            if remaining:
+                self.statements[arg.property] = remaining
+            else:
+                self.statements.pop(arg.property, None)
+        elif I.is_Pid(arg):
+            self.statements.pop(arg, None)
+        else:
+            raise TypeError(f"String {arg} is not a property")
+
+    def holder(self) -> tfsl.statementholder.StatementHolder:
+        return tfsl.statementholder.StatementHolder.from_grouped(self.statements) # type: ignore
+
+def check_unique_ids(kind: str, ids: List[Optional[str]]) -> None:
+    """ Raises a ValueError if any of the given ids of parts of an entity is repeated. """
+    known_ids = [part_id for part_id in ids if part_id is not None]
+    if len(set(known_ids)) != len(known_ids):
+        repeated = sorted({part_id for part_id in known_ids if known_ids.count(part_id) > 1})
+        raise ValueError(f"{kind} ids {repeated} are used more than once")
@@ -288,6 +288,10 @@ class LexemeDict(LexemePublishedSettings, LexemeData):
         the dictionary represented by the XPath "/entities/L301993".
     """
 
+def is_LexemeDict(arg: EntityPublishedSettings) -> TypeGuard[LexemeDict]:
+    """ Checks that the keys expected for a Lexeme exist. """
+    return all(x in arg for x in ["lemmas", "lexicalCategory", "language", "claims", "forms", "senses"])
+
 class SitelinkDict(TypedDict):
     """ In the output of wikidata.org/wiki/Special:EntityData/Q1356.json,
         the dictionaries represented by the XPath "/entities/Q1356/sitelinks/*".
@@ -1,10 +1,8 @@
 """ Holds the Item class and a function to build one given a JSON representation of it. """
 
-import json
 import os
 import os.path
-import time
-from typing import Dict, Optional, Set, Union
+from typing import Dict, Iterable, Iterator, Optional, Set, Union
 
 import tfsl.interfaces as I
 import tfsl.auth
@@ -13,6 +11,7 @@ import tfsl.lexemeform
 import tfsl.lexemesense
 import tfsl.monolingualtext
 import tfsl.monolingualtextholder
+import tfsl.projection
 import tfsl.statement
 import tfsl.statementholder
 import tfsl.utils
@@ -173,11 +172,13 @@ class Item:
         item_out.set_published_settings(published_settings)
         return item_out
 
-def build_item(item_in: I.ItemDict) -> Item:
-    """ Builds an Item from the JSON dictionary describing it. """
+def build_item(item_in: I.ItemDict, trusted: bool=True) -> Item:
+    """ Builds an Item from the JSON dictionary describing it.
+        Datatypes in it are only checked if not trusted.
+    """
     labels = tfsl.monolingualtextholder.build_text_list(item_in["labels"])
     descriptions = tfsl.monolingualtextholder.build_text_list(item_in["descriptions"])
-    statements = tfsl.statementholder.build_statement_list(item_in["claims"])
+    statements = tfsl.statementholder.build_statement_list(item_in["claims"], trusted)
 
     aliases: Dict[I.LanguageCode, Set[str]] = {}
     for lang, aliaslist in item_in["aliases"].items():
@@ -194,54 +195,78 @@ def build_item(item_in: I.ItemDict) -> Item:
 
 # pylint: disable=invalid-name
 
-def retrieve_item_json(lid_in: Union[int, I.Qid]) -> I.ItemDict:
-    """ Retrieves the JSON for the item with the given Qid. """
+def to_qid(lid_in: Union[int, I.Qid]) -> I.Qid:
+    """ Returns the provided Qid, or the Qid with the provided number. """
     lid: I.Qid
     if isinstance(lid_in, int):
         lid = I.Qid('Q'+str(lid_in))
     elif I.is_Qid(lid_in):
         lid = lid_in
-    filename = tfsl.utils.get_filename(lid)
-    item_json: I.ItemDict
-    try:
-        assert time.time() - os.path.getmtime(filename) < tfsl.utils.time_to_live
-        with open(filename, encoding="utf-8") as fileptr:
-            item_json = json.load(fileptr)
-    except (FileNotFoundError, OSError, AssertionError) as e:
-        current_lexeme = tfsl.auth.get_lexemes([lid])
-        current_lid_output = current_lexeme[lid]
-        if I.is_ItemDict(current_lid_output):
-            item_json = current_lid_output
-        else:
-            raise ValueError(f"Retrieved entity {lid} was not an item") from e
-        with open(filename, "w", encoding="utf-8") as fileptr:
-            json.dump(item_json, fileptr)
-    return item_json
+    return lid
+
+def retrieve_item_json(lid_in: Union[int, I.Qid], projection: Optional[tfsl.projection.Projection]=None) -> I.ItemDict:
+    """ Retrieves the JSON for the item with the given Qid, or only the given projection of it. """
+    lid = to_qid(lid_in)
+    current_lid_output = tfsl.utils.retrieve_entity_json(lid, projection)
+    if projection is not None and current_lid_output.get("type") == "item":
+        # a projection of an item lacks some of the keys is_ItemDict expects
+        return current_lid_output # type: ignore
+    if I.is_ItemDict(current_lid_output):
+        return current_lid_output
+    raise ValueError(f"Retrieved entity {lid} was not an item")
 
 def Q(qid: Union[int, I.Qid]) -> Item:
     """ Retrieves and returns the item with the provided Qid. """
     item_json = retrieve_item_json(qid)
-    return build_item(item_json)
+    return tfsl.utils.build_cached(to_qid(qid), item_json, build_item)
+
+def Q_iter(qids: Iterable[Union[int, I.Qid]], max_workers: Optional[int]=None) -> Iterator[Item]:
+    """ Retrieves the items with the provided Qids, yielding them in the order given.
+        Items not already cached are retrieved up to 50 per request, with up to max_workers requests at once.
+    """
+    for qid, item_json in tfsl.utils.iter_entity_jsons([to_qid(qid) for qid in qids], max_workers):
+        if not I.is_ItemDict(item_json):
+            raise ValueError(f"Retrieved entity {qid} was not an item")
+        yield tfsl.utils.build_cached(qid, item_json, build_item)
+
+def Q_many(qids_in: Iterable[Union[int, I.Qid]], max_workers: Optional[int]=None) -> Dict[I.Qid, Item]:
+    """ Retrieves the items with the provided Qids as with Q_iter, returning them keyed by Qid in the order given. """
+    qids = list(dict.fromkeys(to_qid(qid) for qid in qids_in))
+    return dict(zip(qids, Q_iter(qids, max_workers)))
 
 class Q_:
     """ An Item, but labels/descriptions are not auto-converted to MonolingualTexts
         and statements are only assembled into Statements when accessed.
+        Only the given props of the item in the given languages (see tfsl.projection) are retrieved at first,
+        by default only its revision info; other parts are retrieved as they are accessed.
     """
-    def __init__(self, input_arg: I.Qid):
-        self.item_json: I.ItemDict = retrieve_item_json(input_arg)
+    def __init__(self, input_arg: Union[int, I.Qid], props: Iterable[str]=("info",), languages: Iterable[str]=()):
+        self.qid = to_qid(input_arg)
+        self.projection = tfsl.projection.projection(props, languages)
+        self.item_json: I.ItemDict = retrieve_item_json(self.qid, self.projection)
+
+    def require(self, props: Iterable[str], languages: Iterable[str]=()) -> None:
+        """ Makes sure that the given props of the item in the given languages have been retrieved. """
+        wanted = tfsl.projection.projection(props, languages)
+        if not tfsl.projection.covers(self.projection, wanted):
+            self.projection = tfsl.projection.widen(self.projection, wanted)
+            self.item_json = retrieve_item_json(self.qid, self.projection)
 
     def get_label(self, lang: tfsl.languages.Language) -> tfsl.monolingualtext.MonolingualText:
         """ Assembles a MonolingualText containing the label with the given language code. """
+        self.require(["labels"], [lang.code])
         label_dict: I.LemmaDict = self.item_json["labels"][lang.code]
         return label_dict["value"] @ lang
 
     def get_description(self, lang: tfsl.languages.Language) -> tfsl.monolingualtext.MonolingualText:
         """ Assembles a MonolingualText containing the description with the given language code. """
+        self.require(["descriptions"], [lang.code])
         description_dict: I.LemmaDict = self.item_json["descriptions"][lang.code]
         return description_dict["value"] @ lang
 
     def get_stmts(self, prop: I.Pid) -> I.StatementList:
         """ Assembles a list of Statements present on the item with the given property. """
+        self.require(["claims"])
         return [tfsl.statement.build_statement(stmt) for stmt in self.item_json["claims"].get(prop,[])]
 
     def __getitem__(self, prop: I.Pid) -> I.StatementList:
@@ -1,14 +1,13 @@
 """ Holds the Lexeme class and a function to build one given a JSON representation of it. """
 
-import json
 import os
 import os.path
-import time
 from textwrap import indent
-from typing import Collection, Optional, List, Union, overload
+from typing import Collection, Dict, Iterable, Iterator, Optional, List, Union, overload
 
 import tfsl.interfaces as I
 import tfsl.auth
+import tfsl.editing
 import tfsl.itemvalue
 import tfsl.languages
 import tfsl.lexemeform
@@ -235,6 +234,10 @@ class Lexeme:
         """Shamelessly named after the keyword used on Wikidata to look for a statement."""
         return self.statements.haswbstatement(property_in, value_in)
 
+    def edit(self) -> 'LexemeEditor':
+        """ Returns an editor making a batch of changes to a copy of this lexeme. """
+        return LexemeEditor(self)
+
     def __str__(self) -> str:
         # TODO: fix indentation of components
         lemma_str = str(self.lemmata)
@@ -286,28 +289,142 @@ class Lexeme:
         return base_dict
 
 
-def build_lexeme(lexeme_in: I.LexemeDict) -> Lexeme:
-    """ Builds a Lexeme from the JSON dictionary describing it. """
+def build_lexeme(lexeme_in: I.LexemeDict, trusted: bool=True) -> Lexeme:
+    """ Builds a Lexeme from the JSON dictionary describing it.
+        Datatypes in it are only checked if not trusted.
+    """
     lemmas = tfsl.monolingualtextholder.build_text_list(lexeme_in["lemmas"])
 
     lexemecat = lexeme_in["lexicalCategory"]
     language = tfsl.languages.get_first_lang(lexeme_in["language"])
 
-    statements = tfsl.statementholder.build_statement_list(lexeme_in["claims"])
+    statements = tfsl.statementholder.build_statement_list(lexeme_in["claims"], trusted)
 
-    forms = [tfsl.lexemeform.build_form(form) for form in lexeme_in["forms"]]
-    senses = [tfsl.lexemesense.build_sense(sense) for sense in lexeme_in["senses"]]
+    forms = [tfsl.lexemeform.build_form(form, trusted) for form in lexeme_in["forms"]]
+    senses = [tfsl.lexemesense.build_sense(sense, trusted) for sense in lexeme_in["senses"]]
 
     lexeme_out = Lexeme(lemmas, language, lexemecat, statements, senses, forms)
     lexeme_out.set_published_settings(lexeme_in)
     return lexeme_out
 
+class LexemeEditor(tfsl.editing.Editor[Lexeme]):
+    """ Makes a batch of changes to a copy of a Lexeme, as described in tfsl.editing.Editor.
+        Forms and senses are added and removed whole; to change one, remove it and add the result of its own edit().
+    """
+    def __init__(self, lexeme: Lexeme):
+        super().__init__()
+        self.lemmata = tfsl.editing.TextEdits(lexeme.lemmata)
+        self.language = lexeme.language
+        self.category = lexeme.category
+        self.statements = tfsl.editing.StatementEdits(lexeme.statements)
+        self.senses: I.LexemeSenseList = list(lexeme.senses)
+        self.forms: I.LexemeFormList = list(lexeme.forms)
+        self.published_settings = lexeme.get_published_settings()
+        self.lexeme_id = lexeme.lexeme_id
+
+    def full_id(self, key: str) -> str:
+        """ Prefixes the id of a form or sense with the lexeme's id, if it is not already. """
+        if self.lexeme_id is not None and '-' not in key:
+            return '-'.join([self.lexeme_id, key])
+        return key
+
+    def add_lemma(self, lemma: tfsl.monolingualtext.MonolingualText) -> 'LexemeEditor':
+        self.check_open()
+        self.lemmata.add(lemma)
+        return self
+
+    def remove_lemma(self, arg: I.LanguageOrMT) -> 'LexemeEditor':
+        self.check_open()
+        self.lemmata.remove(arg)
+        return self
+
+    def set_language(self, language: tfsl.languages.Language) -> 'LexemeEditor':
+        self.check_open()
+        self.language = language
+        return self
+
+    def set_category(self, category: I.Qid) -> 'LexemeEditor':
+        self.check_open()
+        self.category = category
+        return self
+
+    def add_statement(self, statement: tfsl.statement.Statement) -> 'LexemeEditor':
+        self.check_open()
+        self.statements.add(statement)
+        return self
+
+    def remove_statement(self, arg: Union[I.Pid, tfsl.statement.Statement]) -> 'LexemeEditor':
+        self.check_open()
+        self.statements.remove(arg)
+        return self
+
+    def add_sense(self, sense: tfsl.lexemesense.LexemeSense) -> 'LexemeEditor':
+        self.check_open()
+        self.senses.append(sense)
+        return self
+
+    def remove_sense(self, arg: Union[str, tfsl.lexemesense.LexemeSense]) -> 'LexemeEditor':
+        """ Removes the given sense, or the sense with the given id (with or without the lexeme's id). """
+        self.check_open()
+        if isinstance(arg, str):
+            sense_id = self.full_id(arg)
+            self.senses = [sense for sense in self.senses if sense.id != sense_id]
+        else:
+            self.senses = [sense for sense in self.senses if sense != arg]
+        return self
+
+    def add_form(self, form: tfsl.lexemeform.LexemeForm) -> 'LexemeEditor':
+        self.check_open()
+        self.forms.append(form)
+        return self
+
+    def remove_form(self, arg: Union[str, tfsl.lexemeform.LexemeForm]) -> 'LexemeEditor':
+        """ Removes the given form, or the form with the given id (with or without the lexeme's id). """
+        self.check_open()
+        if isinstance(arg, str):
+            form_id = self.full_id(arg)
+            self.forms = [form for form in self.forms if form.id != form_id]
+        else:
+            self.forms = [form for form in self.forms if form != arg]
+        return self
+
+    def add(self, *args: object) -> 'LexemeEditor':
+        """ Adds each of the given lemmata, statements, senses and forms, as + would. """
+        for arg in args:
+            if isinstance(arg, tfsl.monolingualtext.MonolingualText):
+                self.add_lemma(arg)
+            elif isinstance(arg, tfsl.statement.Statement):
+                self.add_statement(arg)
+            elif isinstance(arg, tfsl.lexemesense.LexemeSense):
+                self.add_sense(arg)
+            elif isinstance(arg, tfsl.lexemeform.LexemeForm):
+                self.add_form(arg)
+            else:
+                raise NotImplementedError(f"Can't add {type(arg)} to Lexeme")
+        return self
+
+    def build(self) -> Lexeme:
+        if not self.lemmata.texts:
+            raise ValueError("A lexeme needs at least one lemma")
+        if not I.is_Qid(self.category):
+            raise ValueError(f"Lexical category {self.category} is not an item")
+        tfsl.editing.check_unique_ids("Form", [form.id for form in self.forms])
+        tfsl.editing.check_unique_ids("Sense", [sense.id for sense in self.senses])
+        if any(len(form.representations) == 0 for form in self.forms):
+            raise ValueError("Every form needs at least one representation")
+        if any(len(sense.glosses) == 0 for sense in self.senses):
+            raise ValueError("Every sense needs at least one gloss")
+        lexeme_out = Lexeme(self.lemmata.holder(), self.language, self.category,
+                            self.statements.holder(), self.senses, self.forms)
+        lexeme_out.set_published_settings(self.published_settings)
+        return lexeme_out
+
 # pylint: disable=invalid-name
 
-# TODO: define L_
+LexemeReference = Union[int, I.Lid, I.LFid, I.LSid, tfsl.itemvalue.ItemValue]
 
-def L(lid_in: Union[int, I.Lid, I.LFid, I.LSid, tfsl.itemvalue.ItemValue]) -> Lexeme:
-    """ Retrieves and returns the lexeme with the provided Lid. """
+def to_lid(lid_in: LexemeReference) -> I.Lid:
+    """ Returns the Lid of the lexeme with the provided Lid, or containing the provided form or sense. """
     lid: I.Lid
     if isinstance(lid_in, int):
         lid = I.Lid('L'+str(lid_in))
@@ -328,14 +445,148 @@ def L(lid_in: Union[int, I.Lid, I.LFid, I.LSid, tfsl.itemvalue.ItemValue]) -> Le
             lid, _ = split_lfid
     elif I.is_Lid(lid_in):
         lid = lid_in
-    filename = tfsl.utils.get_filename(lid)
-    try:
-        assert time.time() - os.path.getmtime(filename) < tfsl.utils.time_to_live
-        with open(filename, encoding="utf-8") as fileptr:
-            lexeme_json = json.load(fileptr)
-    except (FileNotFoundError, OSError, AssertionError):
-        current_lexeme = tfsl.auth.get_lexemes([lid])
-        lexeme_json = current_lexeme[lid]
-        with open(filename, "w", encoding="utf-8") as fileptr:
-            json.dump(lexeme_json, fileptr)
-    return build_lexeme(lexeme_json)
+    return lid
+
+def L(lid_in: LexemeReference) -> Lexeme:
+    """ Retrieves and returns the lexeme with the provided Lid. """
+    lid = to_lid(lid_in)
+    lexeme_json = tfsl.utils.retrieve_entity_json(lid)
+    if not I.is_LexemeDict(lexeme_json):
+        raise ValueError(f"Retrieved entity {lid} was not a lexeme")
+    return tfsl.utils.build_cached(lid, lexeme_json, build_lexeme)
+
+def L_iter(lids_in: Iterable[LexemeReference], max_workers: Optional[int]=None) -> Iterator[Lexeme]:
+    """ Retrieves the lexemes with the provided Lids, yielding them in the order given.
+        Lexemes not already cached are retrieved up to 50 per request, with up to max_workers requests at once.
+    """
+    for lid, lexeme_json in tfsl.utils.iter_entity_jsons([to_lid(lid_in) for lid_in in lids_in], max_workers):
+        if not I.is_LexemeDict(lexeme_json):
+            raise ValueError(f"Retrieved entity {lid} was not a lexeme")
+        yield tfsl.utils.build_cached(lid, lexeme_json, build_lexeme)
+
+def L_many(lids_in: Iterable[LexemeReference], max_workers: Optional[int]=None) -> Dict[I.Lid, Lexeme]:
+    """ Retrieves the lexemes with the provided Lids as with L_iter, returning them keyed by Lid in the order given. """
+    lids = list(dict.fromkeys(to_lid(lid_in) for lid_in in lids_in))
+    return dict(zip(lids, L_iter(lids, max_workers)))
+
+class L_:
+    """ A Lexeme, but only the parts of it which are accessed are assembled into tfsl objects, each at most once:
+        lemmata, forms and senses by id, and statements by property. The objects returned are shared between
+        accesses, so they should not be changed; materialize() builds a full Lexeme which may be.
+        An L_ may also be made directly from lexeme JSON, such as that of a cached lexeme or of a dump.
+    """
+    def __init__(self, input_arg: Union[LexemeReference, I.LexemeDict]):
+        lexeme_json: I.LexemeDict
+        if isinstance(input_arg, dict):
+            if not I.is_LexemeDict(input_arg):
+                raise ValueError("JSON given is not that of a lexeme")
+            lexeme_json = input_arg
+        else:
+            lid = to_lid(input_arg)
+            entity_json = tfsl.utils.retrieve_entity_json(lid)
+            if not I.is_LexemeDict(entity_json):
+                raise ValueError(f"Retrieved entity {lid} was not a lexeme")
+            lexeme_json = entity_json
+        self.lexeme_json = lexeme_json
+        self.lexeme_id: Optional[I.Lid] = lexeme_json.get("id")
+        self._lemmata: Optional[tfsl.monolingualtextholder.MonolingualTextHolder] = None
+        self._form_jsons: Optional[Dict[str, I.LexemeFormDict]] = None
+        self._sense_jsons: Optional[Dict[str, I.LexemeSenseDict]] = None
+        self._forms: Dict[str, tfsl.lexemeform.LexemeForm] = {}
+        self._senses: Dict[str, tfsl.lexemesense.LexemeSense] = {}
+        self._statements: Dict[I.Pid, I.StatementList] = {}
+
+    @property
+    def language(self) -> tfsl.languages.Language:
+        return tfsl.languages.get_first_lang(self.lexeme_json["language"])
+
+    @property
+    def category(self) -> I.Qid:
+        return self.lexeme_json["lexicalCategory"]
+
+    @property
+    def lemmata(self) -> tfsl.monolingualtextholder.MonolingualTextHolder:
+        if self._lemmata is None:
+            self._lemmata = tfsl.monolingualtextholder.MonolingualTextHolder(
+                tfsl.monolingualtextholder.build_text_list(self.lexeme_json["lemmas"]))
+        return self._lemmata
+
+    def get_lemma(self, lang: tfsl.languages.Language) -> tfsl.monolingualtext.MonolingualText:
+        """ Assembles a MonolingualText containing the lemma with the given language code. """
+        lemma_dict: I.LemmaDict = self.lexeme_json["lemmas"][lang.code]
+        return lemma_dict["value"] @ lang
+
+    def form_ids(self) -> List[str]:
+        """ Returns the ids of the forms on the lexeme in order. """
+        return [form["id"] for form in self.lexeme_json["forms"]]
+
+    def sense_ids(self) -> List[str]:
+        """ Returns the ids of the senses on the lexeme in order. """
+        return [sense["id"] for sense in self.lexeme_json["senses"]]
+
+    def full_id(self, key: str) -> str:
+        """ Turns a form or sense id without the Lid, such as F1, into a full one. """
+        if self.lexeme_id is not None and not key.startswith(self.lexeme_id + "-"):
+            return '-'.join([self.lexeme_id, key])
+        return key
+
+    def get_form(self, key: str) -> tfsl.lexemeform.LexemeForm:
+        """ Returns the form with the given id, such as L1-F1 or F1. """
+        key = self.full_id(key)
+        if key not in self._forms:
+            if self._form_jsons is None:
+                self._form_jsons = {form["id"]: form for form in self.lexeme_json["forms"]}
+            self._forms[key] = tfsl.lexemeform.build_form(self._form_jsons[key])
+        return self._forms[key]
+
+    def get_sense(self, key: str) -> tfsl.lexemesense.LexemeSense:
+        """ Returns the sense with the given id, such as L1-S1 or S1. """
+        key = self.full_id(key)
+        if key not in self._senses:
+            if self._sense_jsons is None:
+                self._sense_jsons = {sense["id"]: sense for sense in self.lexeme_json["senses"]}
+            self._senses[key] = tfsl.lexemesense.build_sense(self._sense_jsons[key])
+        return self._senses[key]
+
+    def get_stmts(self, prop: I.Pid) -> I.StatementList:
+        """ Returns the Statements present on the lexeme with the given property. """
+        if prop not in self._statements:
+            self._statements[prop] = [tfsl.statement.build_statement(stmt) for stmt in self.lexeme_json["claims"].get(prop, [])]
+        return self._statements[prop]
+
+    def haswbstatement(self, property_in: I.Pid, value_in: Optional[I.ClaimValue]=None) -> bool:
+        """ Checks for a statement as Lexeme.haswbstatement does, assembling only those with the given property. """
+        if value_in is None:
+            return bool(self.lexeme_json["claims"].get(property_in))
+        return tfsl.statementholder.StatementHolder(self.get_stmts(property_in)).haswbstatement(property_in, value_in)
+
+    def __getitem__(self, key: object) -> Union[I.StatementList, tfsl.lexemeform.LexemeForm, tfsl.lexemesense.LexemeSense, tfsl.monolingualtext.MonolingualText]:
+        if isinstance(key, tfsl.languages.Language):
+            return self.get_lemma(key)
+        elif isinstance(key, tfsl.monolingualtext.MonolingualText):
+            return self.lemmata[key]
+        elif isinstance(key, tfsl.itemvalue.ItemValue):
+            key = key.id
+        if isinstance(key, str):
+            if I.is_Pid(key):
+                return self.get_stmts(key)
+            full_key = self.full_id(key)
+            if I.is_LFid(full_key):
+                return self.get_form(full_key)
+            elif I.is_LSid(full_key):
+                return self.get_sense(full_key)
+            raise KeyError(key)
+        raise TypeError(f"Can't get {type(key)} from L_")
+
+    def materialize(self) -> Lexeme:
+        """ Builds the full Lexeme, which (unlike the parts returned by an L_) may be changed. """
+        if self.lexeme_id is None:
+            return build_lexeme(self.lexeme_json)
+        return tfsl.utils.build_cached(self.lexeme_id, self.lexeme_json, build_lexeme)
+
+def L_iter_lazy(lids_in: Iterable[LexemeReference], max_workers: Optional[int]=None) -> Iterator[L_]:
+    """ Retrieves the lexemes with the provided Lids as with L_iter, but yields an L_ for each. """
+    for lid, lexeme_json in tfsl.utils.iter_entity_jsons([to_lid(lid_in) for lid_in in lids_in], max_workers):
+        if not I.is_LexemeDict(lexeme_json):
+            raise ValueError(f"Retrieved entity {lid} was not a lexeme")
+        yield L_(lexeme_json)
@@ -3,6 +3,7 @@
 from functools import singledispatchmethod
 from typing import List, Optional, Set, Union, overload
 
+import tfsl.editing
 import tfsl.interfaces as I
 import tfsl.languages
 import tfsl.monolingualtext
@@ -75,6 +76,10 @@ class LexemeForm:
         """Shamelessly named after the keyword used on Wikidata to look for a statement."""
         return self.statements.haswbstatement(property_in, value_in)
 
+    def edit(self) -> 'LexemeFormEditor':
+        """ Returns an editor making a batch of changes to a copy of this form. """
+        return LexemeFormEditor(self)
+
     def __add__(self, arg: object) -> 'LexemeForm':
         if isinstance(arg, tfsl.monolingualtext.MonolingualText):
             published_settings = self.get_published_settings()
@@ -169,11 +174,74 @@ class LexemeForm:
 
         return base_dict
 
-def build_form(form_in: I.LexemeFormDict) -> LexemeForm:
-    """ Builds a LexemeForm from the JSON dictionary describing it. """
+class LexemeFormEditor(tfsl.editing.Editor[LexemeForm]):
+    """ Makes a batch of changes to a copy of a LexemeForm, as described in tfsl.editing.Editor. """
+    def __init__(self, form: LexemeForm):
+        super().__init__()
+        self.representations = tfsl.editing.TextEdits(form.representations)
+        self.features: Set[I.Qid] = set(form.features)
+        self.statements = tfsl.editing.StatementEdits(form.statements)
+        self.published_settings = form.get_published_settings()
+
+    def add_representation(self, representation: tfsl.monolingualtext.MonolingualText) -> 'LexemeFormEditor':
+        self.check_open()
+        self.representations.add(representation)
+        return self
+
+    def remove_representation(self, arg: I.LanguageOrMT) -> 'LexemeFormEditor':
+        self.check_open()
+        self.representations.remove(arg)
+        return self
+
+    def add_feature(self, feature: I.Qid) -> 'LexemeFormEditor':
+        self.check_open()
+        if not I.is_Qid(feature):
+            raise TypeError(f"String {feature} is not an item")
+        self.features.add(feature)
+        return self
+
+    def remove_feature(self, feature: I.Qid) -> 'LexemeFormEditor':
+        self.check_open()
+        self.features.discard(feature)
+        return self
+
+    def add_statement(self, statement: tfsl.statement.Statement) -> 'LexemeFormEditor':
+        self.check_open()
+        self.statements.add(statement)
+        return self
+
+    def remove_statement(self, arg: Union[I.Pid, tfsl.statement.Statement]) -> 'LexemeFormEditor':
+        self.check_open()
+        self.statements.remove(arg)
+        return self
+
+    def add(self, *args: object) -> 'LexemeFormEditor':
+        """ Adds each of the given representations, grammatical features and statements, as + would. """
+        for arg in args:
+            if isinstance(arg, tfsl.monolingualtext.MonolingualText):
+                self.add_representation(arg)
+            elif isinstance(arg, str) and I.is_Qid(arg):
+                self.add_feature(arg)
+            elif isinstance(arg, tfsl.statement.Statement):
+                self.add_statement(arg)
+            else:
+                raise NotImplementedError(f"Can't add {type(arg)} to LexemeForm")
+        return self
+
+    def build(self) -> LexemeForm:
+        if not self.representations.texts:
+            raise ValueError("A form needs at least one representation")
+        form_out = LexemeForm(self.representations.holder(), self.features, self.statements.holder())
+        form_out.set_published_settings(self.published_settings)
+        return form_out
+
+def build_form(form_in: I.LexemeFormDict, trusted: bool=True) -> LexemeForm:
+    """ Builds a LexemeForm from the JSON dictionary describing it.
+        Datatypes in it are only checked if not trusted.
+    """
     reps = tfsl.monolingualtextholder.build_text_list(form_in["representations"])
     feats = form_in["grammaticalFeatures"]
-    claims = tfsl.statementholder.build_statement_list(form_in["claims"])
+    claims = tfsl.statementholder.build_statement_list(form_in["claims"], trusted)
 
     form_out = LexemeForm(reps, feats, claims)
     form_out.set_published_settings(form_in)
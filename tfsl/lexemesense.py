@@ -3,6 +3,7 @@
 from functools import singledispatchmethod
 from typing import Optional, Union, overload
 
+import tfsl.editing
 import tfsl.interfaces as I
 import tfsl.monolingualtext
 import tfsl.monolingualtextholder
@@ -65,6 +66,10 @@ class LexemeSense:
         """Shamelessly named after the keyword used on Wikidata to look for a statement."""
         return self.statements.haswbstatement(property_in, value_in)
 
+    def edit(self) -> 'LexemeSenseEditor':
+        """ Returns an editor making a batch of changes to a copy of this sense. """
+        return LexemeSenseEditor(self)
+
     def __add__(self, arg: object) -> 'LexemeSense':
         if isinstance(arg, tfsl.monolingualtext.MonolingualText):
             published_settings = self.get_published_settings()
@@ -143,10 +148,58 @@ class LexemeSense:
 
         return base_dict
 
-def build_sense(sense_in: I.LexemeSenseDict) -> LexemeSense:
-    """ Builds a LexemeSense from the JSON dictionary describing it. """
+class LexemeSenseEditor(tfsl.editing.Editor[LexemeSense]):
+    """ Makes a batch of changes to a copy of a LexemeSense, as described in tfsl.editing.Editor. """
+    def __init__(self, sense: LexemeSense):
+        super().__init__()
+        self.glosses = tfsl.editing.TextEdits(sense.glosses)
+        self.statements = tfsl.editing.StatementEdits(sense.statements)
+        self.published_settings = sense.get_published_settings()
+
+    def add_gloss(self, gloss: tfsl.monolingualtext.MonolingualText) -> 'LexemeSenseEditor':
+        self.check_open()
+        self.glosses.add(gloss)
+        return self
+
+    def remove_gloss(self, arg: I.LanguageOrMT) -> 'LexemeSenseEditor':
+        self.check_open()
+        self.glosses.remove(arg)
+        return self
+
+    def add_statement(self, statement: tfsl.statement.Statement) -> 'LexemeSenseEditor':
+        self.check_open()
+        self.statements.add(statement)
+        return self
+
+    def remove_statement(self, arg: Union[I.Pid, tfsl.statement.Statement]) -> 'LexemeSenseEditor':
+        self.check_open()
+        self.statements.remove(arg)
+        return self
+
+    def add(self, *args: object) -> 'LexemeSenseEditor':
+        """ Adds each of the given glosses and statements, as + would. """
+        for arg in args:
+            if isinstance(arg, tfsl.monolingualtext.MonolingualText):
+                self.add_gloss(arg)
+            elif isinstance(arg, tfsl.statement.Statement):
+                self.add_statement(arg)
+            else:
+                raise NotImplementedError(f"Can't add {type(arg)} to LexemeSense")
+        return self
+
+    def build(self) -> LexemeSense:
+        if not self.glosses.texts:
+            raise ValueError("A sense needs at least one gloss")
+        sense_out = LexemeSense(self.glosses.holder(), self.statements.holder())
+        sense_out.set_published_settings(self.published_settings)
+        return sense_out
+
+def build_sense(sense_in: I.LexemeSenseDict, trusted: bool=True) -> LexemeSense:
+    """ Builds a LexemeSense from the JSON dictionary describing it.
+        Datatypes in it are only checked if not trusted.
+    """
     glosses = tfsl.monolingualtextholder.build_text_list(sense_in["glosses"])
-    statements = tfsl.statementholder.build_statement_list(sense_in["claims"])
+    statements = tfsl.statementholder.build_statement_list(sense_in["claims"], trusted)
 
     sense_out = LexemeSense(glosses, statements)
     sense_out.id = sense_in["id"]
@@ -1,6 +1,5 @@
 """ Holds the StatementHolder class and a function to build one given a JSON representation of it. """
 
-from copy import deepcopy
 from functools import singledispatchmethod
 from typing import Callable, Optional, Union
 
@@ -87,8 +86,7 @@ class MonolingualTextHolder(object):
 
     def __add__(self, rhs: object) -> 'MonolingualTextHolder':
         if isinstance(rhs, tfsl.monolingualtext.MonolingualText):
-            newtexts = deepcopy(self.texts)
-            newtexts = [rep for rep in newtexts if rep.language != rhs.language]
+            newtexts = [rep for rep in self.texts if rep.language != rhs.language]
             newtexts.append(rhs)
             return MonolingualTextHolder(newtexts)
         raise TypeError(f"Can't add {type(rhs)} to MonolingualTextHolder")
@@ -0,0 +1,69 @@
+""" Which parts of an entity to retrieve, in terms of the props and languages parameters of wbgetentities. """
+
+from typing import Any, Dict, FrozenSet, Iterable, NamedTuple, Optional
+
+# every value of the props parameter which is part of the entity JSON returned by default
+ALL_PROPS = frozenset(["info", "sitelinks", "aliases", "labels", "descriptions", "claims", "datatype"])
+# the parts of an entity whose contents are narrowed down by the languages parameter
+LANGUAGE_PROPS = frozenset(["aliases", "labels", "descriptions"])
+
+class Projection(NamedTuple):
+    """ Part of an entity: the given props, with labels, descriptions and aliases only in the given language codes
+        (or in every language, if languages is None). A projection of None stands for the whole entity.
+        The info prop, which includes the last revision id, is always part of a projection.
+    """
+    props: FrozenSet[str]
+    languages: Optional[FrozenSet[str]]
+
+    def parameters(self) -> Dict[str, str]:
+        """ Returns the parameters of a wbgetentities request retrieving this part of an entity. """
+        parameters = {"props": "|".join(sorted(self.props))}
+        if self.languages is not None and self.props & LANGUAGE_PROPS:
+            parameters["languages"] = "|".join(sorted(self.languages))
+        return parameters
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"props": sorted(self.props), "languages": None if self.languages is None else sorted(self.languages)}
+
+def projection(props: Optional[Iterable[str]]=None, languages: Optional[Iterable[str]]=None) -> Optional[Projection]:
+    """ Returns the projection onto the given props (by default, all of them) in the given languages
+        (by default, all of them), or None if that is the whole entity.
+    """
+    prop_set = ALL_PROPS if props is None else frozenset(props) | {"info"}
+    if (unknown := prop_set - ALL_PROPS):
+        raise ValueError(f"{sorted(unknown)} are not entity props, which are {sorted(ALL_PROPS)}")
+    language_set = None if languages is None else frozenset(languages)
+    if not prop_set & LANGUAGE_PROPS:
+        # the languages make no difference, so none are recorded and the projection widens without them
+        language_set = frozenset()
+    if prop_set == ALL_PROPS and language_set is None:
+        return None
+    return Projection(prop_set, language_set)
+
+def from_json(projection_json: Optional[Dict[str, Any]]) -> Optional[Projection]:
+    """ Reverses Projection.to_json, mapping None to None. """
+    if projection_json is None:
+        return None
+    return projection(projection_json["props"], projection_json["languages"])
+
+def covers(held: Optional[Projection], wanted: Optional[Projection]) -> bool:
+    """ Checks that an entity retrieved with the held projection has everything the wanted projection asks for. """
+    if held is None:
+        return True
+    if wanted is None:
+        return False
+    if not wanted.props <= held.props:
+        return False
+    if held.languages is None or not wanted.props & LANGUAGE_PROPS:
+        return True
+    return wanted.languages is not None and wanted.languages <= held.languages
+
+def widen(first: Optional[Projection], second: Optional[Projection]) -> Optional[Projection]:
+    """ Returns the smallest projection covering both of the given projections. """
+    if first is None or second is None:
+        return None
+    if first.languages is None or second.languages is None:
+        languages = None
+    else:
+        languages = first.languages | second.languages
+    return projection(first.props | second.props, languages)
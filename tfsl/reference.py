@@ -1,48 +1,61 @@
 """ Holds the Reference class and a function to build one given a JSON representation of it. """
 
 from collections import defaultdict, Counter
-from copy import deepcopy
 from functools import singledispatchmethod
 from textwrap import indent
-from typing import Any, DefaultDict, List, Optional, Union
+from typing import Any, DefaultDict, Iterable, List, Optional, Union
 
 import tfsl.interfaces as I
 import tfsl.claim
 import tfsl.utils
 
 class ClaimSet(DefaultDict[I.Pid, I.ClaimList]):
-    """ Representation of a set of Claims. """
+    """ Representation of a set of Claims.
+        add and sub return new ClaimSets which share with the old one the Claims and the lists of Claims
+        for every other property, so those lists are replaced rather than changed in place.
+    """
     def __init__(self, *args: Any, **kwargs: I.ClaimList):
         if args:
             super(ClaimSet, self).__init__(*args, **kwargs)
         else:
             super(ClaimSet, self).__init__(list, **kwargs)
 
+    @classmethod
+    def from_claims(cls, claims: Iterable[tfsl.claim.Claim]) -> 'ClaimSet':
+        """ Groups claims into a new ClaimSet by property. """
+        claimset = cls()
+        for claim in claims:
+            claimset[claim.property].append(claim)
+        return claimset
+
     def add(self, arg: tfsl.claim.Claim) -> 'ClaimSet':
         """ Adds a claim to a ClaimSet. """
-        newclaimset = deepcopy(self)
-        newclaimset[arg.property].append(arg)
+        newclaimset = ClaimSet(list, self)
+        newclaimset[arg.property] = [*self.get(arg.property, []), arg]
         return newclaimset
 
     def sub(self, arg: tfsl.claim.Claim) -> 'ClaimSet':
         """ Removes a claim from a ClaimSet. """
-        newclaimset = deepcopy(self)
-        newclaimset[arg.property] = [claim for claim in newclaimset[arg.property] if claim != arg]
-        if len(newclaimset[arg.property]) == 0:
+        newclaimset = ClaimSet(list, self)
+        remaining = [claim for claim in self.get(arg.property, []) if claim != arg]
+        if remaining:
+            newclaimset[arg.property] = remaining
+        elif arg.property in newclaimset:
             del newclaimset[arg.property]
         return newclaimset
 
 class Reference:
-    """ Representation of a reference. """
+    """ Representation of a reference.
+        Its ClaimSet may be shared with copies of it, so deleting from it replaces the ClaimSet rather than changing it.
+    """
     def __init__(self, *args: Union[tfsl.claim.Claim, ClaimSet]):
-        self._claims = ClaimSet()
+        claims: List[tfsl.claim.Claim] = []
         for arg in args:
             if isinstance(arg, tfsl.claim.Claim):
-                self._claims = self._claims.add(arg)
+                claims.append(arg)
             else:
-                for prop in arg:
-                    for claim in arg[prop]:
-                        self._claims = self._claims.add(claim)
+                claims.extend(claim for prop in arg for claim in arg[prop])
+        self._claims = ClaimSet.from_claims(claims)
 
         self.snaks_order: Optional[List[I.Pid]] = None
         self.hash: Optional[str] = None
@@ -51,10 +64,19 @@ class Reference:
         return self._claims[property_in]
 
     def __delitem__(self, arg: Union[I.Pid, tfsl.claim.Claim]) -> None:
+        newclaims = ClaimSet(list, self._claims)
         if isinstance(arg, tfsl.claim.Claim):
-            self._claims[arg.property] = [claim for claim in self._claims[arg.property] if claim.value != arg.value]
+            newclaims[arg.property] = [claim for claim in self._claims[arg.property] if claim.value != arg.value]
         else:
-            del self._claims[arg]
+            del newclaims[arg]
+        self._claims = newclaims
+
+    def __copy__(self) -> 'Reference':
+        newref = Reference()
+        newref._claims = self._claims
+        newref.snaks_order = self.snaks_order
+        newref.hash = self.hash
+        return newref
 
     def __add__(self, arg: object) -> 'Reference':
         newclaims = self.add(arg)
@@ -124,13 +146,15 @@ class Reference:
         return base_dict
 
 
-def build_ref(ref_in: I.ReferenceDict) -> Reference:
-    """ Builds a Reference from the JSON dictionary describing it. """
+def build_ref(ref_in: I.ReferenceDict, trusted: bool=True) -> Reference:
+    """ Builds a Reference from the JSON dictionary describing it.
+        Datatypes in it are only checked if not trusted.
+    """
     claim_dict: I.ClaimDictSet = ref_in["snaks"]
     ref_claims: I.ClaimList = []
     for prop in claim_dict:
         for claim in claim_dict[prop]:
-            ref_claims.append(tfsl.claim.build_claim(claim))
+            ref_claims.append(tfsl.claim.build_claim(claim, trusted))
 
     ref_out = Reference(*ref_claims)
     ref_out.snaks_order = ref_in["snaks-order"]
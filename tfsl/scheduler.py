@@ -0,0 +1,148 @@
+""" Pacing of requests to a Wikibase, shared between every thread acting for the same account. """
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+DEFAULT_EDITS_PER_MINUTE = 60.0
+DEFAULT_BURST = 5.0
+DEFAULT_MAX_RETRIES = 8
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 300.0
+
+ResultT = TypeVar('ResultT')
+
+class TokenBucket:
+    """ Hands out tokens at a steady rate, allowing bursts of up to the bucket's capacity. """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """ Takes a token, returning how many seconds to wait before using it.
+            Tokens may be reserved ahead of time, so waiting callers are served in order.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class WriteScheduler:
+    """ Paces requests with a token bucket, and pauses every request going through it
+        whenever any response asks for a pause (through maxlag or Retry-After),
+        retrying the request that got that response with bounded, jittered exponential backoff.
+    """
+    def __init__(self,
+                 edits_per_minute: float=DEFAULT_EDITS_PER_MINUTE,
+                 burst: float=DEFAULT_BURST,
+                 max_retries: int=DEFAULT_MAX_RETRIES,
+                 base_delay: float=DEFAULT_BASE_DELAY,
+                 max_delay: float=DEFAULT_MAX_DELAY):
+        self.bucket = TokenBucket(edits_per_minute / 60, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """ Holds back every request through this scheduler for at least the given time. """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def wait_for_pause(self) -> None:
+        """ Blocks until no pause is in effect. """
+        while (remaining := self.paused_until - time.monotonic()) > 0:
+            time.sleep(remaining)
+
+    def wait_turn(self) -> None:
+        """ Blocks until a request may be made under both the pause and the edit rate. """
+        self.wait_for_pause()
+        delay = self.bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        self.wait_for_pause()
+
+    def backoff_delay(self, attempt: int, retry_after: float=0.0) -> float:
+        """ Returns how long to wait before retrying after the given number of failed attempts,
+            never less than what the server asked for.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return max(retry_after, random.uniform(delay / 2, delay))
+
+    def run(self,
+            send: Callable[[], ResultT],
+            retry_after: Callable[[ResultT], Optional[float]],
+            rate_limited: bool=True) -> ResultT:
+        """ Calls send, again and again for as long as retry_after says (by returning a number of seconds)
+            that its result should be retried, up to the maximum number of retries.
+            Only if rate_limited is true does each call take a token from the bucket.
+        """
+        for attempt in range(self.max_retries + 1):
+            if rate_limited:
+                self.wait_turn()
+            else:
+                self.wait_for_pause()
+            result = send()
+            requested_wait = retry_after(result)
+            if requested_wait is None:
+                return result
+            delay = self.backoff_delay(attempt, requested_wait)
+            logging.info("Server asked to slow down, pausing for %.1f seconds", delay)
+            self.pause(delay)
+        raise TimeoutError(f"Request still asked to be retried after {self.max_retries} retries")
+
+    async def wait_for_pause_async(self) -> None:
+        """ Waits without blocking the event loop until no pause is in effect. """
+        while (remaining := self.paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+    async def wait_turn_async(self) -> None:
+        """ Waits without blocking the event loop until a request may be made, as with wait_turn. """
+        await self.wait_for_pause_async()
+        delay = self.bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.wait_for_pause_async()
+
+    async def run_async(self,
+                        send: Callable[[], Awaitable[ResultT]],
+                        retry_after: Callable[[ResultT], Optional[float]],
+                        rate_limited: bool=True) -> ResultT:
+        """ Does what run does for a coroutine function send, waiting with asyncio.sleep instead of time.sleep.
+            The token bucket and pauses are the same as for run, so threads and coroutines can share a scheduler.
+        """
+        for attempt in range(self.max_retries + 1):
+            if rate_limited:
+                await self.wait_turn_async()
+            else:
+                await self.wait_for_pause_async()
+            result = await send()
+            requested_wait = retry_after(result)
+            if requested_wait is None:
+                return result
+            delay = self.backoff_delay(attempt, requested_wait)
+            logging.info("Server asked to slow down, pausing for %.1f seconds", delay)
+            self.pause(delay)
+        raise TimeoutError(f"Request still asked to be retried after {self.max_retries} retries")
+
+_write_schedulers: Dict[Tuple[str, str], WriteScheduler] = {}
+_write_schedulers_lock = threading.Lock()
+
+def shared_write_scheduler(url: str, username: str) -> WriteScheduler:
+    """ Returns the process-wide WriteScheduler for the given account on the given Wikibase. """
+    with _write_schedulers_lock:
+        key = (url, username)
+        if key not in _write_schedulers:
+            _write_schedulers[key] = WriteScheduler()
+        return _write_schedulers[key]
@@ -1,7 +1,7 @@
 """ Holds the Statement class and a function to build one given a JSON representation of it. """
 
 from collections import defaultdict
-from copy import deepcopy
+from copy import copy
 from enum import Enum
 from textwrap import indent
 from typing import List, Optional, Union
@@ -20,13 +20,15 @@ class Rank(Enum):
 class Statement:
     """ Represents a statement, or a claim with accompanying rank, optional qualifiers,
         and optional references.
+        As with Claims, a datatype provided when constructing one is trusted.
     """
     def __init__(self,
                  property_in: I.Pid,
                  value_in: I.ClaimValue,
                  rank: Optional[Rank]=None,
                  qualifiers: Optional[Union[I.ClaimList, tfsl.reference.ClaimSet]]=None,
-                 references: Optional[I.ReferenceList]=None):
+                 references: Optional[I.ReferenceList]=None,
+                 datatype: Optional[str]=None):
         self.rank: Rank
         if rank is None:
             self.rank = Rank.Normal
@@ -35,31 +37,31 @@ class Statement:
 
         self.property: I.Pid = property_in
         self.value: I.ClaimValue
-        if tfsl.utils.is_novalue(value_in) or tfsl.utils.is_somevalue(value_in):
+        self.datatype: Optional[str] = datatype
+        if datatype is not None or tfsl.utils.is_novalue(value_in) or tfsl.utils.is_somevalue(value_in):
             self.value = value_in
         else:
+            self.datatype = tfsl.utils.values_datatype(self.property)
             value_type = type(value_in)
-            property_type = tfsl.claim.type_string_to_type[tfsl.utils.values_type(self.property)]
+            property_type = tfsl.claim.type_string_to_type[tfsl.utils.external_to_internal_type_mapping[self.datatype]]
             if property_type == value_type:
                 self.value = value_in
             else:
                 raise TypeError(f"Providing {value_type} as {self.property} value where {property_type} expected")
 
-        self.qualifiers: tfsl.reference.ClaimSet = tfsl.reference.ClaimSet()
-
+        # the lists and references holding the claims are copied, so that changes the caller
+        # later makes to what it passed in do not reach this statement
+        self.qualifiers: tfsl.reference.ClaimSet
         if isinstance(qualifiers, tfsl.reference.ClaimSet):
-            for prop in qualifiers:
-                for claim in qualifiers[prop]:
-                    self.qualifiers = self.qualifiers.add(claim)
-        elif qualifiers is not None:
-            for arg in qualifiers:
-                self.qualifiers = self.qualifiers.add(arg)
+            self.qualifiers = tfsl.reference.ClaimSet(list, {prop: list(claims) for prop, claims in qualifiers.items()})
+        else:
+            self.qualifiers = tfsl.reference.ClaimSet.from_claims(qualifiers or [])
 
         self.references: I.ReferenceList
         if references is None:
             self.references = []
         else:
-            self.references = deepcopy(references)
+            self.references = [copy(reference) for reference in references]
 
         self.id: Optional[str] = None
         self.qualifiers_order: List[I.Pid] = []
@@ -69,25 +71,40 @@ class Statement:
             return self.qualifiers.get(key, [])
         raise KeyError
 
+    def derive(self,
+               rank: Optional[Rank]=None,
+               qualifiers: Optional[tfsl.reference.ClaimSet]=None,
+               references: Optional[I.ReferenceList]=None) -> 'Statement':
+        """ Returns a new Statement with the given parts replaced, sharing every other part with this one.
+            Unlike the constructor, the parts given are not copied, so they must not be changed afterwards.
+        """
+        newstmt = copy(self)
+        newstmt.rank = self.rank if rank is None else rank
+        newstmt.qualifiers = self.qualifiers if qualifiers is None else qualifiers
+        newstmt.references = self.references if references is None else references
+        newstmt.id = None
+        newstmt.qualifiers_order = []
+        return newstmt
+
     def __add__(self, arg: object) -> 'Statement':
         if isinstance(arg, tfsl.claim.Claim):
-            return Statement(self.property, self.value, self.rank, self.qualifiers.add(arg), self.references)
+            return self.derive(qualifiers=self.qualifiers.add(arg))
         elif isinstance(arg, tfsl.reference.Reference):
-            return Statement(self.property, self.value, self.rank, self.qualifiers, tfsl.utils.add_to_list(self.references, arg))
+            return self.derive(references=tfsl.utils.add_to_list(self.references, copy(arg)))
         raise NotImplementedError(f"Can't add {str(type(arg))} to statement")
 
     def __sub__(self, arg: object) -> 'Statement':
         if isinstance(arg, tfsl.claim.Claim):
-            return Statement(self.property, self.value, self.rank, self.qualifiers.sub(arg), self.references)
+            return self.derive(qualifiers=self.qualifiers.sub(arg))
         elif isinstance(arg, tfsl.reference.Reference):
-            return Statement(self.property, self.value, self.rank, self.qualifiers, tfsl.utils.sub_from_list(self.references, arg))
+            return self.derive(references=tfsl.utils.sub_from_list(self.references, arg))
         raise NotImplementedError(f"Can't subtract {str(type(arg))} from statement")
 
     def __matmul__(self, arg: object) -> 'Statement':
         if isinstance(arg, Rank):
             if arg == self.rank:
                 return self
-            return Statement(self.property, self.value, arg, self.qualifiers, self.references)
+            return self.derive(rank=arg)
         raise NotImplementedError(f"{str(type(arg))} is not a rank")
 
     def __eq__(self, rhs: object) -> bool:
@@ -128,7 +145,7 @@ class Statement:
         return base_str + qualifiers_str + references_str
 
     def __jsonout__(self) -> I.StatementDict:
-        base_dict: I.StatementDict = {"type": "statement", "mainsnak": tfsl.claim.Claim(self.property, self.value).__jsonout__()}
+        base_dict: I.StatementDict = {"type": "statement", "mainsnak": tfsl.claim.Claim(self.property, self.value, self.datatype).__jsonout__()}
         if self.id is not None:
             base_dict["id"] = self.id
         base_dict["rank"] = ["deprecated", "normal", "preferred"][self.rank.value+1]
@@ -178,17 +195,21 @@ class Statement:
             return novalue
         raise TypeError(f"{self.property} statement did not yield a string")
 
-def build_quals(quals_in: Optional[I.ClaimDictSet] = None) -> tfsl.reference.ClaimSet:
-    """ Builds a set of qualifiers given a JSON dictionary representing it. """
+def build_quals(quals_in: Optional[I.ClaimDictSet] = None, trusted: bool=True) -> tfsl.reference.ClaimSet:
+    """ Builds a set of qualifiers given a JSON dictionary representing it,
+        trusting the datatypes in it unless told otherwise.
+    """
     quals = tfsl.reference.ClaimSet()
     if quals_in is not None:
         for prop in quals_in:
             for qual in quals_in[prop]:
-                quals[prop].append(tfsl.claim.build_claim(qual))
+                quals[prop].append(tfsl.claim.build_claim(qual, trusted))
     return quals
 
-def build_statement(stmt_in: I.StatementDict) -> Statement:
-    """ Builds a LexemeSense from the JSON dictionary describing it. """
+def build_statement(stmt_in: I.StatementDict, trusted: bool=True) -> Statement:
+    """ Builds a Statement from the JSON dictionary describing it.
+        If trusted, the datatypes in the JSON are used as is, so no datatypes are looked up.
+    """
     stmt_rank = Rank.Normal
     if stmt_in["rank"] == 'preferred':
         stmt_rank = Rank.Preferred
@@ -205,11 +226,12 @@ def build_statement(stmt_in: I.StatementDict) -> Statement:
     else:
         stmt_datavalue = stmt_mainsnak["datavalue"]
         stmt_value = tfsl.claim.build_value(stmt_datavalue["value"])
-    stmt_quals = build_quals(stmt_in.get("qualifiers", None))
+    stmt_quals = build_quals(stmt_in.get("qualifiers", None), trusted)
     stmt_refs = []
     if stmt_in.get("references", False):
-        stmt_refs = [tfsl.reference.build_ref(ref) for ref in stmt_in["references"]]
+        stmt_refs = [tfsl.reference.build_ref(ref, trusted) for ref in stmt_in["references"]]
 
-    stmt_out = Statement(stmt_property, stmt_value, stmt_rank, stmt_quals, stmt_refs)
+    stmt_datatype = stmt_mainsnak.get("datatype") if trusted else None
+    stmt_out = Statement(stmt_property, stmt_value, stmt_rank, stmt_quals, stmt_refs, stmt_datatype)
     stmt_out.set_published_settings(stmt_in)
     return stmt_out
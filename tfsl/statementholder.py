@@ -1,7 +1,6 @@
 """ Holds the StatementHolder class and a function to build one given a JSON representation of it. """
 
 from collections import defaultdict
-from copy import deepcopy
 from textwrap import indent
 from typing import Optional
 
@@ -10,7 +9,10 @@ import tfsl.statement
 import tfsl.utils as U
 
 class StatementHolder(object):
-    """ Holds a set of statements. """
+    """ Holds a set of statements.
+        Adding or subtracting a statement only copies the list for its property;
+        the others are shared with the new StatementHolder and so are not changed in place.
+    """
     def __init__(self, statements: Optional[I.StatementHolderInput]=None):
         super().__init__()
 
@@ -23,6 +25,13 @@ class StatementHolder(object):
             for arg in statements:
                 self.statements[arg.property].append(arg)
 
+    @classmethod
+    def from_grouped(cls, statements: I.StatementSet) -> 'StatementHolder':
+        """ Makes a StatementHolder around statements already grouped by property, sharing their lists. """
+        holder = cls()
+        holder.statements = defaultdict(list, statements)
+        return holder
+
     def get_statements(self, property_in: I.Pid) -> I.StatementList:
         """ Returns a list of statements with the provided property. """
         return self.statements.get(property_in, [])
@@ -87,30 +96,32 @@ class StatementHolder(object):
     def __add__(self, rhs: object) -> 'StatementHolder':
         if not isinstance(rhs, tfsl.statement.Statement):
             raise TypeError(f"Can't add {type(rhs)} to StatementHolder")
-        newstmts = deepcopy(self.statements)
-        newstmts[rhs.property].append(rhs)
-        return StatementHolder(newstmts)
+        newstmts = defaultdict(list, self.statements)
+        newstmts[rhs.property] = [*self.statements.get(rhs.property, []), rhs]
+        return StatementHolder.from_grouped(newstmts)
 
     def __sub__(self, rhs: object) -> 'StatementHolder':
         if isinstance(rhs, str):
             if I.is_Pid(rhs):
-                newstmts = deepcopy(self.statements)
+                newstmts = defaultdict(list, self.statements)
                 if rhs in newstmts:
                     del newstmts[rhs]
-                return StatementHolder(newstmts)
+                return StatementHolder.from_grouped(newstmts)
             raise TypeError(f"String {rhs} is not a property")
         elif isinstance(rhs, tfsl.statement.Statement):
-            newstmts = deepcopy(self.statements)
-            newstmts[rhs.property] = [stmt for stmt in newstmts[rhs.property] if stmt != rhs]
+            newstmts = defaultdict(list, self.statements)
+            newstmts[rhs.property] = [stmt for stmt in self.statements.get(rhs.property, []) if stmt != rhs]
             if not newstmts[rhs.property]:
                 del newstmts[rhs.property]
-            return StatementHolder(newstmts)
+            return StatementHolder.from_grouped(newstmts)
         raise TypeError(f"Can't subtract {type(rhs)} from StatementHolder")
 
-def build_statement_list(claims_dict: I.StatementDictSet) -> I.StatementSet:
-    """ Builds a statement set from a JSON dictionary of statements. """
+def build_statement_list(claims_dict: I.StatementDictSet, trusted: bool=True) -> I.StatementSet:
+    """ Builds a statement set from a JSON dictionary of statements.
+        Datatypes in it are only checked if not trusted.
+    """
     claims: I.StatementSet = defaultdict(list)
     for prop in claims_dict:
         for claim in claims_dict[prop]:
-            claims[prop].append(tfsl.statement.build_statement(claim))
+            claims[prop].append(tfsl.statement.build_statement(claim, trusted))
     return claims
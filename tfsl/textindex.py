@@ -0,0 +1,100 @@
+""" Normalization of text for comparisons, and an index over MonolingualTexts built on it. """
+
+import unicodedata
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import tfsl.lexeme
+import tfsl.monolingualtext
+
+# combining grave, acute, circumflex, macron and caron, used to mark tone;
+# other marks, such as the dot below in ị, ọ and ụ, distinguish letters and are kept
+TONE_MARKS = frozenset(["\u0300", "\u0301", "\u0302", "\u0304", "\u030c"])
+
+TextKey = Tuple[str, str]
+
+def normalize_text(text: str, strip_tones: bool=False) -> str:
+    """ Returns the NFC form of the provided text without surrounding whitespace,
+        optionally with its tone marks removed.
+    """
+    text = text.strip()
+    if text.isascii():
+        return text
+    if not strip_tones:
+        return unicodedata.normalize("NFC", text)
+    decomposed = unicodedata.normalize("NFD", text)
+    return unicodedata.normalize("NFC", "".join(char for char in decomposed if char not in TONE_MARKS))
+
+class TextMatch(NamedTuple):
+    """ Owners of the indexed texts matching some text exactly, after normalization,
+        and after normalization ignoring tone marks.
+    """
+    exact: Set[str]
+    normalized: Set[str]
+    tone_insensitive: Set[str]
+
+class TextIndex:
+    """ Hash index from texts with language codes to the ids of the entities bearing them. """
+    def __init__(self) -> None:
+        self.exact: DefaultDict[TextKey, Set[str]] = defaultdict(set)
+        self.normalized: DefaultDict[TextKey, Set[str]] = defaultdict(set)
+        self.tone_insensitive: DefaultDict[TextKey, Set[str]] = defaultdict(set)
+
+    def add_text(self, code: str, text: str, owner: str) -> None:
+        """ Indexes a text in the language with the given code as belonging to the given owner. """
+        self.exact[(code, text)].add(owner)
+        self.normalized[(code, normalize_text(text))].add(owner)
+        self.tone_insensitive[(code, normalize_text(text, True))].add(owner)
+
+    def add(self, text: tfsl.monolingualtext.MonolingualText, owner: str) -> None:
+        """ Indexes a MonolingualText as belonging to the given owner. """
+        self.add_text(text.language.code, text.text, owner)
+
+    def add_lexeme(self, lexeme: 'tfsl.lexeme.Lexeme', owner: Optional[str]=None) -> None:
+        """ Indexes the lemmata and form representations of a Lexeme,
+            by default as belonging to the Lexeme's own Lid.
+        """
+        if owner is None:
+            owner = lexeme.lexeme_id
+        if owner is None:
+            raise ValueError("Lexeme has no Lid, so an owner must be provided")
+        for lemma in lexeme.lemmata.texts:
+            self.add(lemma, owner)
+        for form in lexeme.forms:
+            for representation in form.representations.texts:
+                self.add(representation, owner)
+
+    def add_lexeme_json(self, lexeme_in: Dict[str, Any]) -> None:
+        """ Indexes the lemmata and form representations in the JSON of a lexeme
+            without building a Lexeme from it.
+        """
+        lid = lexeme_in["id"]
+        for lemma in lexeme_in.get("lemmas", {}).values():
+            self.add_text(lemma["language"], lemma["value"], lid)
+        for form in lexeme_in.get("forms", []):
+            for representation in form.get("representations", {}).values():
+                self.add_text(representation["language"], representation["value"], lid)
+
+    def lookup_text(self, code: str, text: str) -> TextMatch:
+        """ Returns the owners of indexed texts matching the given text in each way. """
+        return TextMatch(
+            set(self.exact.get((code, text), ())),
+            set(self.normalized.get((code, normalize_text(text)), ())),
+            set(self.tone_insensitive.get((code, normalize_text(text, True)), ()))
+        )
+
+    def lookup(self, text: tfsl.monolingualtext.MonolingualText) -> TextMatch:
+        """ Returns the owners of indexed texts matching the given MonolingualText in each way. """
+        return self.lookup_text(text.language.code, text.text)
+
+    def lookup_batch(self, texts: Iterable[tfsl.monolingualtext.MonolingualText]) -> List[TextMatch]:
+        """ Looks up each of the given MonolingualTexts, in order. """
+        return [self.lookup(text) for text in texts]
+
+    def __contains__(self, arg: object) -> bool:
+        if isinstance(arg, tfsl.monolingualtext.MonolingualText):
+            return (arg.language.code, normalize_text(arg.text)) in self.normalized
+        raise TypeError(f"Can't check for {type(arg)} in TextIndex")
+
+    def __len__(self) -> int:
+        return len(self.exact)
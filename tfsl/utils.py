@@ -1,18 +1,34 @@
 """ Miscellaneous utility functions. """
 
 import configparser
+import json
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Match, Optional, Tuple, TypeVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Match, Optional, Tuple, TypeVar
 
 import requests
 
 import tfsl.interfaces as I
+import tfsl.auth
+import tfsl.cache
+import tfsl.datatypesnapshot
+import tfsl.projection
 
 DEFAULT_INDENT = "    "
 WD_PREFIX = "http://www.wikidata.org/entity/"
+DEFAULT_DATATYPE_TIME_TO_LIVE = 30 * 24 * 60 * 60.0
+MAX_IDS_PER_REQUEST = 50
+# how long to wait before checking again on entities another thread or process is retrieving
+CLAIM_POLL_INTERVAL = 0.05
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+CACHE_VALIDATION_MODES = ["refetch", "lastrevid"]
+DEFAULT_MEMORY_CACHE_ENTRIES = 1024
 
 def prefix_wd(arg: str) -> str:
     """ Removes the entity prefix from the provided string. """
@@ -26,16 +42,12 @@ def strip_prefix_wd(arg: str) -> str:
 
 ListT = TypeVar('ListT')
 def add_to_list(references: List[ListT], arg: ListT) -> List[ListT]:
-    """ Adds a ListT to a list of ListTs. """
-    newreferences = deepcopy(references)
-    newreferences.append(arg)
-    return newreferences
+    """ Returns a new list of ListTs with a ListT added, sharing the ListTs themselves with the old list. """
+    return [*references, arg]
 
 def sub_from_list(references: List[ListT], arg: ListT) -> List[ListT]:
-    """ Removes a ListT from a list of ListTs. """
-    newreferences = deepcopy(references)
-    newreferences = [reference for reference in newreferences if reference != arg]
-    return newreferences
+    """ Returns a new list of ListTs with a ListT removed, sharing the remaining ListTs with the old list. """
+    return [reference for reference in references if reference != arg]
 
 external_to_internal_type_mapping = {
     "commonsMedia": "string",
@@ -63,29 +75,261 @@ def values_type(prop: str) -> str:
     """ Returns the internal datatype of the provided property. """
     return external_to_internal_type_mapping[values_datatype(prop)]
 
-@lru_cache
 def values_datatype(prop: str) -> str:
-    """ Returns the outward-facing datatype of the provided property. """
-    # TODO: rewrite better
-    prop_response = requests.get('https://www.wikidata.org/wiki/Special:EntityData/'+prop+'.json')
-    prop_response_json = prop_response.json()
-    if isinstance(prop_response_json, dict):
-        prop_data: I.PropertyDict = prop_response_json["entities"][prop]
-        return prop_data["datatype"]
-    raise ValueError(f"Response from retrieving {prop} not valid JSON")
+    """ Returns the outward-facing datatype of the provided property,
+        from the bundled snapshot if it is there and from the datatype store otherwise.
+    """
+    if (datatype := snapshot_datatypes.get(prop)) is not None:
+        return datatype
+    return datatype_store.get(prop)
 
-def read_config() -> Tuple[str, float]:
-    """ Reads the config file residing at /path/to/tfsl/config.ini. """
+def prefetch_datatypes(props: Iterable[str]) -> None:
+    """ Ensures that the datatypes of all of the provided properties are known,
+        retrieving those which are not with as few requests as possible.
+    """
+    datatype_store.prefetch(prop for prop in props if prop not in snapshot_datatypes)
+
+class DatatypeStore:
+    """ Property datatypes kept in one JSON file in the cache directory, so that they outlive the process.
+        Entries older than the time to live are refreshed, several at a time, when next needed.
+    """
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.datatypes: Dict[str, Tuple[str, float]] = self.read()
+
+    def read(self) -> Dict[str, Tuple[str, float]]:
+        """ Reads the whole store from disk, treating a missing or damaged file as empty. """
+        try:
+            with open(self.path, encoding="utf-8") as fileptr:
+                stored = json.load(fileptr)
+            return {prop: (entry[0], float(entry[1])) for prop, entry in stored.items()}
+        except (OSError, ValueError, TypeError, IndexError, AttributeError):
+            return {}
+
+    def write(self) -> None:
+        """ Writes the store to disk, keeping the newer of any entries another process wrote meanwhile. """
+        for prop, entry in self.read().items():
+            if prop not in self.datatypes or self.datatypes[prop][1] < entry[1]:
+                self.datatypes[prop] = entry
+        fileno, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fileno, "w", encoding="utf-8") as fileptr:
+            json.dump(self.datatypes, fileptr)
+        os.replace(temp_path, self.path)
+
+    def is_fresh(self, prop: str) -> bool:
+        """ Checks that the datatype of the property is known and not past its time to live. """
+        entry = self.datatypes.get(prop)
+        return entry is not None and time.time() - entry[1] < self.ttl
+
+    def get(self, prop: str) -> str:
+        """ Returns the datatype of the property, refreshing it (and other stale entries) if needed. """
+        if not self.is_fresh(prop):
+            with self.lock:
+                if not self.is_fresh(prop):
+                    stale = [other for other in self.datatypes if other != prop and not self.is_fresh(other)]
+                    failures = self.fetch([prop] + stale[:MAX_IDS_PER_REQUEST-1])
+                    if prop in failures and prop not in self.datatypes:
+                        raise failures[prop]
+        return self.datatypes[prop][0]
+
+    def prefetch(self, props: Iterable[str]) -> None:
+        """ Retrieves the datatypes of those of the properties not known or past their time to live. """
+        with self.lock:
+            missing = [prop for prop in dict.fromkeys(props) if not self.is_fresh(prop)]
+            if missing:
+                failures = self.fetch(missing)
+                unknown = [prop for prop in failures if prop not in self.datatypes]
+                if unknown:
+                    raise ValueError(f"Could not retrieve the datatypes of {unknown}") from failures[unknown[0]]
+
+    def fetch(self, props: List[str]) -> Dict[str, Exception]:
+        """ Retrieves the datatypes of the properties with one wbgetentities request per 50 properties.
+            Every datatype retrieved is stored, and those properties whose datatypes could not be
+            are returned along with what went wrong.
+        """
+        fetched_at = time.time()
+        failures: Dict[str, Exception] = {}
+        for start in range(0, len(props), MAX_IDS_PER_REQUEST):
+            chunk = props[start:start+MAX_IDS_PER_REQUEST]
+            query_parameters = {
+                "action": "wbgetentities",
+                "format": "json",
+                "props": "datatype",
+                "ids": "|".join(chunk)
+            }
+            current_headers = {"User-Agent": tfsl.auth.DEFAULT_USER_AGENT}
+            try:
+                prop_response = requests.get(tfsl.auth.WIKIDATA_API_URL, params=query_parameters, headers=current_headers)
+                prop_response_json = prop_response.json()
+                if not isinstance(prop_response_json, dict) or "entities" not in prop_response_json:
+                    raise ValueError(f"Response from retrieving {chunk} not valid JSON")
+            except (requests.RequestException, ValueError) as exception:
+                failures.update((prop, exception) for prop in chunk)
+                continue
+            for prop in chunk:
+                prop_data: I.PropertyDict = prop_response_json["entities"].get(prop, {})
+                if "datatype" not in prop_data:
+                    failures[prop] = ValueError(f"Could not retrieve the datatype of {prop}")
+                    continue
+                self.datatypes[prop] = (prop_data["datatype"], fetched_at)
+        if len(failures) < len(props):
+            self.write()
+        return failures
+
+def read_config_section() -> configparser.SectionProxy:
+    """ Reads the Tfsl section of the config file residing at /path/to/tfsl/config.ini. """
     config = configparser.ConfigParser()
     current_config_path = (Path(__file__).parent / '../config.ini').resolve()
     config.read(current_config_path)
-    cpath = config['Tfsl']['CachePath']
-    ttl = float(config['Tfsl']['TimeToLive'])
+    return config['Tfsl']
+
+def read_config() -> Tuple[str, float]:
+    """ Reads the config file residing at /path/to/tfsl/config.ini. """
+    config = read_config_section()
+    cpath = config['CachePath']
+    ttl = float(config['TimeToLive'])
     return cpath, ttl
 
 def get_filename(entity_name: str) -> str:
-    """ Constructs the name of a text file containing a sense subgraph based on a given property. """
-    return os.path.join(cache_path, f"{entity_name}.json")
+    """ Constructs the name of the file in which the directory cache backend writes an entity. """
+    return os.path.join(cache_path, entity_name + tfsl.cache.COMPRESSION_SUFFIXES[cache_compression])
+
+def is_fresh(entry: Optional[tfsl.cache.CachedEntity]) -> bool:
+    """ Checks that a cached entity exists and is not past its time to live. """
+    return entry is not None and time.time() - entry.fetched_at < time_to_live
+
+def is_usable(entry: Optional[tfsl.cache.CachedEntity], projection: Optional[tfsl.projection.Projection]=None) -> bool:
+    """ Checks that a cached entity is fresh and holds at least the given projection of the entity. """
+    return entry is not None and is_fresh(entry) and tfsl.projection.covers(entry.projection, projection)
+
+def revalidate(entries: Dict[I.EntityId, tfsl.cache.CachedEntity]) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+    """ Returns the JSON of those of the provided cached entities whose current revisions are the cached ones,
+        asking for the revisions of up to 50 entities per request, and marks them as retrieved now.
+    """
+    checkable = [entity_id for entity_id, entry in entries.items() if entry.lastrevid is not None]
+    revision_ids: Dict[I.EntityId, int] = {}
+    for start in range(0, len(checkable), MAX_IDS_PER_REQUEST):
+        revision_ids.update(tfsl.auth.get_revision_ids(checkable[start:start+MAX_IDS_PER_REQUEST]))
+    unchanged = {entity_id: entries[entity_id].data for entity_id in checkable if revision_ids.get(entity_id) == entries[entity_id].lastrevid}
+    entity_cache.touch_many(unchanged)
+    return unchanged
+
+def load_cached_entities(entity_ids: Iterable[I.EntityId],
+                         projection: Optional[tfsl.projection.Projection]=None) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+    """ Returns the JSON of those of the entities with the given ids which may be used from the cache,
+        holding at least the given projection of each entity (by default, all of it).
+        Entities past their time to live are left out, unless CacheValidation is lastrevid
+        and their revisions turn out not to have changed.
+    """
+    entries = {entity_id: entry for entity_id, entry in entity_cache.get_many(entity_ids).items()
+               if tfsl.projection.covers(entry.projection, projection)}
+    cached = {entity_id: entry.data for entity_id, entry in entries.items() if is_fresh(entry)}
+    if cache_validation == "lastrevid" and len(cached) < len(entries):
+        cached.update(revalidate({entity_id: entry for entity_id, entry in entries.items() if entity_id not in cached}))
+    return cached
+
+def retrieve_entities(entity_ids: List[I.EntityId],
+                      projection: Optional[tfsl.projection.Projection]=None) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+    """ Retrieves the given projection of the given entities, caching each of them that exists.
+        Parts of those entities which are already cached are retrieved again too, so that the cache holds
+        every part asked for so far. Entities are claimed while they are retrieved; those claimed by another thread
+        or process are left to it and taken from the cache once it is done, or retrieved later if it could not cache them.
+    """
+    entities: Dict[I.EntityId, I.EntityPublishedSettings] = {}
+    remaining = list(dict.fromkeys(entity_ids))
+    while remaining:
+        with entity_cache.claimed(remaining) as claimed:
+            claimed_ids = [entity_id for entity_id in remaining if entity_id in claimed]
+            if claimed_ids:
+                entities.update(retrieve_claimed_entities(claimed_ids, projection))
+        # claimed entities were retrieved, whether or not they turned out to exist
+        remaining = [entity_id for entity_id in remaining if entity_id not in entities and entity_id not in claimed_ids]
+        if remaining:
+            entries = entity_cache.get_many(remaining)
+            entities.update({entity_id: entry.data for entity_id, entry in entries.items() if is_usable(entry, projection)})
+            remaining = [entity_id for entity_id in remaining if entity_id not in entities]
+            if remaining and not claimed_ids:
+                time.sleep(CLAIM_POLL_INTERVAL)
+    return entities
+
+def retrieve_claimed_entities(entity_ids: List[I.EntityId],
+                              projection: Optional[tfsl.projection.Projection]=None) -> Dict[I.EntityId, I.EntityPublishedSettings]:
+    """ Retrieves the given projection of the given entities, already claimed, with a single request,
+        unless another thread or process cached them before they were claimed.
+    """
+    entries = entity_cache.get_many(entity_ids)
+    entities = {entity_id: entry.data for entity_id, entry in entries.items() if is_usable(entry, projection)}
+    if (missing := [entity_id for entity_id in entity_ids if entity_id not in entities]):
+        wanted = projection
+        for entity_id in missing:
+            if entity_id in entries:
+                wanted = tfsl.projection.widen(wanted, entries[entity_id].projection)
+        retrieved = tfsl.auth.get_lexemes(missing) if wanted is None else tfsl.auth.get_lexemes(missing, projection=wanted)
+        entity_cache.put_many({entity_id: entity_json for entity_id, entity_json in retrieved.items() if "missing" not in entity_json},
+                              projection=wanted)
+        entities.update(retrieved)
+    return entities
+
+def retrieve_entity_json(entity_id: I.EntityId, projection: Optional[tfsl.projection.Projection]=None) -> I.EntityPublishedSettings:
+    """ Returns the JSON of the entity with the given id, or at least the given projection of it, from the cache if possible. """
+    cached = load_cached_entities([entity_id], projection)
+    if entity_id in cached:
+        return cached[entity_id]
+    entities = retrieve_entities([entity_id], projection)
+    if entity_id not in entities or "missing" in entities[entity_id]:
+        raise ValueError(f"Entity {entity_id} could not be retrieved")
+    return entities[entity_id]
+
+def iter_entity_jsons(entity_ids: Iterable[I.EntityId],
+                      max_workers: Optional[int]=None,
+                      projection: Optional[tfsl.projection.Projection]=None) -> Iterator[Tuple[I.EntityId, I.EntityPublishedSettings]]:
+    """ Yields each of the given ids with the JSON of its entity (or at least the given projection of it), in the order given.
+        Entities not in the cache are retrieved up front in chunks of up to 50 per request,
+        with at most max_workers (by default the configured MaxConcurrentRequests) requests at once.
+    """
+    entity_ids = list(entity_ids)
+    cached = load_cached_entities(entity_ids, projection)
+    uncached = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id not in cached]
+    with ThreadPoolExecutor(max_workers=max_workers or max_concurrent_requests) as executor:
+        chunk_futures: Dict[I.EntityId, Future[Dict[I.EntityId, I.EntityPublishedSettings]]] = {}
+        for start in range(0, len(uncached), MAX_IDS_PER_REQUEST):
+            chunk = uncached[start:start+MAX_IDS_PER_REQUEST]
+            future = executor.submit(retrieve_entities, chunk, projection)
+            for entity_id in chunk:
+                chunk_futures[entity_id] = future
+        for entity_id in entity_ids:
+            if entity_id in cached:
+                yield entity_id, cached[entity_id]
+                continue
+            entities = chunk_futures[entity_id].result()
+            if entity_id not in entities or "missing" in entities[entity_id]:
+                raise ValueError(f"Entity {entity_id} could not be retrieved")
+            yield entity_id, entities[entity_id]
+
+BuiltT = TypeVar('BuiltT')
+def build_cached(entity_id: I.EntityId, entity_json: I.EntityPublishedSettings, build: Callable[[Any], BuiltT]) -> BuiltT:
+    """ Builds an entity from its JSON. If MemoryCacheObjects is set, the entity last built from the very same JSON
+        is reused instead where possible, and a copy of it which the caller may change is returned.
+    """
+    if not memory_cache_objects:
+        return build(entity_json)
+    cached = object_cache.get(entity_id)
+    if cached is not None and cached[0] is entity_json:
+        return deepcopy(cached[1])
+    built = build(entity_json)
+    object_cache.put(entity_id, (entity_json, built))
+    return deepcopy(built)
+
+def memory_cache_stats() -> Dict[str, tfsl.cache.CacheStats]:
+    """ Returns the counters of the in-memory caches of entity JSON and, if enabled, of built entities. """
+    stats = {}
+    if isinstance(entity_cache, tfsl.cache.MemoryCache):
+        stats["json"] = entity_cache.stats()
+    if memory_cache_objects:
+        stats["objects"] = object_cache.stats()
+    return stats
 
 def is_novalue(value: Any) -> bool:
     """ Checks that a value is a novalue. """
@@ -97,3 +341,22 @@ def is_somevalue(value: Any) -> bool:
 
 cache_path, time_to_live = read_config()
 os.makedirs(cache_path,exist_ok=True)
+
+config_section = read_config_section()
+
+cache_compression = tfsl.cache.available_compression(config_section.get('CacheCompression', fallback='gzip'))
+entity_cache: tfsl.cache.EntityCache = tfsl.cache.open_cache(config_section.get('CacheBackend', fallback='directory'), cache_path, cache_compression)
+memory_cache_entries = config_section.getint('MemoryCacheEntries', fallback=DEFAULT_MEMORY_CACHE_ENTRIES)
+memory_cache_bytes = config_section.getint('MemoryCacheBytes', fallback=None)
+if memory_cache_entries or memory_cache_bytes:
+    entity_cache = tfsl.cache.MemoryCache(entity_cache, memory_cache_entries or None, memory_cache_bytes)
+memory_cache_objects = config_section.getboolean('MemoryCacheObjects', fallback=False)
+object_cache: tfsl.cache.LRUCache[I.EntityId, Tuple[I.EntityPublishedSettings, Any]] = tfsl.cache.LRUCache(memory_cache_entries or None)
+
+cache_validation = config_section.get('CacheValidation', fallback='refetch')
+if cache_validation not in CACHE_VALIDATION_MODES:
+    raise ValueError(f"CacheValidation must be one of {CACHE_VALIDATION_MODES}, not {cache_validation}")
+max_concurrent_requests = config_section.getint('MaxConcurrentRequests', fallback=DEFAULT_MAX_CONCURRENT_REQUESTS)
+datatype_time_to_live = config_section.getfloat('DatatypeTimeToLive', fallback=DEFAULT_DATATYPE_TIME_TO_LIVE)
+snapshot_datatypes = tfsl.datatypesnapshot.load_snapshot()
+datatype_store = DatatypeStore(os.path.join(cache_path, "datatypes.json"), datatype_time_to_live)
@@ -0,0 +1,71 @@
+""" Filling an entity cache from the JSON dumps of a Wikibase instead of retrieving entities one request at a time. """
+
+from typing import Any, Callable, Collection, Dict, Optional, cast
+
+import tfsl.cache
+import tfsl.dumps
+import tfsl.interfaces as I
+
+DEFAULT_WRITE_BATCH_SIZE = 500
+
+class EntityCriteria:
+    """ Which entities of a dump to keep: those of the given types, lexemes in the given languages,
+        and entities with the given ids. Criteria left as None do not narrow the selection.
+    """
+    def __init__(self,
+                 types: Optional[Collection[str]]=None,
+                 languages: Optional[Collection[str]]=None,
+                 ids: Optional[Collection[I.EntityId]]=None):
+        self.types = frozenset(types) if types is not None else None
+        self.languages = frozenset(languages) if languages is not None else None
+        self.ids = frozenset(ids) if ids is not None else None
+
+    def line_filter(self) -> Optional[Callable[[str], bool]]:
+        """ Returns a substring test passing every line which might hold a wanted entity, if there is a cheap one. """
+        if self.languages is not None:
+            needles = [f'"language":"{language}"' for language in self.languages]
+        elif self.types is not None:
+            needles = [f'"type":"{entity_type}"' for entity_type in self.types]
+        else:
+            return None
+        def might_match(line: str) -> bool:
+            return any(needle in line for needle in needles)
+        return might_match
+
+    def __call__(self, entity: Dict[str, Any]) -> bool:
+        if self.types is not None and entity.get("type") not in self.types:
+            return False
+        if self.languages is not None and entity.get("language") not in self.languages:
+            return False
+        return self.ids is None or entity.get("id") in self.ids
+
+def warm_cache(cache: tfsl.cache.EntityCache,
+               path: str,
+               criteria: Optional[EntityCriteria]=None,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]]=None,
+               processes: Optional[int]=None,
+               fetched_at: Optional[float]=None,
+               batch_size: int=DEFAULT_WRITE_BATCH_SIZE) -> int:
+    """ Writes the entities in a dump (plain, .gz or .bz2) which meet the criteria into the cache,
+        batch_size of them at a time, returning how many were written.
+        Dumps are parsed by a pool of processes as in tfsl.dumps.iter_dump_entities_parallel.
+        The predicate, if any, is then called on each remaining entity in this process, so it need not be picklable.
+        Entities are recorded as retrieved at fetched_at, by default now.
+    """
+    criteria = criteria or EntityCriteria()
+    entities = tfsl.dumps.iter_dump_entities_parallel(path, criteria.line_filter(), criteria, processes)
+    written = 0
+    batch: Dict[I.EntityId, I.EntityPublishedSettings] = {}
+    for entity in entities:
+        if predicate is not None and not predicate(entity):
+            continue
+        # dump entities are the same JSON as wbgetentities returns
+        batch[entity["id"]] = cast(I.EntityPublishedSettings, entity)
+        if len(batch) >= batch_size:
+            cache.put_many(batch, fetched_at)
+            written += len(batch)
+            batch = {}
+    if batch:
+        cache.put_many(batch, fetched_at)
+        written += len(batch)
+    return written